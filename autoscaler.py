@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+
+"""
+Resource-Aware Worker Autoscaler for the Google Maps Scraper
+Samples CPU, memory and /dev/shm usage against the container's cgroup limits
+and grows or shrinks the number of concurrent browsers to stay under them
+"""
+
+import os
+import time
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Percent of the available CPU, memory and shm a run may use
+CPU_LIMIT = 85.0
+MEMORY_LIMIT = 80.0
+SHM_LIMIT = 75.0
+
+# Seconds between samples, and after a scale-up before the next one
+SAMPLE_INTERVAL = 10
+SCALE_UP_COOLDOWN = 30
+
+# Timeline entries kept per run (samples beyond this are thinned out)
+MAX_TIMELINE = 2000
+
+
+def _read(path):
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def cgroup_cpu_limit():
+    """CPUs available to this container (cgroup v2 or v1), or the host CPU count"""
+    cpu_max = _read('/sys/fs/cgroup/cpu.max')
+    if cpu_max:
+        quota, period = cpu_max.split()[:2]
+        if quota != 'max':
+            return int(quota) / int(period)
+    quota = _read('/sys/fs/cgroup/cpu/cpu.cfs_quota_us')
+    period = _read('/sys/fs/cgroup/cpu/cpu.cfs_period_us')
+    if quota and period and int(quota) > 0:
+        return int(quota) / int(period)
+    return float(os.cpu_count() or 1)
+
+
+def cgroup_cpu_usage_seconds():
+    """Cumulative CPU seconds used by this container, or None outside a cgroup"""
+    stat = _read('/sys/fs/cgroup/cpu.stat')
+    if stat:
+        for line in stat.splitlines():
+            if line.startswith('usage_usec'):
+                return int(line.split()[1]) / 1e6
+    usage = _read('/sys/fs/cgroup/cpuacct/cpuacct.usage')
+    if usage:
+        return int(usage) / 1e9
+    return None
+
+
+def host_cpu_times():
+    """(busy, total) jiffies from /proc/stat"""
+    line = _read('/proc/stat').splitlines()[0]
+    values = [int(v) for v in line.split()[1:]]
+    idle = values[3] + (values[4] if len(values) > 4 else 0)
+    return sum(values) - idle, sum(values)
+
+
+def memory_usage():
+    """(used, limit) bytes for the container, falling back to host memory"""
+    current = _read('/sys/fs/cgroup/memory.current')
+    limit = _read('/sys/fs/cgroup/memory.max')
+    if current is None:
+        current = _read('/sys/fs/cgroup/memory/memory.usage_in_bytes')
+        limit = _read('/sys/fs/cgroup/memory/memory.limit_in_bytes')
+
+    meminfo = {}
+    for line in (_read('/proc/meminfo') or '').splitlines():
+        key, value = line.split(':', 1)
+        meminfo[key] = int(value.split()[0]) * 1024
+    host_total = meminfo.get('MemTotal', 0)
+
+    # cgroup v1 reports a huge number when unlimited
+    if current is not None and limit not in (None, 'max') and int(limit) < host_total:
+        return int(current), int(limit)
+    return host_total - meminfo.get('MemAvailable', 0), host_total
+
+
+def shm_usage(path='/dev/shm'):
+    """(used, size) bytes of the shared memory filesystem Chrome renders into"""
+    try:
+        st = os.statvfs(path)
+    except OSError:
+        return 0, 0
+    size = st.f_blocks * st.f_frsize
+    return size - st.f_bavail * st.f_frsize, size
+
+
+class ResourceMonitor:
+    """Percent CPU, memory and shm usage relative to the container limits"""
+
+    def __init__(self):
+        self.cpus = cgroup_cpu_limit()
+        self._last_cgroup = cgroup_cpu_usage_seconds()
+        self._last_host = host_cpu_times()
+        self._last_time = time.time()
+
+    def _cpu_percent(self):
+        now = time.time()
+        usage = cgroup_cpu_usage_seconds()
+        if usage is not None and self._last_cgroup is not None:
+            elapsed = now - self._last_time
+            percent = (usage - self._last_cgroup) / (elapsed * self.cpus) * 100 if elapsed > 0 else 0.0
+            self._last_cgroup = usage
+        else:
+            busy, total = host_cpu_times()
+            delta_total = total - self._last_host[1]
+            percent = (busy - self._last_host[0]) / delta_total * 100 if delta_total else 0.0
+            self._last_host = (busy, total)
+        self._last_time = now
+        return max(0.0, min(100.0, percent))
+
+    def sample(self):
+        mem_used, mem_limit = memory_usage()
+        shm_used, shm_size = shm_usage()
+        return {
+            'cpu': self._cpu_percent(),
+            'memory': mem_used / mem_limit * 100 if mem_limit else 0.0,
+            'shm': shm_used / shm_size * 100 if shm_size else 0.0,
+        }
+
+
+class Autoscaler:
+    """Background controller for the number of concurrent workers.
+
+    Every ``interval`` seconds it samples resource usage. Any metric over its
+    limit removes a worker; when all metrics (projected one worker ahead) stay
+    under their limits, a worker is added, at most once per ``cooldown``.
+    ``on_change(target)`` is called whenever the target changes.
+    """
+
+    def __init__(self, min_workers=1, max_workers=4, initial=None, cpu_limit=CPU_LIMIT, memory_limit=MEMORY_LIMIT,
+                 shm_limit=SHM_LIMIT, interval=SAMPLE_INTERVAL, cooldown=SCALE_UP_COOLDOWN, on_change=None,
+                 monitor=None):
+        self.min_workers = max(1, min_workers)
+        self.max_workers = max(self.min_workers, max_workers)
+        self.limits = {'cpu': cpu_limit, 'memory': memory_limit, 'shm': shm_limit}
+        self.interval = interval
+        self.cooldown = cooldown
+        self.on_change = on_change
+        self.monitor = monitor or ResourceMonitor()
+
+        initial = self.min_workers if initial is None else initial
+        self._target = max(self.min_workers, min(self.max_workers, initial))
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._start_time = None
+        self._last_up = 0.0
+        self._timeline = []
+        self._stats = {'scale_ups': 0, 'scale_downs': 0, 'peak': self._target, 'samples': 0}
+
+    @property
+    def target(self):
+        with self._lock:
+            return self._target
+
+    def _record(self, usage, event):
+        entry = {'time': round(time.time() - self._start_time, 1), 'workers': self._target, 'event': event}
+        entry.update({k: round(v, 1) for k, v in usage.items()})
+        self._timeline.append(entry)
+        if len(self._timeline) > MAX_TIMELINE:
+            # Keep every scaling event but drop every other plain sample
+            self._timeline = [e for i, e in enumerate(self._timeline) if e['event'] != 'sample' or i % 2 == 0]
+
+    def decide(self, usage):
+        """New target for ``usage``; the change is applied and recorded"""
+        with self._lock:
+            target = self._target
+            over = [k for k, limit in self.limits.items() if usage[k] > limit]
+
+            if over and target > self.min_workers:
+                target -= 1
+                event = 'down'
+                logger.info(f"Autoscaler: {', '.join(over)} over limit, scaling down to {target} workers")
+            elif not over and target < self.max_workers and time.time() - self._last_up >= self.cooldown:
+                # Browsers dominate usage, so one more worker adds roughly usage / target
+                projected = {k: usage[k] * (target + 1) / target for k in ('memory', 'shm')}
+                projected['cpu'] = usage['cpu']
+                if all(projected[k] <= self.limits[k] for k in self.limits):
+                    target += 1
+                    event = 'up'
+                    self._last_up = time.time()
+                    logger.info(f"Autoscaler: headroom available, scaling up to {target} workers")
+                else:
+                    event = 'sample'
+            else:
+                event = 'sample'
+
+            changed = target != self._target
+            self._target = target
+            self._stats['samples'] += 1
+            if event == 'up':
+                self._stats['scale_ups'] += 1
+            elif event == 'down':
+                self._stats['scale_downs'] += 1
+            self._stats['peak'] = max(self._stats['peak'], target)
+            self._record(usage, event)
+
+        if changed and self.on_change:
+            self.on_change(target)
+        return target
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.decide(self.monitor.sample())
+            except Exception as e:
+                logger.warning(f"Autoscaler sample failed: {e}")
+
+    def start(self):
+        """Apply the initial target and begin sampling in a daemon thread"""
+        self._start_time = time.time()
+        self._last_up = self._start_time
+        with self._lock:
+            self._record(self.monitor.sample(), 'start')
+        if self.on_change:
+            self.on_change(self._target)
+        self._thread = threading.Thread(target=self._run, name="autoscaler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval + 5)
+
+    def stats(self):
+        """Scaling counters and the concurrency timeline of the run"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['current'] = self._target
+            stats['min'] = self.min_workers
+            stats['max'] = self.max_workers
+            stats['limits'] = dict(self.limits)
+            stats['timeline'] = list(self._timeline)
+        return stats
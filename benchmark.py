@@ -0,0 +1,440 @@
+#!/usr/bin/env python3
+
+"""
+Offline Benchmark for the Google Maps Scraper
+Serves a local Maps-like fixture page (search box, lazily loaded results feed,
+detail pane) and times search_query, scroll_results and parse_cards_with_details
+against it, so optimizations can be compared run to run without the live site.
+With --engine cdp the same fixture is scraped by cdp_engine's tab pool instead
+
+Usage:
+    python benchmark.py [--cards 60] [--batch 20] [--latency 300] [--repeats 3] [--compare previous.json]
+    python benchmark.py --engine cdp [--tabs 1]
+"""
+
+import os
+import json
+import time
+import random
+import resource
+import argparse
+import threading
+import statistics
+from datetime import datetime
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+import scrape_zip_optimized as scraper
+from driver_pool import get_process_tree_rss_mb
+
+RESULTS_DIR = "benchmark_results"
+
+# Reproduces the parts of the Maps DOM the scraper reads; __CONFIG__ is replaced per request
+FIXTURE_HTML = """<!doctype html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Maps fixture</title>
+<style>
+body { font-family: sans-serif; margin: 0; }
+#searchboxinput { width: 320px; margin: 8px; }
+div[role="feed"] { height: 640px; width: 420px; overflow-y: auto; }
+.Nv2PK { position: relative; height: 120px; border-bottom: 1px solid #ddd; padding: 4px; }
+a.hfpxzc { position: absolute; inset: 0; z-index: 1; }
+#pane { position: fixed; left: 440px; top: 40px; width: 400px; }
+</style>
+</head>
+<body>
+<input id="searchboxinput" type="text" autocomplete="off">
+<div id="results"></div>
+<div id="pane"></div>
+<script>
+const CFG = __CONFIG__;
+let rendered = 0;
+let loading = false;
+
+const jitter = ms => ms * (0.75 + Math.random() * 0.5);
+const place = i => ({
+    name: `Fixture Business ${i}`,
+    rating: (3 + (i % 20) / 10).toFixed(1),
+    reviews: `(${10 + i * 3})`,
+    category: i % 2 ? 'Attorney' : 'Law firm',
+    address: `${100 + i} Main St`,
+    phone: `(555) 010-${String(1000 + i).slice(-4)}`,
+    website: i % 3 ? `https://business${i}.example.com/` : '',
+    url: `${location.origin}/maps/place/Fixture+Business+${i}/data=!4m7!3m6!1s0x${(i + 1).toString(16).padStart(16, '0')}:0x${(i * 7 + 3).toString(16).padStart(16, '0')}!8m2`
+});
+
+function cardHtml(i) {
+    const p = place(i);
+    const website = p.website ? `<a class="lcr4fd" href="${p.website}">Website</a>` : '';
+    return `<div class="Nv2PK" data-i="${i}">
+        <a class="hfpxzc" href="${p.url}" aria-label="${p.name}"></a>
+        <div class="qBF1Pd">${p.name}</div>
+        <span class="MW4etd">${p.rating}</span><span class="UY7F9">${p.reviews}</span>
+        <div class="W4Efsd">
+            <div class="W4Efsd"><span>${p.category}</span><span>·</span><span>${p.address}</span></div>
+            <div class="W4Efsd"><span><span class="UsdlK">${p.phone}</span></span></div>
+        </div>
+        ${website}
+    </div>`;
+}
+
+function appendBatch(feed) {
+    const end = Math.min(rendered + CFG.batch, CFG.cards);
+    let html = '';
+    for (let i = rendered; i < end; i++) { html += cardHtml(i); }
+    feed.insertAdjacentHTML('beforeend', html);
+    rendered = end;
+    if (rendered >= CFG.cards) {
+        feed.insertAdjacentHTML('beforeend', '<span class="HlvSq">You\\'ve reached the end of the list.</span>');
+    }
+}
+
+function showDetail(i) {
+    const p = place(i);
+    const website = p.website ? `<a data-item-id="authority" href="${p.website}" aria-label="Website: ${p.website}">Website</a>` : '';
+    document.getElementById('pane').innerHTML = `
+        <h1 class="DUwDvf">${p.name}</h1>
+        <div class="F7nice"><span>${p.rating}</span><span class="ceNzKf" aria-label="${p.rating} stars"></span></div>
+        <button data-item-id="address" aria-label="Address: ${p.address}">${p.address}</button>
+        <button data-item-id="phone:tel:+1555010${String(1000 + i).slice(-4)}" aria-label="Phone: ${p.phone}">${p.phone}</button>
+        ${website}`;
+}
+
+document.getElementById('searchboxinput').addEventListener('keydown', e => {
+    if (e.key !== 'Enter') { return; }
+    setTimeout(() => {
+        const results = document.getElementById('results');
+        results.innerHTML = '<div role="feed" aria-label="Results"></div>';
+        const feed = results.firstChild;
+        appendBatch(feed);
+        feed.addEventListener('scroll', () => {
+            if (loading || rendered >= CFG.cards) { return; }
+            if (feed.scrollTop + feed.clientHeight < feed.scrollHeight - 200) { return; }
+            loading = true;
+            setTimeout(() => { appendBatch(feed); loading = false; }, jitter(CFG.latency));
+        });
+        feed.addEventListener('click', ev => {
+            const card = ev.target.closest('.Nv2PK');
+            if (!card) { return; }
+            ev.preventDefault();
+            setTimeout(() => showDetail(Number(card.dataset.i)), jitter(CFG.detail_latency));
+        });
+    }, jitter(CFG.latency));
+});
+</script>
+</body>
+</html>
+"""
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """Serves the fixture page at /maps; other paths return an empty 204"""
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        delay = float(params.get("delay", 0)) / 1000
+        if delay:
+            time.sleep(delay * random.uniform(0.75, 1.25))
+
+        if url.path != "/maps":
+            self.send_response(204)
+            self.end_headers()
+            return
+
+        config = {
+            "cards": int(params.get("cards", 60)),
+            "batch": int(params.get("batch", 20)),
+            "latency": float(params.get("latency", 300)),
+            "detail_latency": float(params.get("detail_latency", 150)),
+        }
+        body = FIXTURE_HTML.replace("__CONFIG__", json.dumps(config)).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fixture_server(port=0):
+    """Start the fixture server on a daemon thread; returns (server, base_url)"""
+    server = ThreadingHTTPServer(("127.0.0.1", port), FixtureHandler)
+    threading.Thread(target=server.serve_forever, name="fixture-server", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def percentiles(values):
+    """p50/p90/p99 and max of ``values`` in milliseconds"""
+    if not values:
+        return {"p50": 0.0, "p90": 0.0, "p99": 0.0, "max": 0.0}
+    ordered = sorted(v * 1000 for v in values)
+
+    def pick(q):
+        return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+    return {"p50": pick(0.5), "p90": pick(0.9), "p99": pick(0.99), "max": ordered[-1]}
+
+
+def fixture_url(base_url, args):
+    """Fixture page URL for the configured feed size and latencies"""
+    return (f"{base_url}/maps?cards={args.cards}&batch={args.batch}&latency={args.latency}"
+            f"&detail_latency={args.detail_latency}&delay={args.delay}")
+
+
+def count_correct(records):
+    """Records extracted for the right fixture card, in feed order"""
+    return sum(1 for i, r in enumerate(records) if r.get("Name") == f"Fixture Business {i}")
+
+
+def run_once(driver, base_url, args, card_times):
+    """One search -> scroll -> extract pass; returns stage timings and record counts"""
+    scraper.MAPS_URL = fixture_url(base_url, args)
+
+    stages = {}
+    start = time.time()
+    scraper.search_query(driver, "benchmark 00000")
+    stages["search"] = time.time() - start
+
+    start = time.time()
+    scraper.scroll_results(driver, max_scrolls=args.max_scrolls)
+    stages["scroll"] = time.time() - start
+
+    start = time.time()
+    if args.mode == "list":
+        records = scraper.parse_cards_list_mode(driver)
+    else:
+        del card_times[:]
+        records = scraper.parse_cards_with_details(driver)
+    stages["extract"] = time.time() - start
+
+    return stages, len(records), count_correct(records)
+
+
+def run_selenium(args, base_url):
+    """``repeats`` passes on one undetected-chromedriver browser; returns (launch time, runs, card times, busy time)"""
+    # Time every card click through the module attribute parse_cards_with_details calls
+    card_times = []
+    extract = scraper.extract_business_details
+
+    def timed_extract(*a, **kw):
+        start = time.time()
+        try:
+            return extract(*a, **kw)
+        finally:
+            card_times.append(time.time() - start)
+
+    scraper.extract_business_details = timed_extract
+
+    runs = []
+    all_card_times = []
+    driver = None
+    try:
+        start = time.time()
+        driver = scraper.init_driver()
+        launch_time = time.time() - start
+
+        for i in range(args.repeats):
+            stages, records, correct = run_once(driver, base_url, args, card_times)
+            all_card_times.extend(card_times)
+            runs.append({
+                "stages": stages,
+                "records": records,
+                "correct": correct,
+                "browser_rss_mb": get_process_tree_rss_mb(getattr(driver, "browser_pid", None)),
+            })
+            print(f"Run {i + 1}/{args.repeats}: {records} records ({correct} correct) in "
+                  f"{sum(stages.values()):.1f}s")
+    finally:
+        scraper.extract_business_details = extract
+        if driver:
+            driver.quit()
+
+    return launch_time, runs, all_card_times, sum(sum(r["stages"].values()) for r in runs)
+
+
+def run_cdp(args, base_url):
+    """``repeats`` zipcodes through cdp_engine.run_engine on a TabPool; returns the same tuple as run_selenium.
+
+    The engine scrolls and extracts together, so "extract" is the time spent in
+    card clicks and "scroll" is the rest of each zipcode after the search.
+    """
+    import asyncio
+    import cdp_engine
+
+    if not cdp_engine.ENGINE_AVAILABLE:
+        raise RuntimeError("The cdp engine requires websockets (pip install websockets)")
+    scraper.MAPS_URL = fixture_url(base_url, args)
+
+    # Search and card timings per zipcode tag, through the module attributes scrape_zipcode_async calls
+    timings = {}
+    search, extract = cdp_engine.search, cdp_engine.extract_details
+
+    def timing(tag):
+        return timings.setdefault(tag, {"search": 0.0, "cards": []})
+
+    async def timed_search(page, query, tag):
+        start = time.time()
+        try:
+            return await search(page, query, tag)
+        finally:
+            timing(tag)["search"] = time.time() - start
+
+    async def timed_extract(page, url, position, tag):
+        start = time.time()
+        try:
+            return await extract(page, url, position, tag)
+        finally:
+            timing(tag)["cards"].append(time.time() - start)
+
+    pool = cdp_engine.TabPool(args.tabs, profile=args.profile)
+    runs = []
+    all_card_times = []
+
+    def on_result(result, records):
+        sample = timing(f"CDP-{result['zipcode']}")
+        total = result.get("time", 0.0)
+        extract_time = sum(sample["cards"])
+        stages = {"search": sample["search"], "scroll": max(0.0, total - sample["search"] - extract_time),
+                  "extract": extract_time}
+        correct = count_correct(records)
+        all_card_times.extend(sample["cards"])
+        runs.append({
+            "stages": stages,
+            "records": len(records),
+            "correct": correct,
+            "browser_rss_mb": sum(get_process_tree_rss_mb(pid) for pid in pool.browser_pids()),
+        })
+        print(f"Run {len(runs)}/{args.repeats}: {len(records)} records ({correct} correct) in {total:.1f}s "
+              f"[{result['status']}]")
+
+    cdp_engine.search, cdp_engine.extract_details = timed_search, timed_extract
+    try:
+        start = time.time()
+        asyncio.run(cdp_engine.run_engine(
+            [f"{i:05d}" for i in range(args.repeats)], "benchmark", args.tabs, 1, args.mode,
+            args.max_scrolls, on_result=on_result, pool=pool))
+        stats = pool.stats()
+    finally:
+        cdp_engine.search, cdp_engine.extract_details = search, extract
+
+    # Tabs run zipcodes concurrently, so throughput comes from wall time rather than summed stages
+    return stats["launch_time"], runs, all_card_times, time.time() - start - stats["launch_time"]
+
+
+def run_benchmark(args):
+    """Run the configured benchmark; returns the report dict"""
+    if not args.pacing:
+        # Measure the scraper itself, not its anti-detection pauses
+        scraper.PACING_FLOOR = (0.0, 0.0)
+        scraper.configure_rate_limit(60_000, burst=1_000)
+    scraper.configure_page_profile(args.profile)
+
+    server, base_url = start_fixture_server()
+    try:
+        runner = run_cdp if args.engine == "cdp" else run_selenium
+        launch_time, runs, all_card_times, total_time = runner(args, base_url)
+    finally:
+        server.shutdown()
+    if not runs:
+        raise RuntimeError("No benchmark run completed")
+
+    total_records = sum(r["records"] for r in runs)
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "config": vars(args),
+        "launch_time": launch_time,
+        "stages": {
+            stage: statistics.mean(r["stages"][stage] for r in runs) for stage in ("search", "scroll", "extract")
+        },
+        "zipcode_time": statistics.mean(sum(r["stages"].values()) for r in runs),
+        "zipcodes_per_hour": 3600 * len(runs) / total_time if total_time else 0.0,
+        "records_per_minute": 60 * total_records / total_time if total_time else 0.0,
+        "accuracy": sum(r["correct"] for r in runs) / (args.cards * len(runs)),
+        "card_latency_ms": percentiles(all_card_times),
+        "browser_rss_mb": max(r["browser_rss_mb"] for r in runs),
+        "python_peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def format_report(report, baseline=None):
+    """Human readable report, with percent change against ``baseline`` when given"""
+    def line(label, key, value, unit, lower_is_better=True):
+        text = f"  {label:<22} {value:>10.1f} {unit}"
+        if baseline is not None:
+            before = baseline
+            for part in key.split("."):
+                before = before.get(part, {}) if isinstance(before, dict) else {}
+            if isinstance(before, (int, float)) and before:
+                change = (value - before) / before * 100
+                better = change < 0 if lower_is_better else change > 0
+                text += f"   {change:+.0f}% {'✓' if better else '✗' if abs(change) >= 5 else ''}"
+        return text
+
+    lat = report["card_latency_ms"]
+    config = report["config"]
+    engine = config.get("engine", "selenium")
+    if engine == "cdp":
+        engine += f", {config['tabs']} tabs"
+    lines = [
+        "=" * 60,
+        f"BENCHMARK ({engine}, {config['mode']}, {config['cards']} cards, "
+        f"{config['repeats']} runs, profile {config['profile']})",
+        "=" * 60,
+        line("Browser launch", "launch_time", report["launch_time"], "s"),
+        line("Search", "stages.search", report["stages"]["search"], "s"),
+        line("Scroll", "stages.scroll", report["stages"]["scroll"], "s"),
+        line("Extract", "stages.extract", report["stages"]["extract"], "s"),
+        line("Zipcodes per hour", "zipcodes_per_hour", report["zipcodes_per_hour"], "", lower_is_better=False),
+        line("Records per minute", "records_per_minute", report["records_per_minute"], "", lower_is_better=False),
+        line("Card latency p50", "card_latency_ms.p50", lat["p50"], "ms"),
+        line("Card latency p90", "card_latency_ms.p90", lat["p90"], "ms"),
+        line("Card latency p99", "card_latency_ms.p99", lat["p99"], "ms"),
+        line("Browser RSS", "browser_rss_mb", report["browser_rss_mb"], "MB"),
+        line("Python peak RSS", "python_peak_rss_mb", report["python_peak_rss_mb"], "MB"),
+        f"  {'Accuracy':<22} {report['accuracy'] * 100:>10.1f} %",
+        "=" * 60,
+    ]
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline scraper benchmark against a local Maps fixture")
+    parser.add_argument("--cards", type=int, default=60, help="Results in the feed")
+    parser.add_argument("--batch", type=int, default=20, help="Cards appended per lazy load")
+    parser.add_argument("--latency", type=float, default=300, help="Search and lazy-load latency (ms)")
+    parser.add_argument("--detail-latency", type=float, default=150, help="Detail pane latency (ms)")
+    parser.add_argument("--delay", type=float, default=0, help="Server response delay (ms)")
+    parser.add_argument("--max-scrolls", type=int, default=15)
+    parser.add_argument("--mode", default="details", choices=scraper.EXTRACTION_MODES)
+    parser.add_argument("--engine", default="selenium", choices=["selenium", "cdp"],
+                        help="undetected-chromedriver browser, or cdp_engine tabs over raw CDP")
+    parser.add_argument("--tabs", type=int, default=1, help="Concurrent tabs with --engine cdp")
+    parser.add_argument("--profile", default=scraper.DEFAULT_PROFILE, choices=list(scraper.PAGE_PROFILES))
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--pacing", action="store_true", help="Keep the pacing floor and rate limit")
+    parser.add_argument("--compare", help="Earlier report JSON to compare against")
+    parser.add_argument("--out", default=RESULTS_DIR)
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print(format_report(report, baseline))
+
+    os.makedirs(args.out, exist_ok=True)
+    path = os.path.join(args.out, f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report: {path}")
+
+
+if __name__ == "__main__":
+    main()
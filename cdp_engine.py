@@ -0,0 +1,771 @@
+#!/usr/bin/env python3
+
+"""
+Asyncio Scraping Engine on the Chrome DevTools Protocol
+Drives many Maps pages concurrently from one event loop over a single CDP
+websocket (no chromedriver), producing the same records as scrape_zip_optimized
+
+Usage:
+    python cdp_engine.py --file zips.xlsx --query "attorneys in" --concurrency 8 [--browsers 1] [--mode list] [--profile lean]
+"""
+
+import os
+import json
+import time
+import random
+import shutil
+import asyncio
+import functools
+import argparse
+import tempfile
+import subprocess
+import logging
+
+try:
+    import websockets
+except ImportError:
+    websockets = None
+
+import scrape_zip_optimized as scraper
+from chrome_bootstrap import find_chrome_binary
+from page_profile import DEFAULT_PROFILE, PAGE_PROFILES, chrome_args, blocked_urls
+from perf_capture import parse_metrics, load_trace, summarize, format_perf_summary
+
+logger = logging.getLogger(__name__)
+
+# Tabs leased concurrently across all browsers
+DEFAULT_CONCURRENCY = 8
+
+# Tab mode talks to Chrome over websockets; the UI and CLI only offer it when the package is installed
+ENGINE_AVAILABLE = websockets is not None
+
+CHROME_ARGS = [
+    '--headless=new',
+    '--no-sandbox',
+    '--disable-dev-shm-usage',
+    '--disable-blink-features=AutomationControlled',
+    '--disable-gpu',
+    '--disable-notifications',
+    '--disable-popup-blocking',
+    '--no-first-run',
+    '--no-default-browser-check',
+]
+
+FEED_STATE_JS = """
+(() => {
+    const feed = document.querySelector('div[role="feed"]');
+    if (!feed) { return null; }
+    const cards = Array.from(feed.querySelectorAll('div.Nv2PK'));
+    return {
+        total: cards.length,
+        end: !!feed.querySelector('span.HlvSq'),
+        urls: cards.map(card => {
+            const link = card.querySelector('a.hfpxzc');
+            return link ? link.href : '';
+        })
+    };
+})()
+"""
+
+# Scrolls the card for ``url`` (or, without one, the card at ``position``) into view; returns its label and click point
+FOCUS_CARD_JS = """
+const [url, position] = arguments;
+const cards = Array.from(document.querySelectorAll('div[role="feed"] div.Nv2PK'));
+const card = url ? cards.find(c => { const a = c.querySelector('a.hfpxzc'); return a && a.href === url; })
+                 : cards[position];
+if (!card) { return null; }
+const link = card.querySelector('a.hfpxzc') || card;
+link.scrollIntoView({block: 'center'});
+const rect = link.getBoundingClientRect();
+return {label: link.getAttribute('aria-label') || '', x: rect.left + rect.width / 2, y: rect.top + rect.height / 2};
+"""
+
+
+class CDPError(Exception):
+    """Error reported by Chrome for a CDP command"""
+
+
+def as_function_call(script, *args):
+    """Wrap a Selenium-style script body (using ``arguments``) into an expression"""
+    return f"(function() {{ {script} }}).apply(null, {json.dumps(list(args))})"
+
+
+class CDPConnection:
+    """One browser-level websocket multiplexing commands for every attached page session"""
+
+    def __init__(self, ws):
+        self._ws = ws
+        self._next_id = 0
+        self._pending = {}
+        self._listeners = {}
+        self._reader = asyncio.get_running_loop().create_task(self._read())
+
+    @classmethod
+    async def connect(cls, url):
+        if websockets is None:
+            raise RuntimeError("The CDP engine requires the websockets package (pip install websockets)")
+        return cls(await websockets.connect(url, max_size=None))
+
+    async def _read(self):
+        try:
+            async for raw in self._ws:
+                message = json.loads(raw)
+                if 'id' in message:
+                    future = self._pending.pop(message['id'], None)
+                    if future and not future.done():
+                        if 'error' in message:
+                            future.set_exception(CDPError(message['error'].get('message', 'CDP error')))
+                        else:
+                            future.set_result(message.get('result', {}))
+                else:
+                    for callback in self._listeners.get(message.get('sessionId'), []):
+                        callback(message['method'], message.get('params', {}))
+        except Exception as e:
+            logger.error(f"CDP connection closed: {e}")
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(CDPError("CDP connection closed"))
+            self._pending.clear()
+
+    async def send(self, method, params=None, session_id=None, timeout=60):
+        self._next_id += 1
+        message = {'id': self._next_id, 'method': method, 'params': params or {}}
+        if session_id:
+            message['sessionId'] = session_id
+        future = asyncio.get_running_loop().create_future()
+        self._pending[self._next_id] = future
+        await self._ws.send(json.dumps(message))
+        return await asyncio.wait_for(future, timeout)
+
+    def add_listener(self, session_id, callback):
+        """Receive every event of a page session as callback(method, params)"""
+        self._listeners.setdefault(session_id, []).append(callback)
+
+    def remove_listeners(self, session_id):
+        self._listeners.pop(session_id, None)
+
+    async def close(self):
+        self._reader.cancel()
+        await self._ws.close()
+
+
+class CDPPage:
+    """A page target attached through a flattened CDP session"""
+
+    def __init__(self, conn, target_id, session_id):
+        self.conn = conn
+        self.target_id = target_id
+        self.session_id = session_id
+        self.bytes_received = 0
+        self.requests_sent = 0
+        self.requests_failed = 0
+        conn.add_listener(session_id, self._on_event)
+
+    def _on_event(self, method, params):
+        if method == 'Network.loadingFinished':
+            self.bytes_received += int(params.get('encodedDataLength', 0))
+        elif method == 'Network.requestWillBeSent':
+            self.requests_sent += 1
+        elif method == 'Network.loadingFailed':
+            self.requests_failed += 1
+
+    def network_totals(self):
+        """Running network counters in perf_capture's trace keys"""
+        return {"bytes": self.bytes_received, "req": self.requests_sent, "fail": self.requests_failed}
+
+    async def perf_metrics(self, enable=False):
+        """Chrome Performance domain counters for this tab, or {} when unavailable"""
+        try:
+            if enable:
+                await self.send('Performance.enable')
+            return parse_metrics(await self.send('Performance.getMetrics'))
+        except Exception:
+            return {}
+
+    async def configure_network(self, blocked=None):
+        """Enable network events (for byte accounting) and block ``blocked`` URL patterns"""
+        await self.send('Network.enable')
+        if blocked:
+            await self.send('Network.setBlockedURLs', urls=blocked)
+
+    async def send(self, method, **params):
+        return await self.conn.send(method, params, self.session_id)
+
+    async def evaluate(self, expression):
+        response = await self.send('Runtime.evaluate', expression=expression, returnByValue=True, awaitPromise=True)
+        if 'exceptionDetails' in response:
+            raise CDPError(response['exceptionDetails'].get('text', 'JavaScript error'))
+        return response.get('result', {}).get('value')
+
+    async def call(self, script, *args):
+        """Run a Selenium-style script body with JSON arguments"""
+        return await self.evaluate(as_function_call(script, *args))
+
+    async def wait_for(self, expression, timeout, poll=0.2, floor=None):
+        """Poll ``expression`` until truthy; returns its value, or None on timeout"""
+        start = time.time()
+        result = None
+        while time.time() - start < timeout:
+            try:
+                result = await self.evaluate(expression)
+            except CDPError:
+                result = None
+            if result:
+                break
+            await asyncio.sleep(poll)
+        await pace(start, floor)
+        return result or None
+
+    async def navigate(self, url):
+        await self.send('Page.navigate', url=url)
+
+    async def type_text(self, text):
+        for char in text:
+            await self.send('Input.insertText', text=char)
+            await asyncio.sleep(random.uniform(0.05, 0.15))
+
+    async def press_enter(self):
+        for event in ('keyDown', 'keyUp'):
+            await self.send('Input.dispatchKeyEvent', type=event, key='Enter', code='Enter',
+                            windowsVirtualKeyCode=13, nativeVirtualKeyCode=13,
+                            **({'text': '\r'} if event == 'keyDown' else {}))
+
+    async def click_at(self, x, y):
+        await self.send('Input.dispatchMouseEvent', type='mouseMoved', x=x, y=y)
+        for event in ('mousePressed', 'mouseReleased'):
+            await self.send('Input.dispatchMouseEvent', type=event, x=x, y=y, button='left', clickCount=1)
+
+    async def close(self):
+        self.conn.remove_listeners(self.session_id)
+        try:
+            await self.conn.send('Target.closeTarget', {'targetId': self.target_id})
+        except CDPError:
+            pass
+
+
+class CDPBrowser:
+    """A Chrome process controlled over its browser websocket"""
+
+    def __init__(self, process, conn, user_data_dir, profile=DEFAULT_PROFILE):
+        self.process = process
+        self.conn = conn
+        self.user_data_dir = user_data_dir
+        self.profile = profile
+
+    @classmethod
+    async def launch(cls, profile=DEFAULT_PROFILE, extra_args=None, startup_timeout=30):
+        binary = find_chrome_binary()
+        if not binary:
+            raise RuntimeError("No Chrome/Chromium binary found")
+
+        user_data_dir = tempfile.mkdtemp(prefix="cdp_chrome_")
+        args = [binary, '--remote-debugging-port=0', f'--user-data-dir={user_data_dir}',
+                f'--user-agent={random.choice(scraper.USER_AGENTS)}'] + CHROME_ARGS + chrome_args(profile) + list(extra_args or [])
+        process = subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        # Chrome writes its chosen port and browser websocket path once it is listening
+        port_file = os.path.join(user_data_dir, 'DevToolsActivePort')
+        deadline = time.time() + startup_timeout
+        while True:
+            if os.path.exists(port_file):
+                with open(port_file) as f:
+                    lines = f.read().split()
+                if len(lines) >= 2:
+                    break
+            if time.time() > deadline or process.poll() is not None:
+                process.kill()
+                shutil.rmtree(user_data_dir, ignore_errors=True)
+                raise RuntimeError("Chrome did not expose a DevTools endpoint")
+            await asyncio.sleep(0.1)
+
+        conn = await CDPConnection.connect(f"ws://127.0.0.1:{lines[0]}{lines[1]}")
+        return cls(process, conn, user_data_dir, profile)
+
+    async def create_context(self):
+        """New isolated browser context (separate cookies/storage), like an incognito window"""
+        response = await self.conn.send('Target.createBrowserContext', {'disposeOnDetach': True})
+        return response['browserContextId']
+
+    async def dispose_context(self, context_id):
+        try:
+            await self.conn.send('Target.disposeBrowserContext', {'browserContextId': context_id})
+        except CDPError:
+            pass
+
+    async def new_page(self, context_id=None):
+        params = {'url': 'about:blank'}
+        if context_id:
+            params['browserContextId'] = context_id
+        target_id = (await self.conn.send('Target.createTarget', params))['targetId']
+        session_id = (await self.conn.send('Target.attachToTarget', {'targetId': target_id, 'flatten': True}))['sessionId']
+        page = CDPPage(self.conn, target_id, session_id)
+        await page.configure_network(blocked_urls(self.profile))
+        return page
+
+    async def close(self):
+        try:
+            await self.conn.send('Browser.close', timeout=10)
+        except Exception:
+            pass
+        try:
+            await self.conn.close()
+        except Exception:
+            pass
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+        shutil.rmtree(self.user_data_dir, ignore_errors=True)
+
+
+async def pace(start, floor=None):
+    """Async counterpart of scraper.pace"""
+    low, high = floor or scraper.PACING_FLOOR
+    remaining = random.uniform(low, high) - (time.time() - start)
+    if remaining > 0:
+        await asyncio.sleep(remaining)
+
+
+async def throttle(tag):
+    """Draw from the scraper's shared rate limiter without blocking the event loop"""
+    await asyncio.get_running_loop().run_in_executor(None, scraper.throttle, tag)
+
+
+async def search(page, query, tag):
+    """Async counterpart of scraper.search_query"""
+    await throttle(tag)
+    await page.navigate(scraper.MAPS_URL)
+
+    if not await page.wait_for("!!document.querySelector('#searchboxinput')", scraper.WAIT_TIMEOUTS["searchbox"]):
+        logger.error(f"[{tag}] Search error: search box did not appear")
+        return False
+
+    await page.evaluate("document.querySelector('#searchboxinput').focus()")
+    await page.type_text(query)
+    await pace(time.time())
+    await page.press_enter()
+
+    if not await page.wait_for(
+            "!!document.querySelector('div[role=\"feed\"], h1.DUwDvf')", scraper.WAIT_TIMEOUTS["results"]):
+        logger.warning(f"[{tag}] Results did not load within {scraper.WAIT_TIMEOUTS['results']}s")
+
+    scraper.safe_print(f"[{tag}] ✓ Searched: {query}")
+    return True
+
+
+async def stream_results(page, max_scrolls=15, max_results=None, tag="", outcome=None):
+    """Async counterpart of scraper.stream_results; yields (place_url, position) for each new card.
+
+    Cards without a place URL are yielded too, keyed by their position in the
+    feed like the Selenium harvester keys them by element.
+    """
+    seen = set()
+    yielded = 0
+    outcome = {} if outcome is None else outcome
+    outcome["complete"] = False
+
+    for i in range(max_scrolls + 1):
+        state = await page.evaluate(FEED_STATE_JS)
+        if not state:
+            return
+
+        for position, url in enumerate(state["urls"]):
+            key = url or f"#{position}"
+            if key in seen:
+                continue
+            seen.add(key)
+            yield url, position
+            yielded += 1
+            if max_results and yielded >= max_results:
+                return
+
+        if state["end"] or i == max_scrolls:
+            outcome["complete"] = state["end"]
+            return
+
+        await page.evaluate(
+            "(() => { const f = document.querySelector('div[role=\"feed\"]'); f.scrollTop = f.scrollHeight; })()")
+        grown = await page.wait_for(
+            f"document.querySelectorAll('div[role=\"feed\"] div.Nv2PK').length > {state['total']} || "
+            f"!!document.querySelector('div[role=\"feed\"] span.HlvSq')",
+            scraper.WAIT_TIMEOUTS["scroll"]
+        )
+        if not grown:
+            outcome["complete"] = True
+            return
+
+
+async def extract_details(page, url, position, tag):
+    """Async counterpart of scraper.extract_business_details for the card linking to ``url`` (or at ``position``)"""
+    start = time.time()
+    previous_title = await page.call(scraper.DETAIL_TITLE_SCRIPT)
+    card = await page.call(FOCUS_CARD_JS, url, position)
+    if not card:
+        return None
+
+    await pace(start)
+    await throttle(tag)
+    await page.click_at(card["x"], card["y"])
+
+    expected = card["label"].strip().lower()
+    title_js = as_function_call(scraper.DETAIL_TITLE_SCRIPT)
+    condition = (f"(({title_js}) || '').trim().toLowerCase() === {json.dumps(expected)}" if expected
+                 else f"(({title_js}) || '') !== {json.dumps(previous_title or '')}")
+    if not await page.wait_for(condition, scraper.WAIT_TIMEOUTS["detail"]):
+        logger.warning(f"[{tag}] Detail pane for {card['label'][:40]} did not load in time")
+
+    raw = await page.call(scraper.DETAIL_PANE_SCRIPT, scraper.DETAIL_SELECTORS)
+    details = scraper.normalize_detail_fields(raw or {})
+    if url:
+        details["Place URL"] = url
+    scraper.metrics.observe("scraper_stage_seconds", time.time() - start, stage="card")
+    return details
+
+
+class TabPool:
+    """Leases isolated tabs hosted by a few shared browsers.
+
+    Every tab lives in its own browser context (separate cookies and storage),
+    so a zipcode job leases a tab instead of a whole Chrome. Tabs are recycled
+    after ``max_jobs`` zipcodes or a failure, and a dead browser is relaunched
+    the next time one of its tabs is opened.
+    """
+
+    def __init__(self, tabs=DEFAULT_CONCURRENCY, browsers=1, max_jobs=25, profile=DEFAULT_PROFILE, extra_args=None):
+        self.tabs = max(1, tabs)
+        self.num_browsers = max(1, min(browsers, self.tabs))
+        self.max_jobs = max_jobs
+        self.profile = profile
+        self.extra_args = extra_args
+
+        self._browsers = [None] * self.num_browsers
+        self._browser_locks = [asyncio.Lock() for _ in range(self.num_browsers)]
+        self._idle = asyncio.Queue()
+        self._stats = {
+            'launches': 0,
+            'browser_crashes': 0,
+            'tabs_opened': 0,
+            'leases': 0,
+            'reuses': 0,
+            'recycled_jobs': 0,
+            'recycled_failures': 0,
+            'launch_time': 0.0,
+            'tab_open_time': 0.0,
+        }
+
+    async def _browser(self, slot):
+        """Running browser for ``slot``, launching or relaunching it if needed"""
+        async with self._browser_locks[slot]:
+            browser = self._browsers[slot]
+            if browser and browser.process.poll() is not None:
+                logger.error(f"[Browser-{slot}] Chrome exited (code {browser.process.returncode}), relaunching")
+                self._stats['browser_crashes'] += 1
+                await browser.close()
+                browser = None
+            if browser is None:
+                start = time.time()
+                browser = await CDPBrowser.launch(self.profile, self.extra_args)
+                self._stats['launches'] += 1
+                self._stats['launch_time'] += time.time() - start
+                self._browsers[slot] = browser
+            return browser
+
+    async def _open(self, tab):
+        start = time.time()
+        browser = await self._browser(tab['slot'])
+        tab['context'] = await browser.create_context()
+        tab['page'] = await browser.new_page(tab['context'])
+        tab['jobs'] = 0
+        self._stats['tabs_opened'] += 1
+        self._stats['tab_open_time'] += time.time() - start
+
+    async def _discard(self, tab):
+        browser = self._browsers[tab['slot']]
+        if tab['page']:
+            await tab['page'].close()
+        if browser and tab['context']:
+            await browser.dispose_context(tab['context'])
+        tab['page'] = None
+        tab['context'] = None
+
+    async def start(self):
+        """Launch the browsers and open every tab up front"""
+        await asyncio.gather(*(self._browser(slot) for slot in range(self.num_browsers)))
+        for i in range(self.tabs):
+            tab = {'id': i, 'slot': i % self.num_browsers, 'context': None, 'page': None, 'jobs': 0}
+            try:
+                await self._open(tab)
+            except Exception as e:
+                logger.warning(f"[Tab-{i}] Could not open tab yet: {e}")
+            self._idle.put_nowait(tab)
+
+    async def acquire(self):
+        """Wait for an idle tab; tabs closed by a failure are reopened here"""
+        tab = await self._idle.get()
+        if tab['page'] is None:
+            try:
+                await self._open(tab)
+            except Exception:
+                self._idle.put_nowait(tab)
+                raise
+        self._stats['leases'] += 1
+        if tab['jobs']:
+            self._stats['reuses'] += 1
+        return tab
+
+    async def release(self, tab, failed=False, used=True):
+        """Return a tab; failed or worn-out tabs are closed and reopened on next lease"""
+        if not used:
+            self._idle.put_nowait(tab)
+            return
+        tab['jobs'] += 1
+        if failed or tab['jobs'] >= self.max_jobs:
+            self._stats['recycled_failures' if failed else 'recycled_jobs'] += 1
+            try:
+                await self._discard(tab)
+            except Exception as e:
+                logger.warning(f"[Tab-{tab['id']}] Error closing tab: {e}")
+                tab['page'] = None
+                tab['context'] = None
+        self._idle.put_nowait(tab)
+
+    def browser_pids(self):
+        """Process ids of the running browsers"""
+        return [b.process.pid for b in self._browsers if b and b.process.poll() is None]
+
+    def stats(self):
+        """Tab and browser lifecycle counters"""
+        stats = dict(self._stats)
+        stats['browsers'] = self.num_browsers
+        stats['tabs'] = self.tabs
+        stats['avg_tab_open_time'] = stats['tab_open_time'] / stats['tabs_opened'] if stats['tabs_opened'] else 0.0
+        avg_launch = stats['launch_time'] / stats['launches'] if stats['launches'] else 0.0
+        # Every lease beyond the browser launches would have cost a Chrome start per job
+        stats['estimated_time_saved'] = max(0.0, (stats['leases'] - stats['launches']) * avg_launch
+                                            - stats['tab_open_time'])
+        return stats
+
+    async def close(self):
+        for browser in self._browsers:
+            if browser:
+                await browser.close()
+        self._browsers = [None] * self.num_browsers
+
+
+async def scrape_zipcode_async(page, zipcode, base_query, mode="details", max_scrolls=15,
+                               max_results=None, index=None, feed=None):
+    """Scrape one zipcode on a leased page; returns (result, records) like scrape_zipcode.
+
+    ``feed["complete"]`` tells whether the whole results feed was read (see stream_results).
+    """
+    query = f"{base_query} {zipcode}"
+    tag = f"CDP-{zipcode}"
+    start_time = time.time()
+    start_network = page.network_totals()
+    probe = scraper.perf_trace.start(zipcode, page.target_id, await page.perf_metrics(enable=True)) \
+        if scraper.perf_trace else None
+    result = None
+
+    try:
+        if not await search(page, query, tag):
+            result = {"zipcode": zipcode, "count": 0, "status": "search_failed"}
+            return result, []
+        if probe:
+            probe.mark("search", await page.perf_metrics())
+
+        data = []
+        if mode == "list":
+            async for _ in stream_results(page, max_scrolls, max_results, tag, feed):
+                pass
+            if probe:
+                probe.mark("scroll", await page.perf_metrics())
+            cards = await page.call(scraper.LIST_CARDS_SCRIPT) or []
+            data = scraper.list_cards_to_records(cards, max_results)
+            if index:
+                data = index.filter_new(data, zipcode)
+        else:
+            async for url, position in stream_results(page, max_scrolls, max_results, tag, feed):
+                if index and index.check_card(url, zipcode):
+                    continue
+                try:
+                    details = await extract_details(page, url, position, tag)
+                except CDPError as e:
+                    logger.error(f"[{tag}] Error extracting business: {str(e)[:50]}")
+                    continue
+                if details and details.get("Name") and (not index or index.add(details, zipcode)):
+                    data.append(details)
+                await pace(time.time())
+
+        elapsed = time.time() - start_time
+        status = "success" if data else "no_data"
+        transferred = page.bytes_received - start_network["bytes"]
+        scraper.safe_print(f"[{tag}] ✓ Completed {zipcode}: {len(data)} records in {elapsed:.1f}s "
+                           f"({scraper.format_bytes(transferred)})")
+        result = {"zipcode": zipcode, "count": len(data), "status": status, "time": elapsed, "bytes": transferred}
+        return result, data
+
+    except Exception as e:
+        elapsed = time.time() - start_time
+        logger.error(f"[{tag}] Error with {zipcode}: {e}")
+        result = {"zipcode": zipcode, "count": 0, "status": "error", "error": str(e), "time": elapsed}
+        return result, []
+
+    finally:
+        if probe:
+            network = {k: v - start_network[k] for k, v in page.network_totals().items()}
+            probe.finish(result, network, await page.perf_metrics())
+
+
+async def run_engine(zipcodes, base_query, tabs=DEFAULT_CONCURRENCY, browsers=1, mode="details", max_scrolls=15,
+                     max_results=None, on_result=None, index=None, cache=None, profile=DEFAULT_PROFILE,
+                     extra_args=None, pool=None, should_stop=None):
+    """Scrape ``zipcodes`` on tabs leased from a TabPool; returns all results.
+
+    ``on_result(result, records)`` receives records already deduplicated through
+    ``index``; ``index.records_for(zipcode)`` has the zipcode's full result set.
+    Once ``should_stop()`` returns True, zipcodes that have not leased a tab
+    yet are dropped without a result. Fresh cached zipcodes are served without leasing a tab.
+    """
+    pool = pool or TabPool(tabs, browsers, profile=profile, extra_args=extra_args)
+    await pool.start()
+    results = []
+
+    def stopping():
+        return bool(should_stop and should_stop())
+
+    async def run_one(zipcode):
+        result, records = None, []
+        if stopping():
+            return
+        # SQLite calls run on executor threads so a locked cache never stalls the other tabs
+        loop = asyncio.get_running_loop()
+        if cache:
+            try:
+                cached = await loop.run_in_executor(None, cache.get, base_query, zipcode, mode, max_results)
+            except Exception as e:
+                logger.warning(f"[CDP-{zipcode}] Cache lookup failed: {e}")
+                cached = None
+            if cached is not None:
+                records = cached[:max_results] if max_results else cached
+                if index:
+                    records = index.filter_new(records, zipcode)
+                result = {"zipcode": zipcode, "count": len(records), "time": 0.0, "cached": True,
+                          "status": "success" if records else "no_data"}
+
+        if result is None:
+            try:
+                tab = await pool.acquire()
+            except Exception as e:
+                logger.error(f"[CDP-{zipcode}] No tab available: {e}")
+                result = {"zipcode": zipcode, "count": 0, "status": "error", "error": str(e), "time": 0.0}
+            else:
+                # Stop may have been requested while this zipcode waited for a tab
+                if stopping():
+                    await pool.release(tab, used=False)
+                    return
+                feed = {}
+                try:
+                    result, records = await scrape_zipcode_async(
+                        tab['page'], zipcode, base_query, mode, max_scrolls, max_results, index, feed)
+                finally:
+                    await pool.release(tab, failed=result is None or result["status"] == "error")
+
+                # The full result set, including places deduplicated against other zipcodes.
+                # An empty feed may just have failed to load, so it is never cached; capped feeds are partial.
+                found = index.records_for(zipcode) if index else records
+                if cache and found and result["status"] in ("success", "no_data"):
+                    try:
+                        await loop.run_in_executor(None, functools.partial(
+                            cache.put, base_query, zipcode, found, mode, complete=feed.get("complete", False)))
+                    except Exception as e:
+                        logger.warning(f"[CDP-{zipcode}] Could not cache: {e}")
+
+        results.append(result)
+        scraper.record_zipcode_metrics(result)
+        if on_result:
+            on_result(result, records)
+
+    try:
+        await asyncio.gather(*(run_one(z) for z in zipcodes))
+    finally:
+        await pool.close()
+    return results
+
+
+def run_tab_mode(zipcodes, base_query, tabs=DEFAULT_CONCURRENCY, browsers=1, mode="details", max_scrolls=15,
+                 max_results=None, on_result=None, index=None, cache=None, profile=DEFAULT_PROFILE,
+                 should_stop=None):
+    """Blocking entry point for the scraper and UI; returns (results, pool stats)"""
+    async def _run():
+        pool = TabPool(tabs, browsers, profile=profile)
+        results = await run_engine(zipcodes, base_query, tabs, browsers, mode, max_scrolls, max_results,
+                                   on_result, index, cache, pool=pool, should_stop=should_stop)
+        return results, pool.stats()
+
+    return asyncio.run(_run())
+
+
+def format_tab_stats(stats):
+    """One-line summary of tab pool activity"""
+    return (f"Browsers: {stats['browsers']} (launched {stats['launches']}, crashed {stats['browser_crashes']}) | "
+            f"Tabs: {stats['tabs']} | Leases: {stats['leases']} | Reused: {stats['reuses']} | "
+            f"Recycled: {stats['recycled_jobs'] + stats['recycled_failures']} | "
+            f"Startup saved: ~{stats['estimated_time_saved']:.0f}s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Async CDP Google Maps scraper")
+    parser.add_argument("--file", required=True, help="xlsx, CSV or Parquet sheet of zipcodes")
+    parser.add_argument("--query", required=True)
+    parser.add_argument("--column", default="DELIVERY ZIPCODE")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Concurrent tabs")
+    parser.add_argument("--browsers", type=int, default=1, help="Chrome processes hosting the tabs")
+    parser.add_argument("--mode", default="details", choices=scraper.EXTRACTION_MODES)
+    parser.add_argument("--profile", default=DEFAULT_PROFILE, choices=list(PAGE_PROFILES))
+    parser.add_argument("--max-scrolls", type=int, default=15)
+    parser.add_argument("--max-results", type=int)
+    parser.add_argument("--out", default="google_maps_data")
+    parser.add_argument("--format", default="csv", choices=scraper.OUTPUT_FORMATS)
+    parser.add_argument("--perf-trace", help="Append per-zipcode Chrome performance samples to this file")
+    args = parser.parse_args(argv)
+    scraper.configure_perf_capture(args.perf_trace)
+
+    zipcodes = scraper.load_zipcodes(args.file, args.column)
+
+    folder_name = scraper.create_output_folder(args.out)
+    writer = scraper.create_output_writer(folder_name, args.query, args.format, scraper.create_results_store())
+    index = scraper.PlaceIndex(args.query)
+
+    def on_result(result, records):
+        places = index.records_for(result["zipcode"])
+        if records or places:
+            writer.submit(records, args.query, result["zipcode"], places)
+
+    start = time.time()
+    try:
+        results, stats = run_tab_mode(
+            zipcodes, args.query, args.concurrency, args.browsers, args.mode, args.max_scrolls,
+            args.max_results, on_result, index, profile=args.profile
+        )
+    finally:
+        writer.close()
+
+    elapsed = time.time() - start
+    successful = sum(1 for r in results if r["status"] == "success")
+    print(f"\n✓ CDP engine: {successful}/{len(zipcodes)} zipcodes, "
+          f"{sum(r.get('count', 0) for r in results)} records in {elapsed:.1f}s "
+          f"({len(zipcodes) / elapsed * 60:.1f} zipcodes/min)")
+    print(format_tab_stats(stats))
+    scraper.configure_page_profile(args.profile)
+    print(scraper.format_transfer_stats(results))
+    print(f"Records file: {writer.path}")
+    losses = scraper.format_writer_losses(writer.stats())
+    if losses:
+        print(losses)
+    if args.perf_trace:
+        print(format_perf_summary(summarize(load_trace(args.perf_trace))))
+
+
+if __name__ == "__main__":
+    main()
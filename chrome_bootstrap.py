@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+
+"""
+One-time Chrome Bootstrap for the Google Maps Scraper
+Detects the installed Chrome version and prepares a single patched chromedriver,
+cached on disk and shared by every thread and process until Chrome changes
+"""
+
+import os
+import re
+import json
+import shutil
+import fcntl
+import subprocess
+import threading
+import logging
+from contextlib import contextmanager
+
+import undetected_chromedriver as uc
+
+logger = logging.getLogger(__name__)
+
+CHROME_BINARIES = ['google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser']
+BOOTSTRAP_DIR = os.environ.get(
+    'CHROME_BOOTSTRAP_DIR',
+    os.path.join(os.path.expanduser('~'), '.cache', 'web-scraper', 'chrome')
+)
+META_FILE = 'bootstrap.json'
+
+_bootstrap = None
+_bootstrap_lock = threading.Lock()
+
+
+def find_chrome_binary():
+    """Resolve the Chrome/Chromium executable, honouring CHROME_BIN"""
+    candidates = [os.environ.get('CHROME_BIN')] + CHROME_BINARIES
+    for name in candidates:
+        if not name:
+            continue
+        path = shutil.which(name) or (name if os.path.isfile(name) else None)
+        if path:
+            return os.path.realpath(path)
+    return None
+
+
+def binary_fingerprint(path):
+    """Identify an installed browser build without launching it"""
+    st = os.stat(path)
+    return f"{path}:{st.st_size}:{int(st.st_mtime)}"
+
+
+def detect_chrome_version(binary):
+    """Full version string reported by the browser, e.g. '131.0.6778.85'"""
+    result = subprocess.run([binary, '--version'], capture_output=True, text=True, timeout=30)
+    match = re.search(r'(\d+)\.(\d+)\.(\d+)\.(\d+)', result.stdout)
+    if not match:
+        raise RuntimeError(f"Could not parse Chrome version from: {result.stdout.strip()!r}")
+    return match.group(0)
+
+
+@contextmanager
+def _file_lock(cache_dir):
+    """Cross-process lock so only one process patches chromedriver at a time"""
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(os.path.join(cache_dir, '.lock'), 'w') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _read_meta(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, META_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_meta(cache_dir, meta):
+    path = os.path.join(cache_dir, META_FILE)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp, path)
+
+
+def prepare_patched_driver(major_version, target_path):
+    """Download and patch chromedriver once, then move it into the cache"""
+    os.makedirs(os.path.dirname(target_path), exist_ok=True)
+    patcher = uc.Patcher(version_main=major_version)
+    patcher.auto()
+
+    tmp = f"{target_path}.{os.getpid()}.tmp"
+    shutil.copy2(patcher.executable_path, tmp)
+    os.chmod(tmp, 0o755)
+    os.replace(tmp, target_path)
+    return target_path
+
+
+def bootstrap_chrome(cache_dir=BOOTSTRAP_DIR, force=False):
+    """Return {'binary', 'version', 'major', 'driver_path'} for the installed Chrome.
+
+    The result is memoised per process and persisted in ``cache_dir``; the
+    driver is only re-patched when the Chrome binary's fingerprint changes.
+    """
+    global _bootstrap
+
+    with _bootstrap_lock:
+        if _bootstrap and not force:
+            return _bootstrap
+
+        binary = find_chrome_binary()
+        if not binary:
+            raise RuntimeError("No Chrome/Chromium binary found")
+        fingerprint = binary_fingerprint(binary)
+
+        with _file_lock(cache_dir):
+            meta = _read_meta(cache_dir)
+            if (not force and meta and meta.get('fingerprint') == fingerprint
+                    and os.path.exists(meta.get('driver_path', ''))):
+                logger.info(f"Using cached chromedriver for Chrome {meta['version']}")
+            else:
+                version = detect_chrome_version(binary)
+                major = int(version.split('.')[0])
+                driver_path = os.path.join(cache_dir, version, 'chromedriver')
+
+                if force or not os.path.exists(driver_path):
+                    logger.info(f"Patching chromedriver for Chrome {version}...")
+                    prepare_patched_driver(major, driver_path)
+
+                meta = {
+                    'binary': binary,
+                    'fingerprint': fingerprint,
+                    'version': version,
+                    'major': major,
+                    'driver_path': driver_path,
+                }
+                _write_meta(cache_dir, meta)
+
+        _bootstrap = meta
+        return _bootstrap
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+
+"""
+Warm Chrome Driver Pool for the Google Maps Scraper
+Leases long-lived browsers to worker threads instead of launching one per zipcode
+"""
+
+import os
+import time
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def get_process_tree_rss_mb(pid):
+    """Resident memory (MB) of a process and all of its children - Linux /proc only"""
+    if not pid:
+        return 0.0
+
+    children = {}
+    try:
+        for entry in os.listdir('/proc'):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f'/proc/{entry}/stat') as f:
+                    # Field 4 is the parent pid; the command name may contain spaces
+                    ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+                children.setdefault(ppid, []).append(int(entry))
+            except (OSError, ValueError, IndexError):
+                continue
+    except OSError:
+        return 0.0
+
+    total_kb = 0
+    stack = [pid]
+    while stack:
+        current = stack.pop()
+        try:
+            with open(f'/proc/{current}/status') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        total_kb += int(line.split()[1])
+                        break
+        except (OSError, ValueError):
+            pass
+        stack.extend(children.get(current, []))
+
+    return total_kb / 1024
+
+
+class DriverPool:
+    """Fixed-size pool of warm Chrome drivers leased to scraper workers.
+
+    Drivers are launched lazily (or up front with ``warm_up``), health-checked on
+    every lease, and recycled after ``max_jobs`` zipcodes or once the browser's
+    process tree grows past ``max_rss_mb``. Crashed browsers are replaced.
+    """
+
+    def __init__(self, factory, size=4, max_jobs=25, max_rss_mb=1500):
+        self.factory = factory
+        self.size = max(1, size)
+        self.max_jobs = max_jobs
+        self.max_rss_mb = max_rss_mb
+
+        self._idle = []
+        self._jobs = {}
+        self._live = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+        self._stats = {
+            'launches': 0,
+            'launch_failures': 0,
+            'leases': 0,
+            'reuses': 0,
+            'recycled_jobs': 0,
+            'recycled_memory': 0,
+            'shrunk': 0,
+            'crashes': 0,
+            'launch_time': 0.0,
+        }
+
+    def _launch(self, thread_id):
+        """Start a new browser via the factory (called without the pool lock held)"""
+        start = time.time()
+        try:
+            driver = self.factory(thread_id)
+        except Exception:
+            with self._cond:
+                self._live -= 1
+                self._stats['launch_failures'] += 1
+                self._cond.notify()
+            raise
+
+        with self._cond:
+            self._stats['launches'] += 1
+            self._stats['launch_time'] += time.time() - start
+            self._jobs[id(driver)] = 0
+        return driver
+
+    def _discard(self, driver):
+        """Quit a driver and free its slot"""
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        with self._cond:
+            self._jobs.pop(id(driver), None)
+            self._live -= 1
+            self._cond.notify()
+
+    @staticmethod
+    def is_healthy(driver):
+        """Cheap liveness probe: a dead browser fails any WebDriver round trip"""
+        try:
+            driver.current_window_handle
+            return True
+        except Exception:
+            return False
+
+    def warm_up(self, thread_id=0):
+        """Launch browsers until the pool is full so the first leases are instant"""
+        while True:
+            with self._cond:
+                if self._closed or self._live >= self.size:
+                    return
+                self._live += 1
+            driver = self._launch(thread_id)
+            with self._cond:
+                self._idle.append(driver)
+                self._cond.notify()
+
+    def acquire(self, thread_id=0):
+        """Lease a healthy driver, launching or replacing one when needed"""
+        while True:
+            with self._cond:
+                while not self._idle and self._live >= self.size and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    raise RuntimeError("Driver pool is closed")
+
+                self._stats['leases'] += 1
+                if self._idle:
+                    driver = self._idle.pop()
+                else:
+                    driver = None
+                    self._live += 1
+
+            if driver is None:
+                return self._launch(thread_id)
+
+            if self.is_healthy(driver):
+                with self._cond:
+                    self._stats['reuses'] += 1
+                return driver
+
+            logger.warning(f"[Thread-{thread_id}] Pooled browser is unresponsive, replacing it")
+            with self._cond:
+                self._stats['crashes'] += 1
+                self._stats['leases'] -= 1
+            self._discard(driver)
+
+    def release(self, driver, failed=False):
+        """Return a driver to the pool, recycling it if it is worn out or broken"""
+        with self._cond:
+            jobs = self._jobs.get(id(driver), 0) + 1
+            self._jobs[id(driver)] = jobs
+            closed = self._closed
+
+        if closed:
+            self._discard(driver)
+            return
+
+        if failed and not self.is_healthy(driver):
+            with self._cond:
+                self._stats['crashes'] += 1
+            self._discard(driver)
+            return
+
+        if self.max_jobs and jobs >= self.max_jobs:
+            with self._cond:
+                self._stats['recycled_jobs'] += 1
+            self._discard(driver)
+            return
+
+        if self.max_rss_mb:
+            rss = get_process_tree_rss_mb(getattr(driver, 'browser_pid', None))
+            if rss > self.max_rss_mb:
+                logger.info(f"Recycling browser using {rss:.0f} MB after {jobs} jobs")
+                with self._cond:
+                    self._stats['recycled_memory'] += 1
+                self._discard(driver)
+                return
+
+        with self._cond:
+            # The pool was resized below its live count; retire this browser
+            if self._live > self.size:
+                self._stats['shrunk'] += 1
+                self._jobs.pop(id(driver), None)
+                self._live -= 1
+                surplus = [driver]
+            else:
+                self._idle.append(driver)
+                surplus = []
+            self._cond.notify()
+
+        for driver in surplus:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+    def resize(self, size):
+        """Change the number of browsers; surplus idle ones quit now, leased ones on release"""
+        with self._cond:
+            self.size = max(1, size)
+            surplus = []
+            while self._idle and self._live > self.size:
+                driver = self._idle.pop(0)
+                self._jobs.pop(id(driver), None)
+                self._live -= 1
+                surplus.append(driver)
+            self._stats['shrunk'] += len(surplus)
+            self._cond.notify_all()
+
+        for driver in surplus:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+    def stats(self):
+        """Snapshot of pool counters plus the launch time saved by reuse"""
+        with self._cond:
+            stats = dict(self._stats)
+            stats['live'] = self._live
+            stats['idle'] = len(self._idle)
+
+        launches = stats['launches']
+        stats['avg_launch_time'] = stats['launch_time'] / launches if launches else 0.0
+        stats['estimated_time_saved'] = stats['reuses'] * stats['avg_launch_time']
+        return stats
+
+    def close(self):
+        """Quit every idle driver; leased drivers are quit when released"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+
+        for driver in idle:
+            self._discard(driver)
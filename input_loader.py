@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+
+"""
+Zipcode Input Loader for the Google Maps Scraper
+Reads only the zipcode column of xlsx, CSV or Parquet sheets and caches the
+normalized zipcode list and previews by file path, modification time and column
+"""
+
+import os
+import threading
+import logging
+from collections import OrderedDict
+
+import pandas as pd
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ZIPCODE_COLUMN = "DELIVERY ZIPCODE"
+
+# Input sheets the scraper accepts (Parquet needs pyarrow)
+INPUT_EXTENSIONS = (".xlsx", ".csv") + ((".parquet",) if pq else ())
+
+PREVIEW_ROWS = 10
+
+# Parsed files kept in memory; zipcode lists are small even for 200k-row sheets
+CACHE_ENTRIES = 32
+
+
+def normalize_zipcode(value):
+    """Five-digit string for a sheet cell, or None for blanks (Excel turns 02134 into 2134 or 2134.0)"""
+    if value is None:
+        return None
+    if isinstance(value, float):
+        if value != value:
+            return None
+        if value.is_integer():
+            value = int(value)
+    text = str(value).strip()
+    if not text or text.lower() == "nan":
+        return None
+    return text.zfill(5)
+
+
+def read_table(source, name=None, columns=None, nrows=None):
+    """DataFrame from an xlsx/CSV/Parquet path or upload, limited to ``columns`` and ``nrows``"""
+    extension = os.path.splitext(name or source)[1].lower()
+    dtype = {c: str for c in columns} if columns else None
+
+    if extension == ".csv":
+        return pd.read_csv(source, usecols=columns, dtype=dtype, nrows=nrows)
+    if extension == ".parquet":
+        if pq is None:
+            raise RuntimeError("Parquet input requires pyarrow (pip install pyarrow)")
+        if nrows is None:
+            return pd.read_parquet(source, columns=columns)
+        batch = next(pq.ParquetFile(source).iter_batches(batch_size=nrows, columns=columns), None)
+        return batch.to_pandas() if batch is not None else pd.DataFrame(columns=columns)
+    if extension == ".xlsx":
+        return pd.read_excel(source, usecols=columns, dtype=dtype, nrows=nrows)
+    raise ValueError(f"Unsupported input file: {name or source} (expected {', '.join(INPUT_EXTENSIONS)})")
+
+
+def _read_xlsx_column(path, column):
+    """Cells of one column from the first sheet, streamed without loading the others"""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[0]
+        header = next(sheet.iter_rows(min_row=1, max_row=1, values_only=True), ())
+        names = [str(h).strip() if h is not None else "" for h in header]
+        if column not in names:
+            raise KeyError(column)
+        index = names.index(column) + 1
+        return [row[0] for row in sheet.iter_rows(min_row=2, min_col=index, max_col=index, values_only=True)]
+    finally:
+        workbook.close()
+
+
+class InputLoader:
+    """Zipcode lists, headers and previews of input files, cached until the file changes.
+
+    Keys include the file's mtime and size, so re-uploading a sheet under the
+    same name invalidates its entries without any explicit eviction.
+    """
+
+    def __init__(self, max_entries=CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0}
+
+    def _cached(self, kind, path, extra, load):
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        key = (kind, path, stat.st_mtime_ns, stat.st_size, extra)
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._stats['hits'] += 1
+                return self._entries[key]
+            self._stats['misses'] += 1
+
+        value = load(path)
+        with self._lock:
+            self._entries[key] = value
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def zipcodes(self, path, column=DEFAULT_ZIPCODE_COLUMN):
+        """Unique normalized zipcodes in file order"""
+        def load(path):
+            try:
+                if path.lower().endswith(".xlsx"):
+                    values = _read_xlsx_column(path, column)
+                else:
+                    values = read_table(path, columns=[column])[column].tolist()
+            except (KeyError, ValueError) as e:
+                if column in str(e):
+                    raise ValueError(f"Column '{column}' not found in {os.path.basename(path)}") from None
+                raise
+            zipcodes = dict.fromkeys(z for z in map(normalize_zipcode, values) if z)
+            logger.info(f"Loaded {len(zipcodes)} unique zipcodes from {os.path.basename(path)} ({len(values)} rows)")
+            return list(zipcodes)
+
+        return list(self._cached("zipcodes", path, column, load))
+
+    def preview(self, path, rows=PREVIEW_ROWS):
+        """First ``rows`` rows of the file"""
+        return self._cached("preview", path, rows, lambda path: read_table(path, nrows=rows)).copy()
+
+    def columns(self, path):
+        """Header of the file"""
+        return list(self.preview(path).columns)
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, entries=len(self._entries))
+
+
+# Process-wide loader shared by the CLI, the queue publisher and every Streamlit session
+LOADER = InputLoader()
+
+
+def load_zipcodes(path, column=DEFAULT_ZIPCODE_COLUMN):
+    """Unique normalized zipcodes of ``column`` in ``path`` (cached)"""
+    return LOADER.zipcodes(path, column)
+
+
+def list_input_files(folder):
+    """Input sheets in ``folder``"""
+    try:
+        return sorted(f for f in os.listdir(folder) if f.lower().endswith(INPUT_EXTENSIONS))
+    except OSError:
+        return []
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+
+"""
+Stage Metrics for the Google Maps Scraper
+Thread-safe counters and histograms for every scraping stage, exposed in the
+Prometheus text format over HTTP and summarized per run
+"""
+
+import time
+import bisect
+import threading
+import logging
+from contextlib import contextmanager
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+logger = logging.getLogger(__name__)
+
+# Histogram buckets in seconds, from a fast script call to a slow zipcode
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+# Samples kept per series for percentiles in run summaries
+RESERVOIR_SIZE = 5000
+
+HELP = {
+    "scraper_stage_seconds": "Time spent per scraping stage",
+    "scraper_rate_limit_wait_seconds": "Time spent waiting for the shared rate limiter",
+    "scraper_cards_total": "Result cards by outcome",
+    "scraper_zipcodes_total": "Finished zipcodes by status",
+    "scraper_records_total": "Records handed to the output writer",
+    "scraper_errors_total": "Errors by stage and exception type",
+}
+
+
+def _label_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+
+class MetricsRegistry:
+    """Counters and histograms keyed by metric name and labels"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Forget everything (start of a run)"""
+        with self._lock:
+            self._counters = {}
+            self._histograms = {}
+            self._started = time.time()
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name, value, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = {
+                    'buckets': [0] * len(self.buckets), 'count': 0, 'sum': 0.0, 'samples': []
+                }
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                hist['buckets'][index] += 1
+            hist['count'] += 1
+            hist['sum'] += value
+            if len(hist['samples']) < RESERVOIR_SIZE:
+                hist['samples'].append(value)
+            else:
+                hist['samples'][hist['count'] % RESERVOIR_SIZE] = value
+
+    @contextmanager
+    def timer(self, name="scraper_stage_seconds", **labels):
+        """Observe the duration of the ``with`` block"""
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.observe(name, time.time() - start, **labels)
+
+    def snapshot(self, reset=False):
+        """Picklable copy of all series (optionally clearing them, for shipping deltas)"""
+        with self._lock:
+            snap = {
+                'counters': dict(self._counters),
+                'histograms': {k: {**h, 'buckets': list(h['buckets']), 'samples': list(h['samples'])}
+                               for k, h in self._histograms.items()},
+            }
+            if reset:
+                self._counters = {}
+                self._histograms = {}
+        return snap
+
+    def merge(self, snap):
+        """Add a snapshot from another process into this registry"""
+        with self._lock:
+            for key, value in snap['counters'].items():
+                self._counters[key] = self._counters.get(key, 0) + value
+            for key, other in snap['histograms'].items():
+                hist = self._histograms.setdefault(
+                    key, {'buckets': [0] * len(self.buckets), 'count': 0, 'sum': 0.0, 'samples': []})
+                hist['buckets'] = [a + b for a, b in zip(hist['buckets'], other['buckets'])]
+                hist['count'] += other['count']
+                hist['sum'] += other['sum']
+                hist['samples'] = (hist['samples'] + other['samples'])[-RESERVOIR_SIZE:]
+
+    def render_prometheus(self):
+        """All series in the Prometheus text exposition format"""
+        snap = self.snapshot()
+        lines = []
+        names = sorted({name for name, _ in snap['counters']} | {name for name, _ in snap['histograms']})
+        for name in names:
+            if name in HELP:
+                lines.append(f"# HELP {name} {HELP[name]}")
+            counters = [(k, v) for (n, k), v in snap['counters'].items() if n == name]
+            histograms = [(k, h) for (n, k), h in snap['histograms'].items() if n == name]
+            if counters:
+                lines.append(f"# TYPE {name} counter")
+                for key, value in sorted(counters):
+                    lines.append(f"{name}{_format_labels(key)} {value}")
+            if histograms:
+                lines.append(f"# TYPE {name} histogram")
+                for key, hist in sorted(histograms, key=lambda item: item[0]):
+                    cumulative = 0
+                    for bound, count in zip(self.buckets, hist['buckets']):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_format_labels(key, [('le', bound)])} {cumulative}")
+                    lines.append(f"{name}_bucket{_format_labels(key, [('le', '+Inf')])} {hist['count']}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {hist['sum']:.6f}")
+                    lines.append(f"{name}_count{_format_labels(key)} {hist['count']}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        """Machine-readable per-run summary: histogram stats and counter totals"""
+        snap = self.snapshot()
+        histograms = {}
+        for (name, key), hist in sorted(snap['histograms'].items()):
+            samples = sorted(hist['samples'])
+
+            def pick(q):
+                return samples[min(len(samples) - 1, int(round(q * (len(samples) - 1))))] if samples else 0.0
+
+            label = ",".join(f"{k}={v}" for k, v in key)
+            histograms.setdefault(name, {})[label or "all"] = {
+                'count': hist['count'],
+                'total': round(hist['sum'], 3),
+                'mean': round(hist['sum'] / hist['count'], 3) if hist['count'] else 0.0,
+                'p50': round(pick(0.5), 3),
+                'p90': round(pick(0.9), 3),
+                'p99': round(pick(0.99), 3),
+                'max': round(samples[-1], 3) if samples else 0.0,
+            }
+
+        counters = {}
+        for (name, key), value in sorted(snap['counters'].items()):
+            label = ",".join(f"{k}={v}" for k, v in key)
+            counters.setdefault(name, {})[label or "all"] = value
+
+        return {
+            'started': self._started,
+            'duration': time.time() - self._started,
+            'histograms': histograms,
+            'counters': counters,
+        }
+
+
+# Process-wide default registry, shared by every module that records metrics
+REGISTRY = MetricsRegistry()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry = REGISTRY
+
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/metrics', '/'):
+            self.send_response(404)
+            self.end_headers()
+            return
+        body = self.registry.render_prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port, registry=REGISTRY, host='0.0.0.0'):
+    """Serve ``/metrics`` on a daemon thread; returns the server"""
+    handler = type('MetricsHandler', (_MetricsHandler,), {'registry': registry})
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    logger.info(f"Metrics endpoint listening on {host}:{port}/metrics")
+    return server
+
+
+def format_summary(summary, overview=None):
+    """Plain-text rendering of ``summary`` for the summary_report_* files"""
+    lines = ["=" * 70, "SCRAPING RUN SUMMARY", "=" * 70]
+    for key, value in (overview or {}).items():
+        lines.append(f"{key:<24} {value}")
+
+    stages = summary['histograms'].get('scraper_stage_seconds', {})
+    if stages:
+        lines += ["", "STAGE TIMINGS (seconds)",
+                  f"{'stage':<28}{'count':>7}{'total':>10}{'mean':>8}{'p50':>8}{'p90':>8}{'p99':>8}"]
+        for label, stats in sorted(stages.items(), key=lambda item: -item[1]['total']):
+            lines.append(f"{label.replace('stage=', ''):<28}{stats['count']:>7}{stats['total']:>10.1f}"
+                         f"{stats['mean']:>8.2f}{stats['p50']:>8.2f}{stats['p90']:>8.2f}{stats['p99']:>8.2f}")
+
+    waits = summary['histograms'].get('scraper_rate_limit_wait_seconds', {}).get('all')
+    if waits:
+        lines += ["", f"Rate limit waits: {waits['count']} ({waits['total']:.1f}s total, p90 {waits['p90']:.2f}s)"]
+
+    for name, title in (("scraper_cards_total", "CARDS"), ("scraper_zipcodes_total", "ZIPCODES"),
+                        ("scraper_errors_total", "ERRORS")):
+        series = summary['counters'].get(name)
+        if series:
+            lines += ["", title]
+            for label, value in sorted(series.items()):
+                lines.append(f"  {label:<50} {value}")
+
+    lines.append("=" * 70)
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+
+"""
+Output Catalog for the Google Maps Scraper
+Keeps an incrementally refreshed index of the output folder for paginated
+listings and builds "download all" archives on disk, once per output set
+"""
+
+import os
+import time
+import zipfile
+import hashlib
+import tempfile
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Seconds between rescans when the folder itself looks unchanged
+# (files growing during a run do not touch the directory's mtime)
+RESCAN_SECONDS = 10
+
+# Already-compressed formats are stored rather than deflated again
+STORED_EXTENSIONS = (".xlsx", ".parquet", ".zip")
+
+
+class OutputCatalog:
+    """Index of the files in an output folder.
+
+    ``refresh`` only rescans when the directory changed or ``rescan_seconds``
+    passed, and then stats each file once; listings are served from the
+    sorted in-memory index. Archives of the whole result set are written to
+    ``archive_dir`` and reused until a file is added, removed or modified.
+    """
+
+    def __init__(self, folder, archive_dir=None, rescan_seconds=RESCAN_SECONDS):
+        self.folder = folder
+        self.archive_dir = archive_dir or os.path.join(tempfile.gettempdir(), "scraper_archives")
+        self.rescan_seconds = rescan_seconds
+
+        self._files = {}
+        self._sorted = []
+        self._dir_mtime = None
+        self._scanned_at = 0.0
+        self._lock = threading.Lock()
+        self._archive_lock = threading.Lock()
+        self._stats = {'scans': 0, 'archives_built': 0, 'archive_hits': 0}
+
+    def refresh(self, force=False):
+        """Rescan the folder if it may have changed; returns True when the index changed"""
+        try:
+            dir_mtime = os.stat(self.folder).st_mtime_ns
+        except OSError:
+            dir_mtime = None
+
+        with self._lock:
+            if not force and dir_mtime == self._dir_mtime and time.time() - self._scanned_at < self.rescan_seconds:
+                return False
+
+        files = {}
+        try:
+            with os.scandir(self.folder) as entries:
+                for entry in entries:
+                    if entry.name.startswith('.'):
+                        continue
+                    try:
+                        if not entry.is_file():
+                            continue
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    files[entry.name] = {'name': entry.name, 'size': stat.st_size, 'mtime': stat.st_mtime}
+        except OSError as e:
+            logger.warning(f"Could not scan {self.folder}: {e}")
+
+        with self._lock:
+            changed = files != self._files
+            if changed:
+                self._files = files
+                self._sorted = sorted(files.values(), key=lambda f: (-f['mtime'], f['name']))
+            self._dir_mtime = dir_mtime
+            self._scanned_at = time.time()
+            self._stats['scans'] += 1
+        return changed
+
+    def _select(self, extensions=None, prefix=None):
+        self.refresh()
+        with self._lock:
+            return [f for f in self._sorted
+                    if (not extensions or f['name'].lower().endswith(tuple(extensions)))
+                    and (not prefix or f['name'].startswith(prefix))]
+
+    def count(self, extensions=None, prefix=None):
+        return len(self._select(extensions, prefix))
+
+    def files(self, extensions=None, prefix=None):
+        """Matching files, newest first"""
+        return [dict(f) for f in self._select(extensions, prefix)]
+
+    def page(self, number, per_page=25, extensions=None, prefix=None):
+        """(files on page ``number`` counting from 0, total matching, page count)"""
+        selected = self._select(extensions, prefix)
+        pages = max(1, -(-len(selected) // per_page))
+        number = min(max(0, number), pages - 1)
+        start = number * per_page
+        return [dict(f) for f in selected[start:start + per_page]], len(selected), pages
+
+    def path(self, name):
+        """Absolute path of an indexed file (names never leave the folder)"""
+        return os.path.join(self.folder, os.path.basename(name))
+
+    def remove(self, name):
+        os.remove(self.path(name))
+        with self._lock:
+            if self._files.pop(name, None):
+                self._sorted = [f for f in self._sorted if f['name'] != name]
+
+    def signature(self, extensions=None):
+        """Digest of names, sizes and mtimes; changes whenever the output set does"""
+        digest = hashlib.sha1()
+        for f in sorted(self._select(extensions), key=lambda f: f['name']):
+            digest.update(f"{f['name']}\0{f['size']}\0{f['mtime']}\n".encode())
+        return digest.hexdigest()[:16]
+
+    def archive(self, extensions=None):
+        """Path of a ZIP of every matching file, built on disk only when the set changed"""
+        files = self._select(extensions)
+        name = f"results_{self.signature(extensions)}.zip"
+        path = os.path.join(self.archive_dir, name)
+
+        with self._archive_lock:
+            if os.path.exists(path):
+                self._stats['archive_hits'] += 1
+                return path
+
+            os.makedirs(self.archive_dir, exist_ok=True)
+            start = time.time()
+            fd, tmp_path = tempfile.mkstemp(dir=self.archive_dir, suffix=".partial")
+            os.close(fd)
+            try:
+                # Entries are copied from disk in chunks; nothing is held in memory
+                with zipfile.ZipFile(tmp_path, 'w', zipfile.ZIP_DEFLATED, allowZip64=True) as zf:
+                    for f in files:
+                        compression = zipfile.ZIP_STORED if f['name'].lower().endswith(STORED_EXTENSIONS) \
+                            else zipfile.ZIP_DEFLATED
+                        try:
+                            zf.write(self.path(f['name']), f['name'], compress_type=compression)
+                        except FileNotFoundError:
+                            continue
+                os.replace(tmp_path, path)
+            except BaseException:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+                raise
+
+            # Archives of older output sets are never served again
+            for old in os.listdir(self.archive_dir):
+                if old.startswith("results_") and old != name:
+                    try:
+                        os.remove(os.path.join(self.archive_dir, old))
+                    except OSError:
+                        pass
+
+            self._stats['archives_built'] += 1
+            logger.info(f"Built {name} with {len(files)} files in {time.time() - start:.1f}s")
+            return path
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, files=len(self._files))
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+
+"""
+Streaming Output Writer for the Google Maps Scraper
+Workers hand records to one background thread that appends them to a per-run
+CSV, SQLite or Parquet sink in batches; Excel is exported once at the end
+"""
+
+import os
+import csv
+import time
+import queue
+import sqlite3
+import threading
+import logging
+
+import pandas as pd
+
+from metrics import REGISTRY as metrics
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+logger = logging.getLogger(__name__)
+
+# Every sink uses the same columns so batches from any mode can be appended
+OUTPUT_COLUMNS = [
+    "Query", "Zipcode", "Name", "Location", "Phone Number", "Email Address",
+    "Rating", "Website", "Reviews", "Category", "Place URL"
+]
+
+OUTPUT_FORMATS = ["csv", "sqlite"] + (["parquet"] if pa else [])
+
+_STOP = object()
+
+
+def normalize_row(record, query, zipcode):
+    """Project a scraped record onto OUTPUT_COLUMNS as strings"""
+    row = {"Query": query, "Zipcode": str(zipcode)}
+    for column in OUTPUT_COLUMNS[2:]:
+        value = record.get(column, "")
+        row[column] = "" if value is None else str(value)
+    return row
+
+
+class CsvSink:
+    extension = "csv"
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._file, fieldnames=OUTPUT_COLUMNS)
+        self._writer.writeheader()
+
+    def write_batch(self, rows):
+        self._writer.writerows(rows)
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def read_all(self):
+        return pd.read_csv(self.path, dtype=str, keep_default_na=False)
+
+
+class SqliteSink:
+    extension = "sqlite"
+
+    def __init__(self, path):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        columns = ", ".join(f'"{c}" TEXT' for c in OUTPUT_COLUMNS)
+        self._conn.execute(f"CREATE TABLE IF NOT EXISTS records ({columns})")
+        self._conn.commit()
+
+    def write_batch(self, rows):
+        placeholders = ", ".join("?" for _ in OUTPUT_COLUMNS)
+        self._conn.executemany(
+            f"INSERT INTO records VALUES ({placeholders})",
+            [tuple(row[c] for c in OUTPUT_COLUMNS) for row in rows]
+        )
+        self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+    def read_all(self):
+        with sqlite3.connect(self.path) as conn:
+            return pd.read_sql_query("SELECT * FROM records", conn)
+
+
+class ParquetSink:
+    extension = "parquet"
+
+    def __init__(self, path):
+        if pa is None:
+            raise RuntimeError("Parquet output requires pyarrow (pip install pyarrow)")
+        self.path = path
+        self._schema = pa.schema([(c, pa.string()) for c in OUTPUT_COLUMNS])
+        self._writer = pq.ParquetWriter(path, self._schema)
+
+    def write_batch(self, rows):
+        self._writer.write_table(pa.Table.from_pylist(rows, schema=self._schema))
+
+    def close(self):
+        self._writer.close()
+
+    def read_all(self):
+        return pd.read_parquet(self.path)
+
+
+SINKS = {
+    "csv": CsvSink,
+    "sqlite": SqliteSink,
+    "parquet": ParquetSink,
+}
+
+
+class OutputWriter:
+    """Single background writer fed through a queue.
+
+    ``submit`` never blocks on serialization; rows are appended to the sink in
+    batches of ``batch_size`` or every ``flush_interval`` seconds. ``close``
+    drains the queue and, if requested, writes one Excel export of the run.
+    Batches are also upserted into ``results_store`` when one is given.
+    """
+
+    def __init__(self, folder, run_name, fmt="csv", batch_size=500, flush_interval=5.0, excel_export=True,
+                 results_store=None):
+        if fmt not in SINKS:
+            raise ValueError(f"Unknown output format: {fmt}")
+
+        self.folder = folder
+        self.run_name = run_name
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.excel_export = excel_export
+        self.results_store = results_store
+
+        os.makedirs(folder, exist_ok=True)
+        self.sink = SINKS[fmt](os.path.join(folder, f"{run_name}.{SINKS[fmt].extension}"))
+        self.excel_path = None
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._stats = {"submitted": 0, "written": 0, "failed": 0, "store_failed": 0, "batches": 0, "write_time": 0.0}
+        self._thread = threading.Thread(target=self._run, name="output-writer", daemon=True)
+        self._thread.start()
+
+    @property
+    def path(self):
+        return self.sink.path
+
+    def submit(self, records, query, zipcode, places=None):
+        """Queue one zipcode's records for writing.
+
+        ``places`` is the zipcode's full result set when ``records`` were
+        deduplicated against other zipcodes; the results store gets every place
+        under this zipcode, the output file only the new ones.
+        """
+        rows = [normalize_row(r, query, zipcode) for r in records]
+        store_rows = rows if places is None else [normalize_row(r, query, zipcode) for r in places]
+        with self._lock:
+            self._stats["submitted"] += len(rows)
+        self._queue.put((rows, store_rows))
+
+    def _flush(self, batch, store_batch):
+        start = time.time()
+        written = failed = store_failed = 0
+        if batch:
+            try:
+                self.sink.write_batch(batch)
+                written = len(batch)
+                metrics.observe("scraper_stage_seconds", time.time() - start, stage="write_batch")
+            except Exception as e:
+                # The results store is still fed below; the loss shows up in stats()["failed"]
+                failed = len(batch)
+                logger.error(f"Output writer failed to write {failed} rows: {e}")
+        if self.results_store and store_batch:
+            try:
+                with metrics.timer(stage="results_store"):
+                    self.results_store.add_rows(store_batch, self.run_name)
+            except Exception as e:
+                store_failed = len(store_batch)
+                logger.error(f"Could not add {store_failed} rows to the results store: {e}")
+        with self._lock:
+            self._stats["written"] += written
+            self._stats["failed"] += failed
+            self._stats["store_failed"] += store_failed
+            if written:
+                self._stats["batches"] += 1
+                self._stats["write_time"] += time.time() - start
+
+    def _run(self):
+        batch = []
+        store_batch = []
+        last_flush = time.time()
+        while True:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                self._flush(batch, store_batch)
+                return
+            if item:
+                batch.extend(item[0])
+                store_batch.extend(item[1])
+
+            if (batch or store_batch) and (max(len(batch), len(store_batch)) >= self.batch_size
+                                           or time.time() - last_flush >= self.flush_interval):
+                self._flush(batch, store_batch)
+                batch = []
+                store_batch = []
+                last_flush = time.time()
+
+    def close(self):
+        """Drain pending rows, close the sink and produce the final Excel export"""
+        self._queue.put(_STOP)
+        self._thread.join()
+        self.sink.close()
+
+        if self.excel_export and self._stats["written"]:
+            self.excel_path = os.path.join(self.folder, f"{self.run_name}.xlsx")
+            with metrics.timer(stage="excel_export"):
+                self.sink.read_all().to_excel(self.excel_path, index=False, engine="openpyxl")
+            logger.info(f"Exported {self._stats['written']} records to {self.excel_path}")
+
+        return self.excel_path
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
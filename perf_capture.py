@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+
+"""
+Chrome Performance Capture for the Google Maps Scraper
+Samples CDP Performance and Network counters around every zipcode job and
+appends one compact JSON line per zipcode to a per-job trace file
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import statistics
+import logging
+
+logger = logging.getLogger(__name__)
+
+# CDP Performance.getMetrics names and the short keys used in trace files
+CAPTURED_METRICS = {
+    "JSHeapUsedSize": "heap",
+    "JSHeapTotalSize": "heap_total",
+    "Nodes": "nodes",
+    "JSEventListeners": "listeners",
+    "Documents": "documents",
+    "TaskDuration": "task",
+    "ScriptDuration": "script",
+    "LayoutDuration": "layout",
+    "RecalcStyleDuration": "style",
+}
+
+# Counters Chrome accumulates over the renderer's lifetime; traces store per-zipcode deltas
+CUMULATIVE = ("task", "script", "layout", "style")
+
+# Trace fields the summarizer reports percentiles for
+SUMMARY_FIELDS = ("t", "bytes", "req", "task", "heap_peak", "nodes_peak")
+
+MB = 1024 * 1024
+
+
+def trace_path(folder_name, job_id):
+    """Per-job trace file next to the job's output"""
+    return os.path.join(folder_name, f"perf_trace_{job_id}.jsonl")
+
+
+def parse_metrics(response):
+    """{short key: value} from a Performance.getMetrics response"""
+    values = {}
+    for metric in (response or {}).get("metrics", []):
+        key = CAPTURED_METRICS.get(metric.get("name"))
+        if key:
+            values[key] = metric.get("value", 0)
+    return values
+
+
+def network_totals(log_entries):
+    """Bytes, requests and failed/blocked requests in Chrome performance log entries"""
+    totals = {"bytes": 0, "req": 0, "fail": 0}
+    for entry in log_entries:
+        try:
+            message = json.loads(entry["message"])["message"]
+        except (KeyError, ValueError, TypeError):
+            continue
+        method = message.get("method")
+        if method == "Network.requestWillBeSent":
+            totals["req"] += 1
+        elif method == "Network.loadingFinished":
+            totals["bytes"] += int(message.get("params", {}).get("encodedDataLength", 0))
+        elif method == "Network.loadingFailed":
+            totals["fail"] += 1
+    return totals
+
+
+class ZipcodeProbe:
+    """Performance samples for one zipcode job on one browser"""
+
+    def __init__(self, trace, zipcode, browser, seq, baseline):
+        self.trace = trace
+        self.zipcode = zipcode
+        self.browser = browser
+        self.seq = seq
+        self.started = time.time()
+        self.baseline = baseline or {}
+        self.samples = [baseline] if baseline else []
+        self.stages = {}
+
+    def mark(self, stage, metrics):
+        """Memory and DOM size after ``stage`` (e.g. search, scroll)"""
+        if not metrics:
+            return
+        self.samples.append(metrics)
+        self.stages[stage] = [round(metrics.get("heap", 0) / MB, 1), int(metrics.get("nodes", 0)),
+                              round(time.time() - self.started, 2)]
+
+    def finish(self, result, network, metrics):
+        """Write the zipcode's trace line; never raises"""
+        try:
+            if metrics:
+                self.samples.append(metrics)
+            final = metrics or (self.samples[-1] if self.samples else {})
+            record = {
+                "z": str(self.zipcode),
+                "st": (result or {}).get("status", "error"),
+                "n": (result or {}).get("count", 0),
+                "t": round((result or {}).get("time") or time.time() - self.started, 2),
+                "ts": round(self.started, 1),
+                "b": self.browser,
+                "seq": self.seq,
+            }
+            record.update(network or {})
+            for key in CUMULATIVE:
+                if key in final:
+                    start, end = self.baseline.get(key, 0), final[key]
+                    # A renderer swap on navigation restarts Chrome's counters
+                    record[key] = round(end - start if end >= start else end, 3)
+            if "heap" in final:
+                record["heap"] = round(final["heap"] / MB, 1)
+                record["heap_peak"] = round(max(s.get("heap", 0) for s in self.samples) / MB, 1)
+            if "heap_total" in final:
+                record["heap_total"] = round(final["heap_total"] / MB, 1)
+            if "nodes" in final:
+                record["nodes"] = int(final["nodes"])
+                record["nodes_peak"] = int(max(s.get("nodes", 0) for s in self.samples))
+            if "listeners" in final:
+                record["listeners"] = int(final["listeners"])
+            if self.stages:
+                record["stages"] = self.stages
+            self.trace.write(record)
+        except Exception as e:
+            logger.warning(f"Could not record performance trace for {self.zipcode}: {e}")
+
+
+class PerfTrace:
+    """Append-only JSONL trace of per-zipcode Chrome performance samples.
+
+    Lines are written with a single append each, so threads and worker
+    processes can share one file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._jobs = {}
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+    def start(self, zipcode, browser, baseline):
+        """Begin a probe; ``browser`` identifies the renderer across jobs (pid, tab id)"""
+        with self._lock:
+            seq = self._jobs.get(browser, 0)
+            self._jobs[browser] = seq + 1
+        return ZipcodeProbe(self, zipcode, browser, seq, baseline)
+
+    def write(self, record):
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with self._lock:
+            with open(self.path, "a") as f:
+                f.write(line)
+
+
+def load_trace(path):
+    """Trace records, skipping lines cut short by a crash"""
+    records = []
+    try:
+        with open(path) as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+    except OSError:
+        pass
+    return records
+
+
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))] if values else 0
+
+
+def _correlation(xs, ys):
+    """Pearson correlation, or None when either side is constant"""
+    if len(xs) < 3:
+        return None
+    mx, my = statistics.fmean(xs), statistics.fmean(ys)
+    sxy = sum((x - mx) * (y - my) for x, y in zip(xs, ys))
+    sxx = sum((x - mx) ** 2 for x in xs)
+    syy = sum((y - my) ** 2 for y in ys)
+    return round(sxy / (sxx * syy) ** 0.5, 2) if sxx and syy else None
+
+
+def _slope(xs, ys):
+    """Least-squares slope of ``ys`` over ``xs``"""
+    mx, my = statistics.fmean(xs), statistics.fmean(ys)
+    sxx = sum((x - mx) ** 2 for x in xs)
+    return sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / sxx if sxx else 0.0
+
+
+def summarize(records, top=5):
+    """Percentiles, what run time tracks with, the slowest zipcodes and heap growth per browser"""
+    scraped = [r for r in records if r.get("t") is not None]
+    fields = {}
+    for field in SUMMARY_FIELDS:
+        values = [r[field] for r in scraped if r.get(field) is not None]
+        if values:
+            fields[field] = {"p50": _percentile(values, 0.5), "p90": _percentile(values, 0.9),
+                             "max": max(values), "total": round(sum(values), 2)}
+
+    # Which page-weight signal explains slow zipcodes
+    correlations = {}
+    for field in ("bytes", "req", "nodes_peak", "task"):
+        pairs = [(r[field], r["t"]) for r in scraped if r.get(field) is not None]
+        if pairs:
+            value = _correlation([p[0] for p in pairs], [p[1] for p in pairs])
+            if value is not None:
+                correlations[field] = value
+
+    slowest = [
+        {k: r.get(k) for k in ("z", "st", "t", "n", "bytes", "req", "task", "heap_peak", "nodes_peak")}
+        for r in sorted(scraped, key=lambda r: -r["t"])[:top]
+    ]
+
+    # Heap left behind after each job on the same renderer; a steady climb is a leak
+    by_browser = {}
+    for r in scraped:
+        if r.get("heap") is not None:
+            by_browser.setdefault(str(r.get("b")), []).append((r.get("seq", 0), r["heap"]))
+    growth = {}
+    for browser, points in by_browser.items():
+        if len(points) >= 3:
+            points.sort()
+            growth[browser] = {"jobs": len(points), "first_mb": points[0][1], "last_mb": points[-1][1],
+                               "mb_per_job": round(_slope([p[0] for p in points], [p[1] for p in points]), 2)}
+
+    busy = [r["task"] / r["t"] for r in scraped if r.get("task") is not None and r["t"]]
+    return {
+        "zipcodes": len(scraped),
+        "fields": fields,
+        "correlation_with_time": correlations,
+        "main_thread_busy": round(statistics.fmean(busy), 3) if busy else None,
+        "slowest": slowest,
+        "heap_growth": growth,
+    }
+
+
+def format_perf_summary(summary):
+    """Plain-text rendering of ``summarize`` output"""
+    labels = {"t": "run time (s)", "bytes": "transferred (MB)", "req": "requests", "task": "main-thread task (s)",
+              "heap_peak": "JS heap peak (MB)", "nodes_peak": "DOM nodes peak"}
+    lines = ["CHROME PERFORMANCE", f"Zipcodes traced: {summary['zipcodes']}"]
+    if summary["fields"]:
+        lines.append(f"{'':<24}{'p50':>10}{'p90':>10}{'max':>10}")
+        for field, stats in summary["fields"].items():
+            scale = MB if field == "bytes" else 1
+            lines.append(f"{labels[field]:<24}" + "".join(f"{stats[q] / scale:>10.1f}" for q in ("p50", "p90", "max")))
+    if summary["main_thread_busy"] is not None:
+        lines.append(f"Main thread busy: {summary['main_thread_busy'] * 100:.0f}% of zipcode time")
+    if summary["correlation_with_time"]:
+        lines.append("Run time correlation: " + ", ".join(
+            f"{labels.get(k, k).split(' (')[0]} {v:+.2f}" for k, v in summary["correlation_with_time"].items()))
+    if summary["slowest"]:
+        lines.append("Slowest zipcodes:")
+        for r in summary["slowest"]:
+            lines.append(f"  {r['z']:<8} {r['t']:>7.1f}s {r['n'] or 0:>4} records "
+                         f"{(r['bytes'] or 0) / MB:>7.1f} MB {r['req'] or 0:>5} req "
+                         f"heap {r['heap_peak'] or 0:>6.1f} MB nodes {r['nodes_peak'] or 0}")
+    for browser, g in summary["heap_growth"].items():
+        lines.append(f"Browser {browser}: heap {g['first_mb']:.0f} → {g['last_mb']:.0f} MB over {g['jobs']} jobs "
+                     f"({g['mb_per_job']:+.1f} MB/job)")
+    return "\n".join(lines) + "\n"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize a Chrome performance trace")
+    parser.add_argument("trace", help="perf_trace_<job>.jsonl")
+    parser.add_argument("--top", type=int, default=10, help="Slowest zipcodes to list")
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON")
+    args = parser.parse_args(argv)
+
+    records = load_trace(args.trace)
+    if not records:
+        print(f"✗ No trace records in {args.trace}")
+        return 1
+    summary = summarize(records, args.top)
+    print(json.dumps(summary, indent=2) if args.json else format_perf_summary(summary))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
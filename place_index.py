@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+
+"""
+Cross-Zipcode Place Index for the Google Maps Scraper
+Remembers every business already extracted in a run so overlapping zipcodes
+skip re-clicking it and only record the zipcode -> place association
+"""
+
+import re
+import csv
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from result_cache import normalize_query
+
+# Maps feature id (e.g. !1s0x89c259a61c75684f:0x79d31adb123348d2) or Google place id (!19sChIJ...)
+_FEATURE_ID = re.compile(r'!1s(0x[0-9a-f]+:0x[0-9a-f]+)', re.IGNORECASE)
+_PLACE_ID = re.compile(r'!19s([^!?&/]+)')
+
+
+def place_key_from_url(url):
+    """Stable place identifier from a Maps place URL, or None"""
+    if not url:
+        return None
+    for pattern in (_FEATURE_ID, _PLACE_ID):
+        match = pattern.search(url)
+        if match:
+            return match.group(1).lower()
+    return url.split('?')[0].rstrip('/').lower()
+
+
+def place_key_from_record(record):
+    """Fallback identifier from the normalized phone number and name"""
+    phone = re.sub(r'\D', '', record.get("Phone Number", "") or "")[-10:]
+    name = re.sub(r'[^a-z0-9]', '', (record.get("Name", "") or "").lower())
+    if not name:
+        return None
+    return f"tel:{phone}|{name}" if phone else f"name:{name}|{(record.get('Location') or '').lower()[:40]}"
+
+
+class PlaceIndex:
+    """Run-wide index of extracted places, optionally persisted in SQLite.
+
+    Places are keyed by their Maps place/feature id, with a phone+name key as a
+    fallback when no URL is available. The first record of each place is kept,
+    so a zipcode's full result set can be rebuilt after dedup. Thread-safe.
+    """
+
+    def __init__(self, query="", path=None):
+        self.query = normalize_query(query)
+        self.path = path
+
+        self._lock = threading.Lock()
+        self._keys = {}
+        self._records = {}
+        self._associations = set()
+        self._zipcode_places = {}
+        self._stats = {
+            'cards_seen': 0,
+            'skipped_before_click': 0,
+            'duplicates_after_extract': 0,
+            'unique_places': 0,
+        }
+
+        if path:
+            with self._connect() as conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS places (
+                        query TEXT NOT NULL,
+                        place_key TEXT NOT NULL,
+                        alt_key TEXT,
+                        record TEXT NOT NULL,
+                        PRIMARY KEY (query, place_key)
+                    )
+                """)
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS place_zipcodes (
+                        query TEXT NOT NULL,
+                        place_key TEXT NOT NULL,
+                        zipcode TEXT NOT NULL,
+                        PRIMARY KEY (query, place_key, zipcode)
+                    )
+                """)
+                for place_key, alt_key, record in conn.execute(
+                        "SELECT place_key, alt_key, record FROM places WHERE query = ?", (self.query,)):
+                    self._keys[place_key] = place_key
+                    if alt_key:
+                        self._keys[alt_key] = place_key
+                    self._records[place_key] = json.loads(record)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _associate(self, place_key, zipcode):
+        """Record that ``zipcode`` returned ``place_key`` (caller holds the lock)"""
+        association = (place_key, str(zipcode))
+        if association in self._associations:
+            return
+        self._associations.add(association)
+        self._zipcode_places.setdefault(str(zipcode), []).append(place_key)
+        if self.path:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR IGNORE INTO place_zipcodes (query, place_key, zipcode) VALUES (?, ?, ?)",
+                    (self.query, place_key, str(zipcode))
+                )
+
+    def check_card(self, place_url, zipcode):
+        """True if the card's place is already indexed (association recorded, skip the click)"""
+        key = place_key_from_url(place_url)
+        with self._lock:
+            self._stats['cards_seen'] += 1
+            if key and key in self._keys:
+                self._stats['skipped_before_click'] += 1
+                self._associate(self._keys[key], zipcode)
+                return True
+        return False
+
+    def add(self, record, zipcode):
+        """Index an extracted record; returns False if it duplicates a known place"""
+        url_key = place_key_from_url(record.get("Place URL"))
+        alt_key = place_key_from_record(record)
+        if not url_key and not alt_key:
+            return True
+
+        with self._lock:
+            known = self._keys.get(url_key) or self._keys.get(alt_key)
+            if known:
+                self._stats['duplicates_after_extract'] += 1
+                for key in (url_key, alt_key):
+                    if key:
+                        self._keys.setdefault(key, known)
+                self._associate(known, zipcode)
+                return False
+
+            place_key = url_key or alt_key
+            for key in (url_key, alt_key):
+                if key:
+                    self._keys[key] = place_key
+            self._records[place_key] = record
+            self._stats['unique_places'] += 1
+            self._associate(place_key, zipcode)
+
+            if self.path:
+                with self._connect() as conn:
+                    conn.execute(
+                        "INSERT OR IGNORE INTO places (query, place_key, alt_key, record) VALUES (?, ?, ?, ?)",
+                        (self.query, place_key, alt_key, json.dumps(record))
+                    )
+        return True
+
+    def filter_new(self, records, zipcode):
+        """Records from ``records`` whose place has not been seen yet"""
+        return [record for record in records if self.add(record, zipcode)]
+
+    def records_for(self, zipcode):
+        """Records of every place ``zipcode`` returned, in the order they were seen, including
+        places skipped or dropped because another zipcode found them first"""
+        with self._lock:
+            keys = self._zipcode_places.get(str(zipcode), [])
+            return [dict(self._records[key]) for key in keys if key in self._records]
+
+    def export_associations(self, path):
+        """Write every zipcode -> place association of this run to CSV"""
+        with self._lock:
+            associations = sorted(self._associations, key=lambda a: (a[1], a[0]))
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(["Zipcode", "Place Key"])
+            for place_key, zipcode in associations:
+                writer.writerow([zipcode, place_key])
+        return path
+
+    def stats(self):
+        """Dedup counters for the run"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['associations'] = len(self._associations)
+        avoided = stats['skipped_before_click'] + stats['duplicates_after_extract']
+        total = avoided + stats['unique_places']
+        stats['duplicate_rate'] = avoided / total if total else 0.0
+        return stats
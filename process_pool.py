@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+
+"""
+Process-Pool Execution Mode for the Google Maps Scraper
+Each worker process owns its browser; a supervisor hands out zipcodes, collects
+results over IPC and replaces workers that crash or exceed the job time limit
+"""
+
+import os
+import time
+import queue
+import signal
+import tempfile
+import logging
+import multiprocessing as mp
+
+from metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+# Seconds a single zipcode may run before its worker is killed and replaced
+JOB_TIMEOUT = 900
+
+# How often a zipcode is retried after its worker crashed or timed out
+MAX_RETRIES = 1
+
+
+class RecordCollector:
+    """Stands in for OutputWriter inside a worker; records travel back to the parent"""
+
+    def __init__(self):
+        self.records = []
+
+    def submit(self, records, query, zipcode, places=None):
+        self.records.extend(records)
+
+
+def _worker_main(worker_id, inbox, outbox, config):
+    """Worker process: launch a browser, then scrape zipcodes until told to stop"""
+    # Own process group so the supervisor can kill Chrome along with the worker
+    os.setpgrp()
+
+    import scrape_zip_optimized as scraper
+
+    scraper.configure_rate_limit(config['rate_per_minute'], state_file=config['rate_limit_file'])
+    scraper.configure_page_profile(config['page_profile'])
+    scraper.configure_perf_capture(config['perf_trace'])
+    scraper.configure_transfer_accounting(config['measure_transfer'])
+    cache = scraper.create_result_cache(config['cache_db'], config['cache_ttl_hours']) \
+        if config.get('cache_db') and config.get('cache_ttl_hours') else None
+    pool = scraper.create_driver_pool(1)
+
+    outbox.put(('ready', worker_id, os.getpid()))
+    try:
+        while True:
+            zipcode = inbox.get()
+            if zipcode is None:
+                break
+
+            outbox.put(('started', worker_id, zipcode))
+            collector = RecordCollector()
+            result = scraper.scrape_zipcode(
+                zipcode,
+                config['base_query'],
+                config['folder_name'],
+                worker_id,
+                pool,
+                config['mode'],
+                config['max_scrolls'],
+                config['max_results'],
+                cache,
+                collector
+            )
+            # Metrics recorded in this process travel back as a delta with each result
+            outbox.put(('result', worker_id, result, collector.records, scraper.metrics.snapshot(reset=True)))
+    finally:
+        pool.close()
+
+
+class ProcessSupervisor:
+    """Runs zipcodes on ``num_workers`` browser-owning processes.
+
+    ``run`` calls ``on_result(result, records)`` in the parent for every zipcode,
+    so writers, journals and UI state stay in the supervising process.
+    """
+
+    def __init__(self, num_workers, base_query, folder_name, mode="details", max_scrolls=15,
+                 max_results=None, rate_per_minute=20, cache_db=None, cache_ttl_hours=None,
+                 job_timeout=JOB_TIMEOUT, max_retries=MAX_RETRIES, page_profile="full", autoscaler=None,
+                 perf_trace=None, measure_transfer=False):
+        self.num_workers = max(1, num_workers)
+        self.autoscaler = autoscaler
+        self.job_timeout = job_timeout
+        self.max_retries = max_retries
+        self.config = {
+            'base_query': base_query,
+            'folder_name': folder_name,
+            'mode': mode,
+            'max_scrolls': max_scrolls,
+            'max_results': max_results,
+            'rate_per_minute': rate_per_minute,
+            'cache_db': cache_db,
+            'cache_ttl_hours': cache_ttl_hours,
+            'page_profile': page_profile,
+            # Workers append to the parent's trace file, one line per zipcode
+            'perf_trace': perf_trace,
+            'measure_transfer': measure_transfer,
+            # Workers share one request budget through a locked state file
+            'rate_limit_file': os.path.join(tempfile.gettempdir(), f"scraper_rate_{os.getpid()}_{int(time.time())}.json"),
+        }
+
+        self._ctx = mp.get_context('spawn')
+        self._outbox = self._ctx.Queue()
+        self._workers = {}
+        self._stats = {'started': 0, 'retired': 0, 'crashes': 0, 'timeouts': 0, 'retries': 0, 'startup_failures': 0}
+
+    def _target(self):
+        """Worker count wanted right now (follows the autoscaler when there is one)"""
+        return self.autoscaler.target if self.autoscaler else self.num_workers
+
+    def _start_worker(self, worker_id):
+        inbox = self._ctx.Queue()
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(worker_id, inbox, self._outbox, self.config),
+            name=f"scraper-worker-{worker_id}",
+            daemon=True
+        )
+        process.start()
+        self._workers[worker_id] = {'process': process, 'inbox': inbox, 'task': None, 'since': None, 'ready': False}
+        self._stats['started'] += 1
+
+    def _kill_worker(self, worker_id):
+        process = self._workers[worker_id]['process']
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            process.kill()
+        process.join(timeout=5)
+
+    def _retire_worker(self, worker_id):
+        """Stop an idle worker the autoscaler no longer wants"""
+        worker = self._workers[worker_id]
+        worker['inbox'].put(None)
+        worker['process'].join(timeout=15)
+        if worker['process'].is_alive():
+            self._kill_worker(worker_id)
+        del self._workers[worker_id]
+        self._stats['retired'] += 1
+        logger.info(f"[Worker-{worker_id}] Retired, {len(self._workers)} workers left")
+
+    def _scale(self, pending):
+        """Start or retire workers to match the current target"""
+        target = self._target()
+        while pending and len(self._workers) < target:
+            self._start_worker(min(set(range(len(self._workers) + 1)) - set(self._workers)))
+
+        surplus = len(self._workers) - target
+        for worker_id, worker in list(self._workers.items()):
+            if surplus <= 0:
+                break
+            if worker['ready'] and worker['task'] is None:
+                self._retire_worker(worker_id)
+                surplus -= 1
+
+    def _dispatch(self, worker_id, pending):
+        worker = self._workers[worker_id]
+        if worker['ready'] and worker['task'] is None and pending:
+            zipcode = pending.pop(0)
+            worker['task'] = zipcode
+            worker['since'] = time.time()
+            worker['inbox'].put(zipcode)
+
+    def run(self, zipcodes, on_result, should_stop=None):
+        """Scrape ``zipcodes`` across the worker processes; returns all results.
+
+        Once ``should_stop()`` returns True, zipcodes not yet handed to a worker
+        are dropped (they get no result) and the run ends with the ones in flight.
+        """
+        pending = list(zipcodes)
+        remaining = set(pending)
+        attempts = {}
+        results = []
+
+        for worker_id in range(min(self._target(), len(pending))):
+            self._start_worker(worker_id)
+
+        try:
+            while remaining:
+                if pending and should_stop and should_stop():
+                    logger.info(f"Stop requested, dropping {len(pending)} zipcodes not yet started")
+                    remaining.difference_update(pending)
+                    pending.clear()
+
+                try:
+                    message = self._outbox.get(timeout=1)
+                except queue.Empty:
+                    message = None
+
+                if message:
+                    kind, worker_id = message[0], message[1]
+                    worker = self._workers.get(worker_id)
+                    if kind == 'ready' and worker:
+                        worker['ready'] = True
+                    elif kind == 'started' and worker:
+                        worker['since'] = time.time()
+                    elif kind == 'result':
+                        result, records = message[2], message[3]
+                        REGISTRY.merge(message[4])
+                        if worker and worker['task'] == result['zipcode']:
+                            worker['task'] = None
+                        if result['zipcode'] in remaining:
+                            remaining.discard(result['zipcode'])
+                            results.append(result)
+                            on_result(result, records)
+
+                # Replace workers that died or hung on a zipcode
+                for worker_id, worker in list(self._workers.items()):
+                    alive = worker['process'].is_alive()
+                    timed_out = worker['task'] is not None and time.time() - worker['since'] > self.job_timeout
+                    if alive and not timed_out:
+                        continue
+
+                    zipcode = worker['task']
+                    if timed_out and alive:
+                        self._stats['timeouts'] += 1
+                        logger.error(f"[Worker-{worker_id}] {zipcode} exceeded {self.job_timeout}s, restarting worker")
+                    else:
+                        self._stats['crashes'] += 1
+                        logger.error(f"[Worker-{worker_id}] Worker died (exit {worker['process'].exitcode}), restarting")
+                        if not worker['ready']:
+                            self._stats['startup_failures'] += 1
+                            if self._stats['startup_failures'] > 3 * self.num_workers:
+                                raise RuntimeError("Worker processes keep dying during startup")
+                    self._kill_worker(worker_id)
+
+                    if zipcode is not None and zipcode in remaining:
+                        attempts[zipcode] = attempts.get(zipcode, 0) + 1
+                        if attempts[zipcode] <= self.max_retries:
+                            self._stats['retries'] += 1
+                            pending.insert(0, zipcode)
+                        else:
+                            remaining.discard(zipcode)
+                            result = {
+                                "zipcode": zipcode, "count": 0, "status": "error",
+                                "error": "worker timed out" if timed_out else "worker crashed",
+                                "time": time.time() - worker['since']
+                            }
+                            results.append(result)
+                            on_result(result, [])
+
+                    if pending and len(self._workers) <= self._target():
+                        self._start_worker(worker_id)
+                    else:
+                        del self._workers[worker_id]
+
+                self._scale(pending)
+                for worker_id in list(self._workers):
+                    self._dispatch(worker_id, pending)
+
+        finally:
+            for worker in self._workers.values():
+                try:
+                    worker['inbox'].put(None)
+                except Exception:
+                    pass
+            for worker_id, worker in list(self._workers.items()):
+                worker['process'].join(timeout=30)
+                if worker['process'].is_alive():
+                    self._kill_worker(worker_id)
+            try:
+                os.remove(self.config['rate_limit_file'])
+            except OSError:
+                pass
+
+        return results
+
+    def stats(self):
+        """Worker lifecycle counters"""
+        return dict(self._stats)
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+
+"""
+Token-Bucket Rate Limiter for the Google Maps Scraper
+One request budget shared by every worker thread, and optionally every process
+"""
+
+import os
+import json
+import time
+import fcntl
+import threading
+
+
+class TokenBucket:
+    """Token bucket refilled at ``rate`` tokens/second holding at most ``burst`` tokens.
+
+    Callers reserve tokens and sleep outside the lock, so waiters are served in
+    arrival order. With ``state_file`` the bucket state lives in a locked JSON file
+    and the budget is shared by every process pointing at the same file.
+    """
+
+    def __init__(self, rate, burst=1, state_file=None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.state_file = state_file
+
+        self._lock = threading.Lock()
+        self._tokens = float(self.burst)
+        self._updated = time.time()
+
+        self._metrics = {
+            'acquired': 0,
+            'waited': 0,
+            'wait_time': 0.0,
+            'max_wait': 0.0,
+        }
+
+    def _reserve_local(self, tokens, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        self._tokens -= tokens
+        return max(0.0, -self._tokens / self.rate)
+
+    def _reserve_shared(self, tokens, now):
+        fd = os.open(self.state_file, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            raw = os.read(fd, 4096)
+            try:
+                state = json.loads(raw) if raw else {}
+            except ValueError:
+                state = {}
+
+            available = min(
+                self.burst,
+                state.get('tokens', self.burst) + (now - state.get('updated', now)) * self.rate
+            )
+            available -= tokens
+
+            os.lseek(fd, 0, os.SEEK_SET)
+            os.ftruncate(fd, 0)
+            os.write(fd, json.dumps({'tokens': available, 'updated': now}).encode())
+            return max(0.0, -available / self.rate)
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+    def acquire(self, tokens=1):
+        """Block until ``tokens`` are available; returns the seconds spent waiting"""
+        with self._lock:
+            now = time.time()
+            if self.state_file:
+                wait = self._reserve_shared(tokens, now)
+            else:
+                wait = self._reserve_local(tokens, now)
+
+            self._metrics['acquired'] += tokens
+            if wait > 0:
+                self._metrics['waited'] += 1
+                self._metrics['wait_time'] += wait
+                self._metrics['max_wait'] = max(self._metrics['max_wait'], wait)
+
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def metrics(self):
+        """Snapshot of acquisitions and wait-time counters"""
+        with self._lock:
+            metrics = dict(self._metrics)
+        metrics['avg_wait'] = metrics['wait_time'] / metrics['waited'] if metrics['waited'] else 0.0
+        metrics['rate_per_minute'] = self.rate * 60
+        metrics['burst'] = self.burst
+        return metrics
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+
+"""
+Persistent Result Cache for the Google Maps Scraper
+Stores extracted records per (query, zipcode, mode) in SQLite with a TTL;
+feeds cut short by max_results or max_scrolls are kept as partial entries
+"""
+
+import re
+import json
+import time
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+# Complete entries serve every lookup; partial ones only capped lookups they hold enough records for
+_USABLE = "(complete = 1 OR (? IS NOT NULL AND json_array_length(records) >= ?))"
+
+
+def normalize_query(query):
+    """Case- and whitespace-insensitive cache key for a search query"""
+    return re.sub(r'\s+', ' ', (query or '').strip().lower())
+
+
+class ResultCache:
+    """SQLite-backed cache of scraped records, safe to share between threads.
+
+    Entries older than ``ttl_hours`` are treated as missing; ``ttl_hours=None``
+    keeps entries forever. Partial entries (the feed was capped) only serve
+    lookups capped at no more results than they hold.
+    """
+
+    def __init__(self, path, ttl_hours=168):
+        self.path = path
+        self.ttl_hours = ttl_hours
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS results (
+                    query TEXT NOT NULL,
+                    zipcode TEXT NOT NULL,
+                    mode TEXT NOT NULL,
+                    records TEXT NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    complete INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (query, zipcode, mode)
+                )
+            """)
+            # Caches created before partial entries were flagged; their entries may be truncated
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(results)")}
+            if "complete" not in columns:
+                conn.execute("ALTER TABLE results ADD COLUMN complete INTEGER NOT NULL DEFAULT 0")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _cutoff(self):
+        return time.time() - self.ttl_hours * 3600 if self.ttl_hours else 0
+
+    def get(self, query, zipcode, mode="details", max_results=None):
+        """Fresh cached records for this query/zipcode that satisfy ``max_results``, or None"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT records FROM results WHERE query = ? AND zipcode = ? AND mode = ? AND fetched_at >= ? "
+                f"AND {_USABLE}",
+                (normalize_query(query), str(zipcode), mode, self._cutoff(), max_results, max_results)
+            ).fetchone()
+
+        with self._lock:
+            if row:
+                self._hits += 1
+            else:
+                self._misses += 1
+
+        return json.loads(row[0]) if row else None
+
+    def put(self, query, zipcode, records, mode="details", complete=True):
+        """Store (or refresh) the records for this query/zipcode; ``complete=False`` when the feed was capped"""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO results (query, zipcode, mode, records, fetched_at, complete) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (normalize_query(query), str(zipcode), mode, json.dumps(records), time.time(), int(bool(complete)))
+            )
+
+    def fresh_zipcodes(self, query, zipcodes, mode="details", max_results=None):
+        """Subset of ``zipcodes`` that would be served from the cache (no stats recorded)"""
+        wanted = {str(z) for z in zipcodes}
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT zipcode FROM results WHERE query = ? AND mode = ? AND fetched_at >= ? AND {_USABLE}",
+                (normalize_query(query), mode, self._cutoff(), max_results, max_results)
+            ).fetchall()
+        return {row[0] for row in rows if row[0] in wanted}
+
+    def purge_expired(self):
+        """Delete stale entries; returns the number removed"""
+        if not self.ttl_hours:
+            return 0
+        with self._connect() as conn:
+            return conn.execute("DELETE FROM results WHERE fetched_at < ?", (self._cutoff(),)).rowcount
+
+    def stats(self):
+        """Hit/miss counters since this cache object was created"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': self._hits / lookups if lookups else 0.0,
+            }
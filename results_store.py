@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+
+"""
+Consolidated Results Store for the Google Maps Scraper
+Every run's records land in one indexed SQLite table, so questions across
+queries, zipcodes, ratings and website presence are single indexed lookups
+"""
+
+import os
+import re
+import csv
+import sys
+import json
+import time
+import sqlite3
+import argparse
+import logging
+from contextlib import contextmanager
+
+from result_cache import normalize_query
+from place_index import place_key_from_url, place_key_from_record
+
+logger = logging.getLogger(__name__)
+
+# Store columns and the output column each one comes from
+FIELDS = {
+    "name": "Name",
+    "location": "Location",
+    "phone": "Phone Number",
+    "email": "Email Address",
+    "rating": "Rating",
+    "reviews": "Reviews",
+    "website": "Website",
+    "category": "Category",
+    "place_url": "Place URL",
+}
+
+# Orderings offered to callers (never interpolated from user input)
+ORDERINGS = {
+    "rating": "rating DESC, reviews DESC",
+    "reviews": "reviews DESC, rating DESC",
+    "zipcode": "zipcode, name",
+    "name": "name",
+    "newest": "added_at DESC",
+}
+
+_NUMBER = re.compile(r'\d+(?:[.,]\d+)?')
+
+# Per-zipcode Excel files: <query>_<zipcode>_<YYYYmmdd>_<HHMMSS>_thread<N>.xlsx
+_ZIPCODE_FILE = re.compile(r'^(?P<query>.+)_(?P<zipcode>\d{5})_\d{8}_\d{6}_thread\d+$')
+
+
+def parse_rating(value):
+    """4.5 from '4.5', '4,5' or '4.5 stars'; None when missing"""
+    match = _NUMBER.search(str(value or ""))
+    if not match:
+        return None
+    rating = float(match.group(0).replace(",", "."))
+    return rating if 0 <= rating <= 5 else None
+
+
+def parse_reviews(value):
+    """1234 from '1,234', '(1,234)' or '1234 reviews'; None when missing"""
+    digits = re.sub(r'\D', '', str(value or ""))
+    return int(digits) if digits else None
+
+
+def record_key(record):
+    """Same place under the same query and zipcode is stored once"""
+    return place_key_from_url(record.get("Place URL")) or place_key_from_record(record) or \
+        f"row:{record.get('Name', '')}|{record.get('Location', '')}"
+
+
+class ResultsStore:
+    """SQLite table of every scraped place, indexed for filtered browsing.
+
+    Rows are keyed by (query, zipcode, place), so re-scraping a zipcode
+    refreshes its places instead of duplicating them. Safe to share between
+    threads: every call opens its own connection.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS places (
+                    query TEXT NOT NULL,
+                    zipcode TEXT NOT NULL,
+                    place_key TEXT NOT NULL,
+                    name TEXT,
+                    location TEXT,
+                    phone TEXT,
+                    email TEXT,
+                    rating REAL,
+                    reviews INTEGER,
+                    website TEXT,
+                    has_website INTEGER NOT NULL DEFAULT 0,
+                    category TEXT,
+                    place_url TEXT,
+                    run TEXT,
+                    added_at REAL NOT NULL,
+                    PRIMARY KEY (query, zipcode, place_key)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_places_query_rating ON places (query, rating)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_places_query_website ON places (query, has_website, rating)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_places_zipcode ON places (zipcode)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_places_run ON places (run)")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def add(self, records, query, zipcode, run=None):
+        """Upsert scraped records (output-column dicts) for one zipcode"""
+        self.add_rows([{**r, "Query": query, "Zipcode": zipcode} for r in records], run)
+
+    def add_rows(self, rows, run=None):
+        """Upsert normalized output rows (with Query and Zipcode columns); returns the row count"""
+        now = time.time()
+        values = []
+        for row in rows:
+            website = (row.get("Website") or "").strip()
+            values.append((
+                normalize_query(row.get("Query")), str(row.get("Zipcode") or ""), record_key(row),
+                row.get("Name") or "", row.get("Location") or "", row.get("Phone Number") or "",
+                row.get("Email Address") or "", parse_rating(row.get("Rating")), parse_reviews(row.get("Reviews")),
+                website, int(bool(website)), row.get("Category") or "", row.get("Place URL") or "", run, now,
+            ))
+        if not values:
+            return 0
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO places (query, zipcode, place_key, name, location, phone, email, rating, "
+                "reviews, website, has_website, category, place_url, run, added_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                values
+            )
+        return len(values)
+
+    def import_file(self, path, run=None):
+        """Load an existing xlsx/CSV/SQLite/Parquet output file; returns the rows added"""
+        import pandas as pd
+
+        extension = os.path.splitext(path)[1].lower()
+        if extension == ".xlsx":
+            df = pd.read_excel(path, dtype=str)
+        elif extension == ".csv":
+            df = pd.read_csv(path, dtype=str, keep_default_na=False)
+        elif extension == ".parquet":
+            df = pd.read_parquet(path)
+        elif extension == ".sqlite":
+            with sqlite3.connect(path) as conn:
+                df = pd.read_sql_query("SELECT * FROM records", conn)
+        else:
+            raise ValueError(f"Unsupported results file: {path}")
+
+        df = df.fillna("").astype(str)
+        # Per-zipcode xlsx files carry their query and zipcode in the file name only
+        if "Query" not in df.columns or "Zipcode" not in df.columns:
+            match = _ZIPCODE_FILE.match(os.path.splitext(os.path.basename(path))[0])
+            if not match:
+                logger.warning(f"Skipping {path}: no Query/Zipcode columns and no zipcode in the file name")
+                return 0
+            df["Query"] = match.group("query").replace("_", " ")
+            df["Zipcode"] = match.group("zipcode")
+        rows = df.to_dict("records")
+        return self.add_rows(rows, run or os.path.splitext(os.path.basename(path))[0])
+
+    @staticmethod
+    def _where(query=None, zipcodes=None, min_rating=None, max_rating=None, has_website=None,
+               category=None, text=None, run=None):
+        clauses, params = [], []
+        if query:
+            clauses.append("query = ?")
+            params.append(normalize_query(query))
+        if zipcodes:
+            # One JSON parameter however many zipcodes are given
+            clauses.append("zipcode IN (SELECT value FROM json_each(?))")
+            params.append(json.dumps([str(z) for z in zipcodes]))
+        if min_rating is not None:
+            clauses.append("rating >= ?")
+            params.append(min_rating)
+        if max_rating is not None:
+            clauses.append("rating <= ?")
+            params.append(max_rating)
+        if has_website is not None:
+            clauses.append("has_website = ?")
+            params.append(int(bool(has_website)))
+        if category:
+            clauses.append("category LIKE ?")
+            params.append(f"%{category}%")
+        if text:
+            clauses.append("(name LIKE ? OR location LIKE ?)")
+            params.extend([f"%{text}%", f"%{text}%"])
+        if run:
+            clauses.append("run = ?")
+            params.append(run)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def count(self, **filters):
+        where, params = self._where(**filters)
+        with self._connect() as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM places{where}", params).fetchone()[0]
+
+    def search(self, limit=50, offset=0, order="rating", **filters):
+        """One page of matching places as dicts"""
+        where, params = self._where(**filters)
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT * FROM places{where} ORDER BY {ORDERINGS.get(order, ORDERINGS['rating'])} LIMIT ? OFFSET ?",
+                (*params, limit, offset)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def export(self, path, order="rating", **filters):
+        """Write every matching place to a CSV in the output column layout; returns the row count"""
+        where, params = self._where(**filters)
+        written = 0
+        with self._connect() as conn, open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["Query", "Zipcode", *FIELDS.values()])
+            cursor = conn.execute(
+                f"SELECT * FROM places{where} ORDER BY {ORDERINGS.get(order, ORDERINGS['rating'])}", params)
+            for row in cursor:
+                writer.writerow([row["query"], row["zipcode"],
+                                 *("" if row[c] is None else row[c] for c in FIELDS)])
+                written += 1
+        return written
+
+    def queries(self):
+        """Distinct queries with their place counts"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT query, COUNT(*) AS places FROM places GROUP BY query ORDER BY places DESC").fetchall()
+        return [dict(row) for row in rows]
+
+    def stats(self):
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT COUNT(*) AS places, COUNT(DISTINCT query) AS queries, COUNT(DISTINCT zipcode) AS zipcodes "
+                "FROM places").fetchone()
+        return dict(row)
+
+
+def parse_zipcodes(text):
+    """Zipcodes from free text separated by commas, spaces or newlines"""
+    return [z.zfill(5) for z in re.split(r'[\s,;]+', text or "") if z.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Consolidated results store")
+    parser.add_argument("--db", default=os.environ.get("SCRAPER_RESULTS_DB", "scraper_results.sqlite"))
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    load = sub.add_parser("import", help="Load existing output files")
+    load.add_argument("files", nargs="+")
+
+    find = sub.add_parser("query", help="Filter places and print or export them")
+    find.add_argument("--query")
+    find.add_argument("--zipcodes", help="Comma-separated zipcodes, or @file with one per line")
+    find.add_argument("--min-rating", type=float)
+    find.add_argument("--website", choices=["yes", "no"])
+    find.add_argument("--category")
+    find.add_argument("--limit", type=int, default=20)
+    find.add_argument("--out", help="Export every match to this CSV instead of printing")
+    args = parser.parse_args(argv)
+
+    store = ResultsStore(args.db)
+
+    if args.command == "import":
+        for path in args.files:
+            try:
+                print(f"✓ {path}: {store.import_file(path)} places")
+            except Exception as e:
+                print(f"✗ {path}: {e}")
+        print(f"Store: {store.stats()}")
+        return 0
+
+    zipcodes = args.zipcodes
+    if zipcodes and zipcodes.startswith("@"):
+        with open(zipcodes[1:]) as f:
+            zipcodes = f.read()
+    filters = {
+        "query": args.query,
+        "zipcodes": parse_zipcodes(zipcodes) if zipcodes else None,
+        "min_rating": args.min_rating,
+        "has_website": None if args.website is None else args.website == "yes",
+        "category": args.category,
+    }
+
+    start = time.time()
+    if args.out:
+        print(f"✓ Exported {store.export(args.out, **filters)} places to {args.out} in {time.time() - start:.3f}s")
+        return 0
+    total = store.count(**filters)
+    for row in store.search(limit=args.limit, **filters):
+        print(f"{row['zipcode']}  {row['rating'] or '-':>4}  {row['name'][:40]:<40}  {row['website'] or '(no website)'}")
+    print(f"{total} matching places ({time.time() - start:.3f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
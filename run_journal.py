@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+
+"""
+Crash-Safe Run Journal for the Google Maps Scraper
+Records every job's inputs and each zipcode's outcome so interrupted runs can resume
+"""
+
+import json
+import time
+import uuid
+import sqlite3
+from contextlib import contextmanager
+
+# Zipcode outcomes that count as done; anything else is rescheduled on resume
+FINISHED_STATUSES = ("success", "no_data")
+
+
+class RunJournal:
+    """SQLite journal of scraping jobs and per-zipcode progress.
+
+    Every ``record`` call is committed immediately, so the journal survives
+    container restarts and OOM kills mid-run.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    input_file TEXT NOT NULL,
+                    base_query TEXT NOT NULL,
+                    settings TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS job_zipcodes (
+                    job_id TEXT NOT NULL,
+                    zipcode TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    count INTEGER NOT NULL DEFAULT 0,
+                    duration REAL,
+                    error TEXT,
+                    finished_at REAL,
+                    cached INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (job_id, zipcode)
+                )
+            """)
+            # Journals created before cache hits were flagged
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(job_zipcodes)")}
+            if "cached" not in columns:
+                conn.execute("ALTER TABLE job_zipcodes ADD COLUMN cached INTEGER NOT NULL DEFAULT 0")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def start_job(self, input_file, base_query, zipcodes, settings=None):
+        """Register a new job with all of its zipcodes pending; returns the job id"""
+        job_id = f"{time.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+        now = time.time()
+
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (job_id, input_file, base_query, settings, status, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, 'running', ?, ?)",
+                (job_id, input_file, base_query, json.dumps(settings or {}), now, now)
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO job_zipcodes (job_id, zipcode, status) VALUES (?, ?, 'pending')",
+                [(job_id, str(z)) for z in zipcodes]
+            )
+        return job_id
+
+    def record(self, job_id, result):
+        """Persist one zipcode result as returned by ``scrape_zipcode``"""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE job_zipcodes SET status = ?, count = ?, duration = ?, error = ?, finished_at = ?, cached = ? "
+                "WHERE job_id = ? AND zipcode = ?",
+                (result.get("status", "error"), result.get("count", 0), result.get("time"),
+                 result.get("error"), now, int(bool(result.get("cached"))), job_id, str(result.get("zipcode")))
+            )
+            conn.execute("UPDATE jobs SET updated_at = ? WHERE job_id = ?", (now, job_id))
+
+    def set_status(self, job_id, status):
+        """Mark a job running, completed, or interrupted"""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE job_id = ?",
+                (status, time.time(), job_id)
+            )
+
+    def finish_job(self, job_id):
+        """Mark a job completed if every zipcode finished, otherwise incomplete"""
+        status = "incomplete" if self.pending_zipcodes(job_id) else "completed"
+        self.set_status(job_id, status)
+        return status
+
+    def pending_zipcodes(self, job_id):
+        """Zipcodes that never finished or failed, in their original order"""
+        placeholders = ", ".join("?" for _ in FINISHED_STATUSES)
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT zipcode FROM job_zipcodes WHERE job_id = ? AND status NOT IN ({placeholders}) "
+                "ORDER BY rowid",
+                (job_id, *FINISHED_STATUSES)
+            ).fetchall()
+        return [row["zipcode"] for row in rows]
+
+    def get_job(self, job_id):
+        """Job row with decoded settings, or None"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if not row:
+            return None
+        job = dict(row)
+        job["settings"] = json.loads(job["settings"])
+        return job
+
+    def list_jobs(self, limit=20):
+        """Most recent jobs with per-status zipcode counts"""
+        with self._connect() as conn:
+            rows = conn.execute("""
+                SELECT j.job_id, j.input_file, j.base_query, j.status, j.created_at, j.updated_at,
+                       COUNT(z.zipcode) AS total,
+                       SUM(CASE WHEN z.status IN ('success', 'no_data') THEN 1 ELSE 0 END) AS finished,
+                       SUM(CASE WHEN z.status = 'pending' THEN 1 ELSE 0 END) AS pending,
+                       SUM(z.count) AS records
+                FROM jobs j LEFT JOIN job_zipcodes z ON z.job_id = j.job_id
+                GROUP BY j.job_id
+                ORDER BY j.created_at DESC
+                LIMIT ?
+            """, (limit,)).fetchall()
+        return [dict(row) for row in rows]
+
+    def latest_resumable(self):
+        """Most recent job that still has unfinished zipcodes, or None"""
+        for job in self.list_jobs(limit=50):
+            if job["finished"] < job["total"]:
+                return job["job_id"]
+        return None
+
+    def timings(self):
+        """(base_query, mode, zipcode, duration, count) of every finished zipcode scraped in a browser"""
+        placeholders = ", ".join("?" for _ in FINISHED_STATUSES)
+        with self._connect() as conn:
+            jobs = {
+                row["job_id"]: (row["base_query"], json.loads(row["settings"]).get("mode", "details"))
+                for row in conn.execute("SELECT job_id, base_query, settings FROM jobs")
+            }
+            rows = conn.execute(
+                f"SELECT job_id, zipcode, duration, count FROM job_zipcodes "
+                f"WHERE status IN ({placeholders}) AND duration IS NOT NULL AND cached = 0",
+                FINISHED_STATUSES
+            ).fetchall()
+        return [(*jobs[row["job_id"]], row["zipcode"], row["duration"], row["count"])
+                for row in rows if row["job_id"] in jobs]
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+
+"""
+Shared Run State for the Google Maps Scraper UI
+The scraping thread pushes one event per finished zipcode; dashboards read
+constant-cost snapshots instead of walking every result on each refresh
+"""
+
+import time
+import threading
+from collections import deque
+
+# Newest results kept for the activity feed
+RECENT_RESULTS = 50
+
+
+class RunState:
+    """Progress of the current run, shared by the worker thread and every UI session.
+
+    All writes happen under one lock. ``snapshot`` copies counters, the latest
+    pool/limiter stats and the newest results only, so its cost does not grow
+    with the number of zipcodes. ``version`` changes on every event, letting
+    readers skip work when nothing happened.
+    """
+
+    def __init__(self, recent=RECENT_RESULTS):
+        self._lock = threading.Lock()
+        self._recent_size = recent
+        self._active = False
+        self._stop_requested = False
+        self._version = 0
+        self._clear()
+
+    def _clear(self):
+        self._counters = {'total': 0, 'completed': 0, 'successful': 0, 'no_data': 0, 'failed': 0,
+                          'cached': 0, 'records': 0, 'bytes': 0, 'measured': 0}
+        self._job_id = None
+        self._start_time = None
+        self._end_time = None
+        self._error = None
+        self._stats = {}
+        self._recent = deque(maxlen=self._recent_size)
+        self._results = []
+
+    @property
+    def active(self):
+        return self._active
+
+    @property
+    def stop_requested(self):
+        return self._stop_requested
+
+    @property
+    def version(self):
+        return self._version
+
+    def try_begin(self):
+        """Claim the scraper for a new run; False if one is already running"""
+        with self._lock:
+            if self._active:
+                return False
+            self._clear()
+            self._active = True
+            self._stop_requested = False
+            self._start_time = time.time()
+            self._version += 1
+            return True
+
+    def set_job(self, job_id, total):
+        """Job id and zipcode count, once the input has been read"""
+        with self._lock:
+            self._job_id = job_id
+            self._counters['total'] = total
+            self._start_time = time.time()
+            self._version += 1
+
+    def record(self, result):
+        """One finished zipcode as returned by ``scrape_zipcode``"""
+        entry = {
+            'zipcode': result.get('zipcode'),
+            'status': result.get('status', 'unknown'),
+            'count': result.get('count', 0),
+            'time': result.get('time') or 0,
+            'bytes': result.get('bytes'),
+            'cached': result.get('cached', False),
+            'error': result.get('error'),
+        }
+        with self._lock:
+            counters = self._counters
+            counters['completed'] += 1
+            # The dashboard counts anything but success as failed
+            if entry['status'] == 'success':
+                counters['successful'] += 1
+            else:
+                counters['failed'] += 1
+            if entry['status'] == 'no_data':
+                counters['no_data'] += 1
+            if entry['cached']:
+                counters['cached'] += 1
+            if entry['bytes']:
+                counters['bytes'] += entry['bytes']
+                counters['measured'] += 1
+            counters['records'] += entry['count']
+            self._recent.append(entry)
+            self._results.append(entry)
+            self._version += 1
+
+    def update(self, **stats):
+        """Replace stat snapshots by name (pool, rate_limit, autoscale, places, workers, tabs)"""
+        with self._lock:
+            self._stats.update(stats)
+            self._version += 1
+
+    def request_stop(self):
+        """Ask the run to stop scheduling new zipcodes"""
+        with self._lock:
+            self._stop_requested = True
+            self._version += 1
+
+    def fail(self, message):
+        """Error that ended (or marred) the run, shown by every dashboard"""
+        with self._lock:
+            self._error = message
+            self._version += 1
+
+    def finish(self):
+        with self._lock:
+            self._active = False
+            self._end_time = time.time()
+            self._version += 1
+
+    def snapshot(self, recent=15):
+        """Counters, stats and the ``recent`` newest results (newest first)"""
+        with self._lock:
+            end = self._end_time if not self._active else time.time()
+            snap = dict(self._counters)
+            snap.update({
+                'active': self._active,
+                'stop_requested': self._stop_requested,
+                'job_id': self._job_id,
+                'error': self._error,
+                'start_time': self._start_time,
+                'elapsed': end - self._start_time if self._start_time and end else 0.0,
+                'version': self._version,
+                'stats': dict(self._stats),
+                'recent': list(self._recent)[-recent:][::-1] if recent else [],
+            })
+        return snap
+
+    def results(self):
+        """Every result of the run so far (for end-of-run summaries)"""
+        with self._lock:
+            return list(self._results)
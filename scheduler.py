@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+
+"""
+History-Based Zipcode Scheduler for the Google Maps Scraper
+Predicts each zipcode's run time from earlier runs in the journal and orders
+work longest-expected-first, so a slow dense-metro zipcode never runs last
+"""
+
+import heapq
+import statistics
+import logging
+
+from result_cache import normalize_query
+
+logger = logging.getLogger(__name__)
+
+# Seconds per zipcode when nothing better is known (the old flat estimate)
+DEFAULT_SECONDS = {"details": 25.0, "list": 10.0}
+
+# Zipcodes sharing their first digits are served by the same sectional center
+# and tend to have similar density
+AREA_PREFIX = 3
+
+
+class CostModel:
+    """Per-zipcode run time predictions from journaled timings.
+
+    Predictions fall back from the same query and zipcode, to the same zipcode
+    under other queries (scaled by how slow this query is), to the zipcode's
+    area, to this query's median, and finally to DEFAULT_SECONDS.
+    """
+
+    def __init__(self, timings=()):
+        self._exact = {}
+        self._zipcode = {}
+        self._area = {}
+        self._query = {}
+        self._mode = {}
+
+        for base_query, mode, zipcode, duration, count in timings:
+            if duration is None or duration <= 0:
+                continue
+            query = normalize_query(base_query)
+            zipcode = str(zipcode)
+            self._exact.setdefault((query, mode, zipcode), []).append((duration, count))
+            self._zipcode.setdefault((mode, zipcode), []).append((query, duration))
+            self._area.setdefault((mode, zipcode[:AREA_PREFIX]), []).append(duration)
+            self._query.setdefault((query, mode), []).append(duration)
+            self._mode.setdefault(mode, []).append(duration)
+
+        self._query_median = {key: statistics.median(values) for key, values in self._query.items()}
+        self._mode_median = {mode: statistics.median(values) for mode, values in self._mode.items()}
+
+    @classmethod
+    def from_journal(cls, journal):
+        try:
+            return cls(journal.timings())
+        except Exception as e:
+            logger.warning(f"Could not load timing history: {e}")
+            return cls()
+
+    def _query_factor(self, query, mode, other_query):
+        """How much slower ``query`` runs than ``other_query`` on average"""
+        mine = self._query_median.get((query, mode))
+        theirs = self._query_median.get((other_query, mode))
+        return mine / theirs if mine and theirs else 1.0
+
+    def predict(self, base_query, zipcode, mode="details"):
+        """(expected seconds, source) for one zipcode"""
+        query = normalize_query(base_query)
+        zipcode = str(zipcode)
+
+        exact = self._exact.get((query, mode, zipcode))
+        if exact:
+            return statistics.median(d for d, _ in exact), "history"
+
+        other = self._zipcode.get((mode, zipcode))
+        if other:
+            return statistics.median(d * self._query_factor(query, mode, q) for q, d in other), "zipcode"
+
+        area = self._area.get((mode, zipcode[:AREA_PREFIX]))
+        if area:
+            mode_median = self._mode_median.get(mode)
+            factor = self._query_median[(query, mode)] / mode_median \
+                if (query, mode) in self._query_median and mode_median else 1.0
+            return statistics.median(area) * factor, "area"
+
+        if (query, mode) in self._query_median:
+            return self._query_median[(query, mode)], "query"
+        if mode in self._mode_median:
+            return self._mode_median[mode], "mode"
+        return DEFAULT_SECONDS.get(mode, DEFAULT_SECONDS["details"]), "default"
+
+    def predict_all(self, base_query, zipcodes, mode="details"):
+        """{zipcode: (seconds, source)}"""
+        return {z: self.predict(base_query, z, mode) for z in zipcodes}
+
+    def order(self, base_query, zipcodes, mode="details"):
+        """Zipcodes sorted longest-expected-first (ties keep their input order)"""
+        predictions = self.predict_all(base_query, zipcodes, mode)
+        return sorted(zipcodes, key=lambda z: -predictions[z][0])
+
+    def forecast(self, base_query, zipcodes, workers, mode="details"):
+        """Simulated LPT makespan of ``zipcodes`` on ``workers`` parallel workers"""
+        predictions = self.predict_all(base_query, zipcodes, mode)
+        loads = [0.0] * max(1, workers)
+        for zipcode in sorted(zipcodes, key=lambda z: -predictions[z][0]):
+            heapq.heapreplace(loads, loads[0] + predictions[zipcode][0])
+
+        sources = {}
+        for _, source in predictions.values():
+            sources[source] = sources.get(source, 0) + 1
+        known = sum(n for s, n in sources.items() if s in ("history", "zipcode", "area"))
+        return {
+            'makespan': max(loads) if zipcodes else 0.0,
+            'total_work': sum(p[0] for p in predictions.values()),
+            'zipcodes': len(zipcodes),
+            'workers': len(loads),
+            'sources': sources,
+            'coverage': known / len(zipcodes) if zipcodes else 0.0,
+        }
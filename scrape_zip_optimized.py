@@ -13,6 +13,7 @@ from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.action_chains import ActionChains
+from selenium.common.exceptions import TimeoutException
 import time
 import pandas as pd
 import re
@@ -24,6 +25,23 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 import threading
 import logging
 import sys
+import json
+
+from driver_pool import DriverPool
+from chrome_bootstrap import bootstrap_chrome
+from rate_limiter import TokenBucket
+from result_cache import ResultCache
+from run_journal import RunJournal
+from output_writer import OutputWriter, OUTPUT_FORMATS
+from results_store import ResultsStore
+from place_index import PlaceIndex
+from process_pool import ProcessSupervisor
+from autoscaler import Autoscaler
+from metrics import REGISTRY as metrics, start_metrics_server, format_summary
+from scheduler import CostModel
+from page_profile import DEFAULT_PROFILE, PAGE_PROFILES, chrome_args, blocked_urls, format_bytes
+from input_loader import load_zipcodes, INPUT_EXTENSIONS, DEFAULT_ZIPCODE_COLUMN
+from perf_capture import PerfTrace, parse_metrics, network_totals, load_trace, summarize, format_perf_summary, trace_path
 
 # Configure logging
 logging.basicConfig(
@@ -40,6 +58,42 @@ logger = logging.getLogger(__name__)
 print_lock = threading.Lock()
 file_lock = threading.Lock()
 
+# Persistent cache of extracted records, keyed by query + zipcode
+CACHE_DB = os.environ.get('SCRAPER_CACHE_DB', 'scraper_cache.sqlite')
+CACHE_TTL_HOURS = 168
+
+# Every run's records, queryable by query, zipcode, rating and website presence
+RESULTS_DB = os.environ.get('SCRAPER_RESULTS_DB', 'scraper_results.sqlite')
+
+# Durable record of every job and zipcode outcome, used to resume interrupted runs
+JOURNAL_DB = os.environ.get('SCRAPER_JOURNAL_DB', 'scraper_journal.sqlite')
+
+# Total request budget shared by all workers (navigations + card clicks).
+# Set SCRAPER_RATE_LIMIT_FILE to share the budget across processes.
+RATE_LIMIT_PER_MINUTE = 20
+RATE_LIMIT_BURST = 5
+rate_limiter = TokenBucket(
+    RATE_LIMIT_PER_MINUTE / 60,
+    RATE_LIMIT_BURST,
+    state_file=os.environ.get('SCRAPER_RATE_LIMIT_FILE')
+)
+
+# Prometheus-style /metrics endpoint port (0 disables it)
+METRICS_PORT = int(os.environ.get('SCRAPER_METRICS_PORT', 0))
+
+# Ceiling for autoscaled runs; the autoscaler stays under CPU, memory and shm limits
+AUTOSCALE_MAX_WORKERS = 8
+
+# Page profile for newly launched browsers ("lean" blocks tiles, images, fonts and telemetry)
+page_profile = os.environ.get('SCRAPER_PAGE_PROFILE', DEFAULT_PROFILE)
+
+# Per-job Chrome performance trace (None disables capture)
+perf_trace = None
+
+# Per-zipcode byte accounting from Chrome's performance log. Off by default: with the log
+# enabled chromedriver buffers every network event of the page until it is drained
+measure_transfer = os.environ.get('SCRAPER_MEASURE_TRANSFER', '') == '1'
+
 # User agents for rotation
 USER_AGENTS = [
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
@@ -49,6 +103,150 @@ USER_AGENTS = [
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/130.0.0.0 Safari/537.36"
 ]
 
+MAPS_URL = "https://www.google.com/maps"
+
+# Extraction modes: "details" clicks every card, "list" reads the results feed only
+EXTRACTION_MODES = ["details", "list"]
+
+# Execution modes: worker threads in this process, or supervised worker processes
+EXECUTION_MODES = ["threads", "processes", "tabs"]
+
+# Reads every card in the results feed in a single round trip (list mode)
+LIST_CARDS_SCRIPT = """
+const feed = document.querySelector('div[role="feed"]');
+if (!feed) { return []; }
+const text = (root, sel) => {
+    const el = root.querySelector(sel);
+    return el ? (el.innerText || el.textContent || '').trim() : '';
+};
+return Array.from(feed.querySelectorAll('div.Nv2PK')).map(card => {
+    const link = card.querySelector('a.hfpxzc');
+    const website = card.querySelector('a.lcr4fd, a[data-value="Website"]');
+    const lines = Array.from(card.querySelectorAll('div.W4Efsd div.W4Efsd')).map(line =>
+        Array.from(line.querySelectorAll(':scope > span'))
+            .map(span => (span.innerText || '').replace(/\u00b7/g, '').trim())
+            .filter(part => part.length > 0)
+    ).filter(parts => parts.length > 0);
+    const info = lines.length ? lines[0] : [];
+    return {
+        name: text(card, 'div.qBF1Pd') || (link ? link.getAttribute('aria-label') || '' : ''),
+        rating: text(card, 'span.MW4etd'),
+        reviews: text(card, 'span.UY7F9'),
+        category: info.length ? info[0] : '',
+        address: info.length > 1 ? info[info.length - 1] : '',
+        phone: text(card, 'span.UsdlK'),
+        website: website ? website.href : '',
+        url: link ? link.href : ''
+    };
+});
+"""
+
+# Detail pane fields in output order; "Email Address" is never shown by Maps
+DETAIL_FIELDS = ["Name", "Location", "Phone Number", "Email Address", "Rating", "Website"]
+
+# Selector table for the detail pane: field -> ordered (css selector, source) fallbacks.
+# Source is "text", "href" or an attribute name. Update here when Maps renames classes.
+DETAIL_SELECTORS = {
+    "Name": [
+        ("h1.DUwDvf", "text"),
+        ("h1.fontHeadlineLarge", "text"),
+    ],
+    "Rating": [
+        ("span.ceNzKf", "aria-label"),
+        ("div.F7nice span", "text"),
+    ],
+    "Location": [
+        ("button[data-item-id='address']", "aria-label"),
+        ("button[data-tooltip='Copy address']", "aria-label"),
+    ],
+    "Phone Number": [
+        ("button[data-item-id^='phone:tel:']", "aria-label"),
+        ("button[data-tooltip='Copy phone number']", "aria-label"),
+    ],
+    "Website": [
+        ("a[data-item-id='authority']", "href"),
+        ("a[aria-label*='Website']", "href"),
+    ],
+}
+
+# Label prefixes Maps puts in aria-labels
+DETAIL_PREFIXES = {
+    "Location": ["Address: ", "Address:"],
+    "Phone Number": ["Phone: ", "Phone:"],
+}
+
+# Evaluates DETAIL_SELECTORS in the page and returns the first non-empty match per field
+DETAIL_PANE_SCRIPT = """
+const table = arguments[0];
+const out = {};
+for (const [field, options] of Object.entries(table)) {
+    out[field] = '';
+    for (const [selector, source] of options) {
+        const el = document.querySelector(selector);
+        if (!el) { continue; }
+        let value;
+        if (source === 'text') {
+            value = el.innerText || el.textContent;
+        } else if (source === 'href') {
+            value = el.href;
+        } else {
+            value = el.getAttribute(source);
+        }
+        if (value && value.trim()) {
+            out[field] = value.trim();
+            break;
+        }
+    }
+}
+return out;
+"""
+
+# Minimum (randomised) pause around browser actions, even when the page is already ready
+PACING_FLOOR = (0.4, 0.9)
+
+# Upper bound, in seconds, for each readiness condition
+WAIT_TIMEOUTS = {
+    "searchbox": 15,
+    "results": 20,
+    "detail": 10,
+    "scroll": 6,
+}
+
+# Returns the clicked card's place name so the detail pane can be matched against it
+CARD_FOCUS_SCRIPT = """
+const card = arguments[0];
+card.scrollIntoView({block: 'center'});
+const link = card.querySelector('a.hfpxzc');
+return link ? (link.getAttribute('aria-label') || '') : '';
+"""
+
+DETAIL_TITLE_SCRIPT = """
+const h = document.querySelector('h1.DUwDvf, h1.fontHeadlineLarge');
+return h ? (h.innerText || '').trim() : '';
+"""
+
+FEED_STATE_SCRIPT = """
+const feed = arguments[0];
+return {
+    count: feed.querySelectorAll('div.Nv2PK').length,
+    end: !!feed.querySelector('span.HlvSq')
+};
+"""
+
+# Returns feed cards from ``offset`` onwards with their place URLs, plus the end-of-list flag
+HARVEST_CARDS_SCRIPT = """
+const feed = arguments[0];
+const cards = Array.from(feed.querySelectorAll('div.Nv2PK'));
+return {
+    total: cards.length,
+    end: !!feed.querySelector('span.HlvSq'),
+    cards: cards.slice(arguments[1]).map(card => {
+        const link = card.querySelector('a.hfpxzc');
+        return [card, link ? link.href : ''];
+    })
+};
+"""
+
 def safe_print(message):
     """Thread-safe printing"""
     with print_lock:
@@ -75,9 +273,108 @@ def human_delay(min_sec=2, max_sec=5):
     """Simulate human-like delay"""
     time.sleep(random.uniform(min_sec, max_sec))
 
+def configure_page_profile(name):
+    """Select the page profile used by browsers launched from now on"""
+    global page_profile
+    page_profile = name if name in PAGE_PROFILES else DEFAULT_PROFILE
+    return page_profile
+
+def configure_perf_capture(path):
+    """Append per-zipcode Chrome performance samples to ``path`` (None turns capture off)"""
+    global perf_trace
+    perf_trace = PerfTrace(path) if path else None
+    return perf_trace
+
+def configure_transfer_accounting(enabled):
+    """Count bytes per zipcode in browsers launched from now on"""
+    global measure_transfer
+    measure_transfer = bool(enabled)
+    return measure_transfer
+
+def network_logging():
+    """Whether browsers record network events (byte accounting and perf traces read them)"""
+    return measure_transfer or perf_trace is not None
+
+def configure_rate_limit(per_minute, burst=RATE_LIMIT_BURST, state_file=None):
+    """Replace the shared request budget (call before starting workers)"""
+    global rate_limiter
+    rate_limiter = TokenBucket(
+        per_minute / 60,
+        burst,
+        state_file=state_file or os.environ.get('SCRAPER_RATE_LIMIT_FILE')
+    )
+    return rate_limiter
+
+def throttle(thread_id=0):
+    """Draw one request from the shared budget, waiting if it is exhausted"""
+    waited = rate_limiter.acquire()
+    metrics.observe("scraper_rate_limit_wait_seconds", waited)
+    if waited >= 1:
+        safe_print(f"[Thread-{thread_id}] ⏸ Rate limiting: waited {waited:.1f}s")
+    return waited
+
+def format_rate_limit_stats(metrics):
+    """One-line summary of shared rate limiter activity"""
+    return (f"Requests: {metrics['acquired']} @ {metrics['rate_per_minute']:.0f}/min "
+            f"(burst {metrics['burst']}) | Throttled: {metrics['waited']} | "
+            f"Wait: {metrics['wait_time']:.0f}s total, {metrics['max_wait']:.1f}s max")
+
+def pace(start, floor=None):
+    """Sleep out whatever is left of the pacing floor since ``start``"""
+    low, high = floor or PACING_FLOOR
+    remaining = random.uniform(low, high) - (time.time() - start)
+    if remaining > 0:
+        time.sleep(remaining)
+
+def wait_for(driver, condition, timeout, floor=None, poll=0.2):
+    """Wait until condition(driver) is truthy; returns its value, or None on timeout.
+
+    Returns as soon as the page is ready, but never faster than the pacing floor.
+    """
+    start = time.time()
+    try:
+        result = WebDriverWait(driver, timeout, poll_frequency=poll).until(condition)
+    except TimeoutException:
+        result = None
+    pace(start, floor)
+    return result
+
+def results_loaded(driver):
+    """Condition: the results feed (or a single place page) has rendered"""
+    for selector in ('div[role="feed"]', 'h1.DUwDvf'):
+        elements = driver.find_elements(By.CSS_SELECTOR, selector)
+        if elements:
+            return elements[0]
+    return False
+
+def detail_pane_shows(name, previous_title=""):
+    """Condition: the detail pane title switched to the clicked place"""
+    expected = (name or "").strip().lower()
+
+    def condition(driver):
+        title = driver.execute_script(DETAIL_TITLE_SCRIPT)
+        if not title:
+            return False
+        if expected:
+            return title.strip().lower() == expected
+        return title != previous_title
+
+    return condition
+
+def cards_appended(feed, previous_count):
+    """Condition: more cards were appended to the feed, or the end-of-list marker appeared"""
+    def condition(driver):
+        state = driver.execute_script(FEED_STATE_SCRIPT, feed)
+        if state["count"] > previous_count or state["end"]:
+            return state
+        return False
+
+    return condition
+
 def init_driver(thread_id=0):
     """Initialize undetected Chrome driver with anti-detection features"""
     safe_print(f"[Thread-{thread_id}] Initializing browser...")
+    launch_start = time.time()
 
     options = uc.ChromeOptions()
     options.add_argument('--headless=new')
@@ -86,49 +383,111 @@ def init_driver(thread_id=0):
     options.add_argument('--disable-dev-shm-usage')
     options.add_argument('--disable-blink-features=AutomationControlled')
     options.add_argument('--disable-gpu')
-    options.add_argument('--window-size=1920,1080')
-    options.add_argument('--start-maximized')
     options.add_argument('--disable-notifications')
     options.add_argument('--disable-popup-blocking')
+    for arg in chrome_args(page_profile):
+        options.add_argument(arg)
 
-    chrome_version = get_chrome_version()
-    if chrome_version:
-        logger.info(f"Chrome version detected: {chrome_version}")
-        driver = uc.Chrome(options=options, version_main=chrome_version, use_subprocess=True)
+    # Network events feed byte accounting and perf traces; without either nobody reads them
+    if network_logging():
+        options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
+    try:
+        chrome = bootstrap_chrome()
+    except Exception as e:
+        logger.warning(f"[Thread-{thread_id}] Chrome bootstrap failed, patching per launch: {e}")
+        chrome = None
+
+    if chrome:
+        driver = uc.Chrome(
+            options=options,
+            version_main=chrome['major'],
+            driver_executable_path=chrome['driver_path'],
+            browser_executable_path=chrome['binary'],
+            use_subprocess=True
+        )
     else:
-        logger.info("Could not detect Chrome version, using default...")
-        driver = uc.Chrome(options=options, use_subprocess=True)
+        chrome_version = get_chrome_version()
+        if chrome_version:
+            logger.info(f"Chrome version detected: {chrome_version}")
+            driver = uc.Chrome(options=options, version_main=chrome_version, use_subprocess=True)
+        else:
+            logger.info("Could not detect Chrome version, using default...")
+            driver = uc.Chrome(options=options, use_subprocess=True)
 
-    safe_print(f"[Thread-{thread_id}] ✓ Browser initialized!")
+    block_resources(driver, thread_id)
+    metrics.observe("scraper_stage_seconds", time.time() - launch_start, stage="driver_launch")
+    safe_print(f"[Thread-{thread_id}] ✓ Browser initialized! (profile: {page_profile})")
     return driver
 
+def block_resources(driver, thread_id=0):
+    """Block the current profile's URL patterns through CDP request interception"""
+    patterns = blocked_urls(page_profile)
+    if not patterns:
+        return
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+    except Exception as e:
+        logger.warning(f"[Thread-{thread_id}] Could not block resources: {e}")
+
+def drain_network(driver):
+    """Bytes, requests and failed requests since the last call, from the driver's performance log
+    (None when network events are not recorded)"""
+    if not network_logging():
+        return None
+    try:
+        return network_totals(driver.get_log('performance'))
+    except Exception:
+        return {"bytes": 0, "req": 0, "fail": 0}
+
+def read_perf_metrics(driver, enable=False):
+    """Chrome Performance domain counters for the current page, or {} when unavailable"""
+    try:
+        if enable:
+            driver.execute_cdp_cmd('Performance.enable', {})
+        return parse_metrics(driver.execute_cdp_cmd('Performance.getMetrics', {}))
+    except Exception:
+        return {}
+
 def search_query(driver, query, thread_id=0):
     """Search Google Maps with human-like typing"""
-    driver.get("https://www.google.com/maps")
-    human_delay(3, 5)
+    throttle(thread_id)
+    search_start = time.time()
+    driver.get(MAPS_URL)
 
     try:
-        search_box = WebDriverWait(driver, 15).until(
-            EC.presence_of_element_located((By.ID, "searchboxinput"))
+        search_box = wait_for(
+            driver,
+            EC.element_to_be_clickable((By.ID, "searchboxinput")),
+            WAIT_TIMEOUTS["searchbox"]
         )
+        if not search_box:
+            raise TimeoutException("Search box did not appear")
 
         search_box.clear()
-        human_delay(0.5, 1)
+        pace(time.time())
 
         # Type like a human - one character at a time
         for char in query:
             search_box.send_keys(char)
             time.sleep(random.uniform(0.05, 0.15))
 
-        human_delay(0.5, 1.5)
+        pace(time.time())
         search_box.send_keys(Keys.ENTER)
-        human_delay(5, 7)  # Wait for results to load
+
+        # Wait for the feed (or a single place page) instead of a fixed sleep
+        if not wait_for(driver, results_loaded, WAIT_TIMEOUTS["results"]):
+            logger.warning(f"[Thread-{thread_id}] Results did not load within {WAIT_TIMEOUTS['results']}s")
 
         safe_print(f"[Thread-{thread_id}] ✓ Searched: {query}")
         return True
     except Exception as e:
         logger.error(f"[Thread-{thread_id}] Search error: {e}")
+        metrics.inc("scraper_errors_total", stage="search", type=type(e).__name__)
         return False
+    finally:
+        metrics.observe("scraper_stage_seconds", time.time() - search_start, stage="search")
 
 def simulate_human_behavior(driver):
     """Simulate random mouse movements"""
@@ -141,169 +500,230 @@ def simulate_human_behavior(driver):
     except:
         pass
 
-def scroll_results(driver, max_scrolls=15, thread_id=0):
-    """Scroll through results with human-like behavior"""
+def stream_results(driver, max_scrolls=15, max_results=None, thread_id=0, outcome=None):
+    """Scroll the feed and yield (place_url, card) for each newly appended card.
+
+    Cards are deduplicated by place URL. Stops after ``max_results`` cards, at the
+    end-of-list marker, when scrolling stops producing cards, or after ``max_scrolls``.
+    ``outcome["complete"]`` is set to whether the whole feed was read (no cap hit).
+    """
     safe_print(f"[Thread-{thread_id}] Scrolling results...")
+    outcome = {} if outcome is None else outcome
+    outcome["complete"] = False
+
+    try:
+        feed = driver.find_element(By.CSS_SELECTOR, 'div[role="feed"]')
+    except Exception as e:
+        logger.error(f"[Thread-{thread_id}] Scroll error: {e}")
+        return
+
+    seen = set()
+    offset = 0
+    yielded = 0
+    scroll_count = 0
 
     try:
-        scrollable = driver.find_element(By.CSS_SELECTOR, 'div[role="feed"]')
-        previous_height = 0
-        scroll_count = 0
+        for i in range(max_scrolls + 1):
+            batch = driver.execute_script(HARVEST_CARDS_SCRIPT, feed, offset)
+            offset = batch["total"]
+
+            for card, place_url in batch["cards"]:
+                key = place_url or id(card)
+                if key in seen:
+                    continue
+                seen.add(key)
+                yield place_url, card
+                yielded += 1
+                if max_results and yielded >= max_results:
+                    safe_print(f"[Thread-{thread_id}] ✓ Reached {max_results} results after {scroll_count} scrolls")
+                    return
+
+            if batch["end"]:
+                safe_print(f"[Thread-{thread_id}] Reached end of list at scroll {i + 1}")
+                outcome["complete"] = True
+                break
+            if i == max_scrolls:
+                break
 
-        for i in range(max_scrolls):
             # Add human behavior every 3 scrolls
             if i % 3 == 0:
                 simulate_human_behavior(driver)
 
-            driver.execute_script('arguments[0].scrollTop = arguments[0].scrollHeight', scrollable)
-
-            # Human-like pause between scrolls
-            pause_time = random.uniform(2, 4)
-            time.sleep(pause_time)
-
-            current_height = driver.execute_script('return arguments[0].scrollTop', scrollable)
+            scroll_start = time.time()
+            driver.execute_script('arguments[0].scrollTop = arguments[0].scrollHeight', feed)
 
-            if current_height == previous_height:
-                safe_print(f"[Thread-{thread_id}] Reached end at scroll {i + 1}")
+            # Wait for new cards to be appended rather than a fixed pause
+            appended = wait_for(driver, cards_appended(feed, offset), WAIT_TIMEOUTS["scroll"])
+            metrics.observe("scraper_stage_seconds", time.time() - scroll_start, stage="scroll")
+            if not appended:
+                safe_print(f"[Thread-{thread_id}] No new results after scroll {i + 1}")
+                outcome["complete"] = True
                 break
 
-            previous_height = current_height
             scroll_count += 1
+            if scroll_count % 3 == 0:
+                safe_print(f"[Thread-{thread_id}] Scrolled {scroll_count} times...")
+    except Exception as e:
+        logger.error(f"[Thread-{thread_id}] Scroll error: {e}")
+        metrics.inc("scraper_errors_total", stage="scroll", type=type(e).__name__)
 
-            if (i + 1) % 3 == 0:
-                safe_print(f"[Thread-{thread_id}] Scrolled {i + 1} times...")
+    safe_print(f"[Thread-{thread_id}] ✓ Completed {scroll_count} scrolls, {yielded} unique results")
 
-        safe_print(f"[Thread-{thread_id}] ✓ Completed {scroll_count} scrolls")
-        human_delay(2, 3)
+def scroll_results(driver, max_scrolls=15, thread_id=0):
+    """Scroll through results with human-like behavior"""
+    try:
+        for _ in stream_results(driver, max_scrolls=max_scrolls, thread_id=thread_id):
+            pass
         return True
 
     except Exception as e:
         logger.error(f"[Thread-{thread_id}] Scroll error: {e}")
         return False
 
+def read_detail_pane(driver):
+    """Read every detail field (with fallbacks) in a single in-page script call"""
+    return normalize_detail_fields(driver.execute_script(DETAIL_PANE_SCRIPT, DETAIL_SELECTORS) or {})
+
+def normalize_detail_fields(raw):
+    """Clean raw detail pane values into an output record"""
+    details = {}
+    for field in DETAIL_FIELDS:
+        value = (raw.get(field) or "").strip()
+        for prefix in DETAIL_PREFIXES.get(field, []):
+            if value.startswith(prefix):
+                value = value[len(prefix):].strip()
+        if field == "Rating" and value:
+            value = value.split()[0]
+        details[field] = value
+    return details
+
 def extract_business_details(driver, card, index, thread_id=0):
     """Extract details from a single business card"""
     try:
-        driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", card)
-        human_delay(0.5, 1)
+        start = time.time()
+        previous_title = driver.execute_script(DETAIL_TITLE_SCRIPT)
+        name = driver.execute_script(CARD_FOCUS_SCRIPT, card)
+        pace(start)
+        throttle(thread_id)
         card.click()
-        human_delay(2, 3.5)
-
-        # Extract name
-        try:
-            name = driver.find_element(By.CSS_SELECTOR, "h1.DUwDvf").text
-        except:
-            try:
-                name = driver.find_element(By.CSS_SELECTOR, "h1.fontHeadlineLarge").text
-            except:
-                name = ""
-
-        # Extract rating
-        try:
-            rating_element = driver.find_element(By.CSS_SELECTOR, "span.ceNzKf")
-            rating = rating_element.get_attribute("aria-label").split()[0]
-        except:
-            try:
-                rating = driver.find_element(By.CSS_SELECTOR, "div.F7nice span").text
-            except:
-                rating = ""
-
-        # Extract location
-        try:
-            location = driver.find_element(By.CSS_SELECTOR, "button[data-item-id='address']").get_attribute("aria-label")
-            location = location.replace("Address: ", "").replace("Address:", "").strip()
-        except:
-            try:
-                location = driver.find_element(By.CSS_SELECTOR, "button[data-tooltip='Copy address']").get_attribute("aria-label")
-            except:
-                location = ""
 
-        # Extract phone
-        try:
-            phone = driver.find_element(By.CSS_SELECTOR, "button[data-item-id^='phone:tel:']").get_attribute("aria-label")
-            phone = phone.replace("Phone: ", "").replace("Phone:", "").strip()
-        except:
-            try:
-                phone = driver.find_element(By.CSS_SELECTOR, "button[data-tooltip='Copy phone number']").get_attribute("aria-label")
-            except:
-                phone = ""
-
-        # Extract website
-        try:
-            website = driver.find_element(By.CSS_SELECTOR, "a[data-item-id='authority']").get_attribute("href")
-        except:
-            try:
-                website_element = driver.find_element(By.CSS_SELECTOR, "a[aria-label*='Website']")
-                website = website_element.get_attribute("href")
-            except:
-                website = ""
+        if not wait_for(driver, detail_pane_shows(name, previous_title), WAIT_TIMEOUTS["detail"]):
+            logger.warning(f"[Thread-{thread_id}] Detail pane for business {index} did not load in time")
+            metrics.inc("scraper_errors_total", stage="card", type="DetailTimeout")
 
-        return {
-            "Name": name,
-            "Location": location,
-            "Phone Number": phone,
-            "Email Address": "",
-            "Rating": rating,
-            "Website": website
-        }
+        details = read_detail_pane(driver)
+        metrics.observe("scraper_stage_seconds", time.time() - start, stage="card")
+        return details
 
     except Exception as e:
         logger.error(f"[Thread-{thread_id}] Error extracting business {index}: {str(e)[:50]}")
+        metrics.inc("scraper_errors_total", stage="card", type=type(e).__name__)
         return None
 
-def parse_cards_with_details(driver, thread_id=0):
-    """Extract all business cards from the feed"""
+def parse_cards_with_details(driver, thread_id=0, cards=None, zipcode=None, index=None):
+    """Extract business cards from the feed.
+
+    ``cards`` is an iterable of (place_url, card) such as ``stream_results``;
+    when omitted, every card currently in the feed is processed. With a
+    ``PlaceIndex``, cards for places already extracted this run are not clicked.
+    """
     safe_print(f"[Thread-{thread_id}] Extracting business data...")
 
     try:
-        feed_container = driver.find_element(By.CSS_SELECTOR, 'div[role="feed"]')
-        cards = feed_container.find_elements(By.CSS_SELECTOR, "div.Nv2PK")
-        total_cards = len(cards)
+        if cards is None:
+            feed_container = driver.find_element(By.CSS_SELECTOR, 'div[role="feed"]')
+            cards = [("", card) for card in feed_container.find_elements(By.CSS_SELECTOR, "div.Nv2PK")]
 
-        safe_print(f"[Thread-{thread_id}] ✓ Found {total_cards} listings")
+            safe_print(f"[Thread-{thread_id}] ✓ Found {len(cards)} listings")
 
-        if total_cards == 0:
-            safe_print(f"[Thread-{thread_id}] ⚠ No business cards found")
-            return []
+            if not cards:
+                safe_print(f"[Thread-{thread_id}] ⚠ No business cards found")
+                return []
 
+        total_cards = len(cards) if isinstance(cards, list) else "?"
+        processed = 0
         data = []
-        request_count = 0
-        start_time = time.time()
 
-        for idx, card in enumerate(cards):
+        for idx, (place_url, card) in enumerate(cards):
+            processed = idx + 1
+            metrics.inc("scraper_cards_total", outcome="seen")
             try:
-                # Rate limiting: pause after every 5 requests
-                if request_count >= 5:
-                    elapsed = time.time() - start_time
-                    if elapsed < 60:
-                        wait_time = 60 - elapsed
-                        safe_print(f"[Thread-{thread_id}] ⏸ Rate limiting: waiting {wait_time:.1f}s...")
-                        time.sleep(wait_time)
-                    request_count = 0
-                    start_time = time.time()
+                # Already extracted from another zipcode: just record the association
+                if index and index.check_card(place_url, zipcode):
+                    safe_print(f"[Thread-{thread_id}] ↷ [{idx + 1}/{total_cards}]: Known place, skipped")
+                    metrics.inc("scraper_cards_total", outcome="skipped_known")
+                    continue
 
                 details = extract_business_details(driver, card, idx + 1, thread_id)
 
                 if details and details.get("Name"):
+                    if place_url:
+                        details["Place URL"] = place_url
+                    if index and not index.add(details, zipcode):
+                        safe_print(f"[Thread-{thread_id}] ↷ [{idx + 1}/{total_cards}]: Duplicate of known place")
+                        metrics.inc("scraper_cards_total", outcome="duplicate")
+                        continue
                     data.append(details)
+                    metrics.inc("scraper_cards_total", outcome="extracted")
                     safe_print(f"[Thread-{thread_id}] ✓ [{idx + 1}/{total_cards}]: {details['Name'][:50]}")
                 else:
+                    metrics.inc("scraper_cards_total", outcome="empty")
                     safe_print(f"[Thread-{thread_id}] ⚠ Skipped [{idx + 1}/{total_cards}]: No data")
 
-                request_count += 1
-                human_delay(1.5, 3)
+                pace(time.time())
 
             except Exception as e:
                 logger.error(f"[Thread-{thread_id}] Error processing card {idx + 1}: {str(e)[:50]}")
                 continue
 
-        safe_print(f"[Thread-{thread_id}] ✓ Successfully extracted {len(data)} out of {total_cards}")
+        safe_print(f"[Thread-{thread_id}] ✓ Successfully extracted {len(data)} out of {processed}")
         return data
 
     except Exception as e:
         logger.error(f"[Thread-{thread_id}] Error in parse_cards: {e}")
         return []
 
+def parse_cards_list_mode(driver, thread_id=0, max_results=None):
+    """Extract list-level fields for every card with one script call (no clicks)"""
+    safe_print(f"[Thread-{thread_id}] Extracting business data (list mode)...")
+
+    start = time.time()
+    try:
+        cards = driver.execute_script(LIST_CARDS_SCRIPT) or []
+    except Exception as e:
+        logger.error(f"[Thread-{thread_id}] Error in list extraction: {e}")
+        metrics.inc("scraper_errors_total", stage="list_extract", type=type(e).__name__)
+        return []
+
+    data = list_cards_to_records(cards, max_results)
+    metrics.observe("scraper_stage_seconds", time.time() - start, stage="list_extract")
+    metrics.inc("scraper_cards_total", len(cards), outcome="seen")
+    metrics.inc("scraper_cards_total", len(data), outcome="extracted")
+
+    safe_print(f"[Thread-{thread_id}] ✓ Extracted {len(data)} out of {len(cards)} listings")
+    return data
+
+def list_cards_to_records(cards, max_results=None):
+    """Convert LIST_CARDS_SCRIPT output into output records"""
+    data = []
+    for card in cards:
+        if max_results and len(data) >= max_results:
+            break
+        if not card.get("name"):
+            continue
+        data.append({
+            "Name": card["name"],
+            "Location": card.get("address", ""),
+            "Phone Number": card.get("phone", ""),
+            "Email Address": "",
+            "Rating": card.get("rating", ""),
+            "Website": card.get("website", ""),
+            "Reviews": re.sub(r'[^0-9]', '', card.get("reviews", "")),
+            "Category": card.get("category", ""),
+            "Place URL": card.get("url", "")
+        })
+    return data
+
 def save_data_to_excel(data, folder_name, query, thread_id=0):
     """Save extracted data to Excel file"""
     if not data:
@@ -316,9 +736,57 @@ def save_data_to_excel(data, folder_name, query, thread_id=0):
         safe_query = re.sub(r'[^a-zA-Z0-9]', '_', query)[:30]
         filename = f"{folder_name}/{safe_query}_{timestamp}_thread{thread_id}.xlsx"
 
-        df.to_excel(filename, index=False, engine='openpyxl')
+        with metrics.timer(stage="excel_write"):
+            df.to_excel(filename, index=False, engine='openpyxl')
         safe_print(f"[Thread-{thread_id}] ✓ Saved {len(df)} records to: {filename}")
 
+def create_output_writer(folder_name, base_query, fmt="csv", results_store=None):
+    """Start the background writer for one run's records"""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    safe_query = re.sub(r'[^a-zA-Z0-9]', '_', base_query)[:30]
+    return OutputWriter(folder_name, f"{safe_query}_{timestamp}", fmt=fmt, results_store=results_store)
+
+def create_results_store(path=RESULTS_DB):
+    """Open the consolidated results store"""
+    return ResultsStore(path)
+
+def emit_records(data, base_query, zipcode, folder_name, thread_id=0, writer=None, places=None):
+    """Hand records to the run's writer, or save a per-zipcode Excel file without one.
+
+    ``places`` is the zipcode's full result set when ``data`` was deduplicated
+    against other zipcodes; the writer adds all of it to the results store.
+    """
+    metrics.inc("scraper_records_total", len(data))
+    if writer:
+        if data or places:
+            writer.submit(data, base_query, zipcode, places)
+        return
+    if data:
+        safe_query = f"{base_query.replace(' ', '_')}_{zipcode}"
+        save_data_to_excel(data, folder_name, safe_query, thread_id)
+
+def format_index_stats(stats):
+    """One-line summary of cross-zipcode place dedup"""
+    return (f"Unique places: {stats['unique_places']} | Skipped before click: {stats['skipped_before_click']} | "
+            f"Duplicates dropped: {stats['duplicates_after_extract']} | "
+            f"Duplicate rate: {stats['duplicate_rate'] * 100:.0f}% | Zipcode links: {stats['associations']}")
+
+def format_writer_losses(stats):
+    """Warning line for rows the output writer could not write, or None when nothing was lost"""
+    if not stats["failed"] and not stats["store_failed"]:
+        return None
+    return (f"⚠ Not written: {stats['failed']} records to the output file, "
+            f"{stats['store_failed']} to the results store (see the log)")
+
+def format_transfer_stats(results):
+    """One-line summary of bytes transferred by the zipcodes scraped in a browser"""
+    measured = [r["bytes"] for r in results if r.get("bytes")]
+    if not measured:
+        return f"Transferred: n/a (profile: {page_profile})"
+    total = sum(measured)
+    return (f"Transferred: {format_bytes(total)} | {format_bytes(total / len(measured))} per zipcode "
+            f"(profile: {page_profile})")
+
 def create_output_folder(folder_name):
     """Create output folder if it doesn't exist"""
     if not os.path.exists(folder_name):
@@ -326,91 +794,398 @@ def create_output_folder(folder_name):
         safe_print(f"✓ Created folder: {folder_name}")
     return folder_name
 
-def scrape_zipcode(zipcode, base_query, folder_name, thread_id=0):
+def create_driver_pool(size, max_jobs=25, max_rss_mb=1500):
+    """Create a pool of warm browsers shared by all scraper workers"""
+    return DriverPool(init_driver, size=size, max_jobs=max_jobs, max_rss_mb=max_rss_mb)
+
+def format_pool_stats(stats):
+    """One-line summary of driver pool activity"""
+    return (f"Browsers launched: {stats['launches']} | Leases: {stats['leases']} | "
+            f"Reused: {stats['reuses']} | Recycled: {stats['recycled_jobs'] + stats['recycled_memory']} | "
+            f"Crashes: {stats['crashes']} | Startup saved: ~{stats['estimated_time_saved']:.0f}s")
+
+def create_autoscaler(max_workers, min_workers=1, on_change=None):
+    """Worker controller that follows CPU, memory and shm usage within the cgroup limits"""
+    return Autoscaler(min_workers=min_workers, max_workers=max_workers, initial=min(2, max_workers),
+                      on_change=on_change)
+
+def format_autoscale_stats(stats):
+    """One-line summary of autoscaling with the concurrency timeline"""
+    changes = [e for e in stats['timeline'] if e['event'] != 'sample']
+    timeline = " → ".join(f"{e['time']:.0f}s:{e['workers']}" for e in changes[-12:])
+    return (f"Workers: {stats['min']}-{stats['max']} (peak {stats['peak']}, final {stats['current']}) | "
+            f"Scale-ups: {stats['scale_ups']} | Scale-downs: {stats['scale_downs']} | Timeline: {timeline}")
+
+def create_cost_model(journal):
+    """Run time predictions built from every job in the journal"""
+    return CostModel.from_journal(journal)
+
+def format_forecast(forecast):
+    """One-line summary of a scheduling forecast"""
+    sources = ", ".join(f"{n} {source}" for source, n in sorted(forecast['sources'].items()))
+    return (f"Forecast: ~{forecast['makespan'] / 60:.0f} min on {forecast['workers']} workers "
+            f"({forecast['total_work'] / 60:.0f} worker-min) | Based on: {sources or 'nothing'}")
+
+def write_run_summary(folder_name, base_query, overview):
+    """Write the run's metrics to summary_report_*.txt (readable) and .json (machine-readable)"""
+    summary = metrics.summary()
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    safe_query = re.sub(r'[^a-zA-Z0-9]', '_', base_query)[:30]
+    path = os.path.join(folder_name, f"summary_report_{safe_query}_{timestamp}")
+
+    perf = summarize(load_trace(perf_trace.path)) if perf_trace else None
+
+    with open(f"{path}.json", "w") as f:
+        json.dump({"overview": overview, **summary, **({"perf": perf} if perf else {})}, f, indent=2, default=str)
+    with open(f"{path}.txt", "w") as f:
+        f.write(format_summary(summary, overview))
+        if perf:
+            f.write("\n" + format_perf_summary(perf))
+    return f"{path}.txt"
+
+def run_overview(job_id, base_query, settings, results, elapsed):
+    """Headline numbers of a run for its summary report"""
+    return {
+        "Job": job_id,
+        "Query": base_query,
+        "Mode": settings.get("mode", "details"),
+        "Execution": settings.get("execution", "threads"),
+        "Page profile": settings.get("page_profile", DEFAULT_PROFILE),
+        "Zipcodes": len(results),
+        "Successful": sum(1 for r in results if r.get("status") == "success"),
+        "No data": sum(1 for r in results if r.get("status") == "no_data"),
+        "Failed": sum(1 for r in results if r.get("status") not in ("success", "no_data")),
+        "From cache": sum(1 for r in results if r.get("cached")),
+        "Records": sum(r.get("count", 0) for r in results),
+        "Run time (min)": round(elapsed / 60, 1),
+    }
+
+def create_result_cache(path=CACHE_DB, ttl_hours=CACHE_TTL_HOURS):
+    """Open the persistent result cache"""
+    return ResultCache(path, ttl_hours=ttl_hours)
+
+def scrape_zipcode(zipcode, base_query, folder_name, thread_id=0, pool=None, mode="details",
+                   max_scrolls=15, max_results=None, cache=None, writer=None, index=None):
     """Scrape a single zipcode with anti-detection features"""
+    result = _scrape_zipcode(zipcode, base_query, folder_name, thread_id, pool, mode,
+                             max_scrolls, max_results, cache, writer, index)
+    record_zipcode_metrics(result)
+    return result
+
+def record_zipcode_metrics(result):
+    """Count a finished zipcode and time it unless it came from the cache"""
+    metrics.inc("scraper_zipcodes_total", status=result.get("status", "error"), cached=bool(result.get("cached")))
+    if result.get("time") is not None and not result.get("cached"):
+        metrics.observe("scraper_stage_seconds", result["time"], stage="zipcode")
+
+def _scrape_zipcode(zipcode, base_query, folder_name, thread_id, pool, mode, max_scrolls, max_results,
+                    cache, writer, index):
     query = f"{base_query} {zipcode}"
+    start_time = time.time()
+
+    # Fresh cached results are served without touching a browser
+    if cache:
+        try:
+            cached = cache.get(base_query, zipcode, mode, max_results)
+        except Exception as e:
+            logger.warning(f"[Thread-{thread_id}] Cache lookup failed for {zipcode}: {e}")
+            cached = None
+
+        if cached is not None:
+            records = cached[:max_results] if max_results else cached
+            data = index.filter_new(records, zipcode) if index else records
+            elapsed = time.time() - start_time
+            emit_records(data, base_query, zipcode, folder_name, thread_id, writer, records if index else None)
+            if data:
+                safe_print(f"[Thread-{thread_id}] ✓ Cached {zipcode}: {len(data)} records")
+                return {"zipcode": zipcode, "count": len(data), "status": "success", "time": elapsed, "cached": True}
+            safe_print(f"[Thread-{thread_id}] ⚠ Cached: no data for {zipcode}")
+            return {"zipcode": zipcode, "count": 0, "status": "no_data", "time": elapsed, "cached": True}
 
     safe_print(f"[Thread-{thread_id}] {'='*50}")
     safe_print(f"[Thread-{thread_id}] Starting: '{query}'")
     safe_print(f"[Thread-{thread_id}] {'='*50}")
 
     driver = None
-    start_time = time.time()
+    failed = False
+    probe = None
+    network = None
+    result = None
 
     try:
-        driver = init_driver(thread_id)
+        with metrics.timer(stage="driver_acquire"):
+            driver = pool.acquire(thread_id) if pool else init_driver(thread_id)
+        # Discard traffic from earlier jobs on this browser
+        drain_network(driver)
+        if perf_trace:
+            probe = perf_trace.start(zipcode, getattr(driver, 'browser_pid', None) or id(driver),
+                                     read_perf_metrics(driver, enable=True))
 
         if not search_query(driver, query, thread_id):
-            return {"zipcode": zipcode, "count": 0, "status": "search_failed"}
-
-        scroll_results(driver, max_scrolls=15, thread_id=thread_id)
-        data = parse_cards_with_details(driver, thread_id)
+            result = {"zipcode": zipcode, "count": 0, "status": "search_failed"}
+            return result
+        if probe:
+            probe.mark("search", read_perf_metrics(driver))
+
+        # Scrolling and harvesting run together; extraction starts with the first batch
+        feed = {}
+        cards = stream_results(driver, max_scrolls=max_scrolls, max_results=max_results, thread_id=thread_id,
+                               outcome=feed)
+        if mode == "list":
+            for _ in cards:
+                pass
+            if probe:
+                probe.mark("scroll", read_perf_metrics(driver))
+            data = parse_cards_list_mode(driver, thread_id, max_results)
+            records = data
+            if index:
+                data = index.filter_new(data, zipcode)
+        else:
+            data = parse_cards_with_details(driver, thread_id, cards, zipcode, index)
+            # Known places were not clicked again but still belong to this zipcode's result set
+            records = index.records_for(zipcode) if index else data
 
         elapsed = time.time() - start_time
+        network = drain_network(driver)
+        transferred = network["bytes"] if network else None
+        size = f", {format_bytes(transferred)}" if network else ""
 
+        # An empty feed may just have failed to load, so it is never cached; capped feeds are partial
+        if cache and records:
+            try:
+                cache.put(base_query, zipcode, records, mode, complete=feed.get("complete", False))
+            except Exception as e:
+                logger.warning(f"[Thread-{thread_id}] Could not cache {zipcode}: {e}")
+
+        emit_records(data, base_query, zipcode, folder_name, thread_id, writer, records if index else None)
         if data:
-            safe_query = f"{base_query.replace(' ', '_')}_{zipcode}"
-            save_data_to_excel(data, folder_name, safe_query, thread_id)
-            safe_print(f"[Thread-{thread_id}] ✓ Completed {zipcode}: {len(data)} records in {elapsed:.1f}s")
-            return {"zipcode": zipcode, "count": len(data), "status": "success", "time": elapsed}
+            safe_print(f"[Thread-{thread_id}] ✓ Completed {zipcode}: {len(data)} records "
+                       f"({elapsed:.1f}s{size})")
+            result = {"zipcode": zipcode, "count": len(data), "status": "success", "time": elapsed, "bytes": transferred}
         else:
-            safe_print(f"[Thread-{thread_id}] ⚠ No data for {zipcode} ({elapsed:.1f}s)")
-            return {"zipcode": zipcode, "count": 0, "status": "no_data", "time": elapsed}
+            safe_print(f"[Thread-{thread_id}] ⚠ No data for {zipcode} ({elapsed:.1f}s{size})")
+            result = {"zipcode": zipcode, "count": 0, "status": "no_data", "time": elapsed, "bytes": transferred}
+        return result
 
     except Exception as e:
+        failed = True
         elapsed = time.time() - start_time
         logger.error(f"[Thread-{thread_id}] Error with {zipcode}: {e}")
-        return {"zipcode": zipcode, "count": 0, "status": "error", "error": str(e), "time": elapsed}
+        metrics.inc("scraper_errors_total", stage="zipcode", type=type(e).__name__)
+        result = {"zipcode": zipcode, "count": 0, "status": "error", "error": str(e), "time": elapsed}
+        return result
 
     finally:
-        if driver:
+        if probe:
+            probe.finish(result, network or drain_network(driver), read_perf_metrics(driver))
+        if driver and pool:
+            pool.release(driver, failed=failed)
+        elif driver:
             try:
                 driver.quit()
                 time.sleep(0.5)
             except:
                 pass
 
-def main():
-    """Main execution function"""
-    print("=" * 70)
-    print(" GOOGLE MAPS SCRAPER - ZIPCODE ITERATOR")
-    print("=" * 70)
-    print("Features: Anti-Detection | Rate Limiting | Human Behavior | Multi-Threading")
-    print("=" * 70)
-
+def prompt_new_job(journal):
+    """Ask for the job inputs and register the job in the journal; returns its id"""
     base_query = input("\nEnter search keywords (e.g., 'attorneys'): ").strip()
     if not base_query:
         print("\n✗ Error: Search keywords cannot be empty!")
-        return
+        return None
+
+    mode = input("\nExtraction mode - 'details' (click every card) or 'list' (fast, no clicks) [details]: ").strip().lower() or "details"
+    if mode not in EXTRACTION_MODES:
+        print(f"\n✗ Error: Unknown extraction mode: {mode}")
+        return None
+
+    max_results = input("\nMax results per zipcode (blank for all): ").strip()
+    max_results = int(max_results) if max_results.isdigit() else None
+
+    # Tab mode needs the websockets package (imported here: cdp_engine imports this module)
+    import cdp_engine
+    modes = [m for m in EXECUTION_MODES if m != "tabs" or cdp_engine.ENGINE_AVAILABLE]
+    execution = input(f"\nExecution mode {modes} [threads]: ").strip().lower() or "threads"
+    if execution not in modes:
+        print(f"\n✗ Error: Unavailable execution mode: {execution}")
+        return None
+
+    autoscale = input("\nAutoscale workers to CPU/memory/shm limits? [y/N]: ").strip().lower() == "y"
+
+    profile = input(f"\nPage profile {list(PAGE_PROFILES)} [{DEFAULT_PROFILE}]: ").strip().lower() or DEFAULT_PROFILE
+    if profile not in PAGE_PROFILES:
+        print(f"\n✗ Error: Unknown page profile: {profile}")
+        return None
 
-    excel_path = input("\nEnter Excel file path: ").strip()
+    perf_capture = input("\nCapture Chrome performance trace per zipcode? [y/N]: ").strip().lower() == "y"
+    measure = perf_capture or input("\nMeasure bytes transferred per zipcode? [y/N]: ").strip().lower() == "y"
+
+    output_format = input(f"\nOutput format {OUTPUT_FORMATS} [csv]: ").strip().lower() or "csv"
+    if output_format not in OUTPUT_FORMATS:
+        print(f"\n✗ Error: Unsupported output format: {output_format}")
+        return None
+
+    excel_path = input(f"\nEnter input file path {list(INPUT_EXTENSIONS)}: ").strip()
     if not os.path.exists(excel_path):
         print(f"\n✗ Error: File not found: {excel_path}")
-        return
+        return None
 
-    # Read Excel with dtype=str to preserve leading zeros
-    df = pd.read_excel(excel_path, dtype={"DELIVERY ZIPCODE": str})
-    df["DELIVERY ZIPCODE"] = df["DELIVERY ZIPCODE"].astype(str).str.zfill(5)
-    zipcodes = df["DELIVERY ZIPCODE"].unique().tolist()
+    # Only the zipcode column is read; leading zeros are restored
+    try:
+        zipcodes = load_zipcodes(excel_path, DEFAULT_ZIPCODE_COLUMN)
+    except (ValueError, RuntimeError) as e:
+        print(f"\n✗ Error: {e}")
+        return None
 
     print(f"\n✓ Loaded {len(zipcodes)} unique zipcodes")
     print(f"First few: {', '.join(zipcodes[:5])}")
 
-    folder_name = create_output_folder("google_maps_data")
+    settings = {
+        "mode": mode,
+        "max_results": max_results,
+        "max_scrolls": 15,
+        "output_format": output_format,
+        "execution": execution,
+        "page_profile": profile,
+        "autoscale": autoscale,
+        "perf_capture": perf_capture,
+        "measure_transfer": measure,
+        "zipcode_column": DEFAULT_ZIPCODE_COLUMN,
+        "folder": "google_maps_data",
+    }
+    return journal.start_job(excel_path, base_query, zipcodes, settings)
+
+def main():
+    """Main execution function
+
+    Run without arguments to start a new job, or with ``--resume [JOB_ID]`` to
+    reschedule the unfinished zipcodes of an interrupted job (latest by default).
+    """
+    print("=" * 70)
+    print(" GOOGLE MAPS SCRAPER - ZIPCODE ITERATOR")
+    print("=" * 70)
+    print("Features: Anti-Detection | Rate Limiting | Human Behavior | Multi-Threading")
+    print("=" * 70)
+
+    journal = RunJournal(JOURNAL_DB)
+    if METRICS_PORT:
+        start_metrics_server(METRICS_PORT)
+
+    if len(sys.argv) > 1 and sys.argv[1] == "--resume":
+        job_id = sys.argv[2] if len(sys.argv) > 2 else journal.latest_resumable()
+        if not job_id or not journal.get_job(job_id):
+            print("\n✗ Error: No resumable job found!")
+            return
+        print(f"\n✓ Resuming job {job_id}")
+    else:
+        job_id = prompt_new_job(journal)
+        if not job_id:
+            return
+
+    job = journal.get_job(job_id)
+    base_query = job["base_query"]
+    settings = job["settings"]
+    mode = settings.get("mode", "details")
+    max_results = settings.get("max_results")
+    max_scrolls = settings.get("max_scrolls", 15)
+    zipcodes = journal.pending_zipcodes(job_id)
+
+    if not zipcodes:
+        journal.finish_job(job_id)
+        print("\n✓ Nothing left to scrape for this job")
+        return
+
+    folder_name = create_output_folder(settings.get("folder", "google_maps_data"))
+    journal.set_status(job_id, "running")
+    configure_page_profile(settings.get("page_profile", DEFAULT_PROFILE))
+    configure_perf_capture(trace_path(folder_name, job_id) if settings.get("perf_capture") else None)
+    configure_transfer_accounting(settings.get("measure_transfer", measure_transfer))
+
+    # Detect Chrome and patch chromedriver once, before workers start racing for it
+    try:
+        chrome = bootstrap_chrome()
+        print(f"✓ Chrome {chrome['version']} ready (driver: {chrome['driver_path']})")
+    except Exception as e:
+        print(f"⚠ Chrome bootstrap failed, drivers will be patched per launch: {e}")
 
     # Multi-threaded execution
-    max_workers = min(4, len(zipcodes))
+    autoscale = settings.get("autoscale") and settings.get("execution") != "tabs"
+    max_workers = min(AUTOSCALE_MAX_WORKERS if autoscale else 4, len(zipcodes))
     results = []
+    pool = create_driver_pool(max_workers)
+
+    # The driver pool size is the concurrency limit; the autoscaler moves it with resource usage
+    autoscaler = create_autoscaler(max_workers, on_change=pool.resize).start() if autoscale else None
+
+    # Longest-expected zipcodes go first so a slow one never holds the run open at the end
+    cost_model = create_cost_model(journal)
+    zipcodes = cost_model.order(base_query, zipcodes, mode)
+    forecast = cost_model.forecast(base_query, zipcodes, max_workers, mode)
+    print(f"✓ {format_forecast(forecast)}")
+    run_start = time.time()
+    metrics.reset()
+    cache = create_result_cache()
+    writer = create_output_writer(folder_name, base_query, settings.get("output_format", "csv"),
+                                  create_results_store())
+    index = PlaceIndex(base_query)
+
+    supervisor = None
+    tab_stats = None
+
+    def on_process_result(result, records):
+        if records:
+            # Every place stays in the results store under this zipcode; the output file gets new ones only
+            writer.submit(index.filter_new(records, result["zipcode"]), base_query, result["zipcode"], records)
+        results.append(result)
+        journal.record(job_id, result)
 
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        future_to_zip = {
-            executor.submit(scrape_zipcode, zipcode, base_query, folder_name, i): zipcode 
-            for i, zipcode in enumerate(zipcodes)
-        }
-
-        for future in as_completed(future_to_zip):
-            result = future.result()
-            results.append(result)
+    try:
+        if settings.get("execution") == "processes":
+            # Each worker process owns its browser; crashes and hangs only cost that worker
+            supervisor = ProcessSupervisor(
+                max_workers, base_query, folder_name, mode, max_scrolls, max_results,
+                RATE_LIMIT_PER_MINUTE, CACHE_DB, CACHE_TTL_HOURS, page_profile=page_profile,
+                autoscaler=autoscaler, perf_trace=perf_trace.path if perf_trace else None,
+                measure_transfer=measure_transfer
+            )
+            supervisor.run(zipcodes, on_process_result)
+        elif settings.get("execution") == "tabs":
+            # One Chrome hosts every job as an isolated tab (imported here: cdp_engine imports this module)
+            import cdp_engine
+
+            def on_tab_result(result, records):
+                places = index.records_for(result["zipcode"])
+                if records or places:
+                    writer.submit(records, base_query, result["zipcode"], places)
+                results.append(result)
+                journal.record(job_id, result)
+
+            tabs = min(settings.get("tabs", cdp_engine.DEFAULT_CONCURRENCY), len(zipcodes))
+            _, tab_stats = cdp_engine.run_tab_mode(
+                zipcodes, base_query, tabs, settings.get("browsers", 1), mode, max_scrolls, max_results,
+                on_tab_result, index, cache, page_profile
+            )
+        else:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                future_to_zip = {
+                    executor.submit(scrape_zipcode, zipcode, base_query, folder_name, i, pool, mode,
+                                    max_scrolls, max_results, cache, writer, index): zipcode 
+                    for i, zipcode in enumerate(zipcodes)
+                }
+
+                for future in as_completed(future_to_zip):
+                    result = future.result()
+                    results.append(result)
+                    journal.record(job_id, result)
+    finally:
+        if autoscaler:
+            autoscaler.stop()
+        pool.close()
+        excel_path = writer.close()
+        associations_path = index.export_associations(f"{os.path.splitext(writer.path)[0]}_zipcode_places.csv")
+        job_status = journal.finish_job(job_id)
+        summary_path = write_run_summary(
+            folder_name, base_query, run_overview(job_id, base_query, settings, results, time.time() - run_start))
 
     # Summary
     successful = sum(1 for r in results if r["status"] == "success")
@@ -420,8 +1195,39 @@ def main():
     print("SCRAPING COMPLETE")
     print("=" * 70)
     print(f"Successful: {successful}/{len(zipcodes)}")
+    print(f"Run time: {(time.time() - run_start) / 60:.1f} min (forecast ~{forecast['makespan'] / 60:.0f} min)")
     print(f"Total records: {total_records}")
     print(f"Output folder: {folder_name}/")
+    print(f"Records file: {writer.path}")
+    losses = format_writer_losses(writer.stats())
+    if losses:
+        print(losses)
+    print(f"Results store: {RESULTS_DB} (query with: python results_store.py --db {RESULTS_DB} query --query \"{base_query}\")")
+    if excel_path:
+        print(f"Excel export: {excel_path}")
+    print(f"Zipcode → place links: {associations_path}")
+    print(format_index_stats(index.stats()))
+    print(format_transfer_stats(results))
+    cached = sum(1 for r in results if r.get("cached"))
+    print(f"Cache hit rate: {cached / len(results) * 100 if results else 0:.0f}% ({cached} zipcodes served from cache)")
+    if supervisor:
+        stats = supervisor.stats()
+        print(f"Worker processes started: {stats['started']} | Crashes: {stats['crashes']} | "
+              f"Timeouts: {stats['timeouts']} | Retries: {stats['retries']}")
+    elif tab_stats:
+        print(cdp_engine.format_tab_stats(tab_stats))
+        print(format_rate_limit_stats(rate_limiter.metrics()))
+    else:
+        print(format_pool_stats(pool.stats()))
+        print(format_rate_limit_stats(rate_limiter.metrics()))
+    if autoscaler:
+        print(format_autoscale_stats(autoscaler.stats()))
+    print(f"Run summary: {summary_path}")
+    if perf_trace:
+        print(f"Performance trace: {perf_trace.path} (summarize with: python perf_capture.py {perf_trace.path})")
+    print(f"Job: {job_id} ({job_status})")
+    if job_status != "completed":
+        print(f"Retry unfinished zipcodes with: python {os.path.basename(__file__)} --resume {job_id}")
     print("=" * 70)
 
 if __name__ == "__main__":
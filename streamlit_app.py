@@ -7,13 +7,12 @@ Correctly imports from scrape_zip_optimized.py
 import streamlit as st
 import pandas as pd
 import os
+import re
 import sys
 import time
 import threading
 from datetime import datetime
 from pathlib import Path
-import zipfile
-import io
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Add app directory to path
@@ -22,6 +21,11 @@ sys.path.insert(0, '/app')
 # Import scraper functions from scrape_zip_optimized
 try:
     import scrape_zip_optimized as scraper
+    import cdp_engine
+    from run_state import RunState
+    import input_loader
+    from output_catalog import OutputCatalog
+    from results_store import ResultsStore, ORDERINGS as RESULT_ORDERINGS, parse_zipcodes
 except ImportError:
     st.error("❌ Error: Could not import scraper module. Check if scrape_zip_optimized.py exists.")
     st.stop()
@@ -38,24 +42,83 @@ st.set_page_config(
 EXCEL_PATH = "/app/excel_files"
 OUTPUT_PATH = "/app/output"
 LOGS_PATH = "/app/logs"
+DATA_PATH = "/app/data"
+CACHE_DB = os.path.join(DATA_PATH, "result_cache.sqlite")
+JOURNAL_DB = os.path.join(DATA_PATH, "run_journal.sqlite")
+RESULTS_DB = os.path.join(DATA_PATH, "results.sqlite")
+
+# Result files shown in the Download tab
+RESULT_MIME_TYPES = {
+    '.xlsx': "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    '.csv': "text/csv",
+    '.parquet': "application/octet-stream",
+    '.sqlite': "application/x-sqlite3",
+}
+
+# Result files listed per page in the Download tab
+RESULTS_PER_PAGE = 25
+
+# Places shown per page in the Results tab
+PLACES_PER_PAGE = 50
 
 # Create directories
-for path in [EXCEL_PATH, OUTPUT_PATH, LOGS_PATH]:
+for path in [EXCEL_PATH, OUTPUT_PATH, LOGS_PATH, DATA_PATH]:
     os.makedirs(path, exist_ok=True)
 
-# Session state initialization
-if 'scraping_active' not in st.session_state:
-    st.session_state.scraping_active = False
-if 'scraping_results' not in st.session_state:
-    st.session_state.scraping_results = []
-if 'scraping_stats' not in st.session_state:
-    st.session_state.scraping_stats = {
-        'total': 0,
-        'completed': 0,
-        'successful': 0,
-        'failed': 0,
-        'start_time': None
-    }
+# Durable job journal (survives container restarts)
+journal = scraper.RunJournal(JOURNAL_DB)
+
+# Every run's records in one indexed table for the Results tab
+results_store = ResultsStore(RESULTS_DB)
+
+
+@st.cache_resource
+def start_metrics_endpoint():
+    """Serve /metrics once per server process when SCRAPER_METRICS_PORT is set"""
+    return scraper.start_metrics_server(scraper.METRICS_PORT) if scraper.METRICS_PORT else None
+
+
+start_metrics_endpoint()
+
+
+@st.cache_resource(ttl=300)
+def load_cost_model():
+    """Run time predictions from the journal, rebuilt at most every 5 minutes"""
+    return scraper.create_cost_model(journal)
+
+@st.cache_resource
+def get_result_cache(ttl_hours):
+    """Result cache per freshness setting, opened once instead of on every rerun"""
+    return scraper.create_result_cache(CACHE_DB, ttl_hours)
+
+@st.cache_resource
+def get_output_catalog():
+    """Index of the output folder, shared by every session; archives are cached under DATA_PATH"""
+    return OutputCatalog(OUTPUT_PATH, archive_dir=os.path.join(DATA_PATH, "archives"))
+
+
+catalog = get_output_catalog()
+
+
+@st.cache_resource
+def get_run_state():
+    """Progress of the current run, shared by the scraper thread and every browser session"""
+    return RunState()
+
+
+run_state = get_run_state()
+
+# Seconds between refreshes of the progress views (an idle refresh is one constant-cost snapshot)
+PROGRESS_REFRESH_SECONDS = 2
+
+# Whether a run was active when this page was drawn
+st.session_state.page_run_active = run_state.active
+
+
+def watch_run(snap):
+    """Rerun the whole page once a run starts or finishes in any session, so every tab follows it"""
+    if snap['active'] != st.session_state.get('page_run_active', snap['active']):
+        st.rerun()
 
 # CSS styling
 st.markdown("""
@@ -85,17 +148,39 @@ st.markdown("---")
 with st.sidebar:
     st.title("⚙️ System Status")
 
-    if st.session_state.scraping_active:
-        st.success("🟢 **SCRAPING ACTIVE**")
-    else:
-        st.info("⚪ **IDLE**")
+    @st.fragment(run_every=PROGRESS_REFRESH_SECONDS)
+    def sidebar_status():
+        snap = run_state.snapshot(recent=0)
+        if snap['active']:
+            st.success("🟢 **SCRAPING ACTIVE**")
+        else:
+            st.info("⚪ **IDLE**")
+        watch_run(snap)
+
+        if snap['total'] > 0:
+            st.markdown("---")
+            st.subheader("📊 Progress")
+            st.progress(snap['completed'] / snap['total'])
+            st.write(f"**{snap['completed']}/{snap['total']}** zipcodes")
+            st.write(f"✅ Success: {snap['successful']}")
+            st.write(f"❌ Failed: {snap['failed']}")
+            st.write(f"⏱️ Time: {snap['elapsed']/60:.1f} min")
+
+            if snap['completed'] > 0 and snap['active']:
+                remaining = (snap['total'] - snap['completed']) * snap['elapsed'] / snap['completed'] / 60
+                st.write(f"⏳ Remaining: ~{remaining:.0f} min")
+
+        if snap['error']:
+            st.error(f"❌ {snap['error']}")
+
+    sidebar_status()
 
     st.markdown("---")
 
     # File counts
     try:
-        excel_count = len([f for f in os.listdir(EXCEL_PATH) if f.endswith('.xlsx')])
-        output_count = len([f for f in os.listdir(OUTPUT_PATH) if f.endswith('.xlsx')])
+        excel_count = len(input_loader.list_input_files(EXCEL_PATH))
+        output_count = catalog.count(RESULT_MIME_TYPES)
 
         col1, col2 = st.columns(2)
         with col1:
@@ -106,47 +191,24 @@ with st.sidebar:
         st.metric("📤 Inputs", 0)
         st.metric("📥 Outputs", 0)
 
-    st.markdown("---")
-
-    # Scraping stats
-    if st.session_state.scraping_active or st.session_state.scraping_stats['total'] > 0:
-        st.subheader("📊 Progress")
-        stats = st.session_state.scraping_stats
-
-        if stats['total'] > 0:
-            progress = stats['completed'] / stats['total']
-            st.progress(progress)
-            st.write(f"**{stats['completed']}/{stats['total']}** zipcodes")
-            st.write(f"✅ Success: {stats['successful']}")
-            st.write(f"❌ Failed: {stats['failed']}")
-
-            if stats['start_time']:
-                elapsed = time.time() - stats['start_time']
-                st.write(f"⏱️ Time: {elapsed/60:.1f} min")
-
-                if stats['completed'] > 0 and st.session_state.scraping_active:
-                    avg_time = elapsed / stats['completed']
-                    remaining = (stats['total'] - stats['completed']) * avg_time / 60
-                    st.write(f"⏳ Remaining: ~{remaining:.0f} min")
-
     st.markdown("---")
     st.caption("Built with Streamlit 🎈")
     st.caption("Powered by Selenium + Chrome")
 
 # Main tabs
-tab1, tab2, tab3, tab4 = st.tabs(["📤 Upload", "🚀 Run", "📊 Progress", "📥 Download"])
+tab1, tab2, tab3, tab4, tab5 = st.tabs(["📤 Upload", "🚀 Run", "📊 Progress", "📥 Download", "🔎 Results"])
 
 # ============================================================================
 # TAB 1: UPLOAD FILES
 # ============================================================================
 with tab1:
-    st.header("📤 Upload Excel Files")
+    st.header("📤 Upload Input Files")
 
     uploaded_files = st.file_uploader(
-        "Choose Excel files (.xlsx)",
-        type=['xlsx'],
+        f"Choose input files ({', '.join(input_loader.INPUT_EXTENSIONS)})",
+        type=[ext.lstrip('.') for ext in input_loader.INPUT_EXTENSIONS],
         accept_multiple_files=True,
-        help="Upload Excel files containing zipcodes"
+        help="Upload Excel, CSV or Parquet files containing zipcodes"
     )
 
     if uploaded_files:
@@ -156,7 +218,7 @@ with tab1:
         for uploaded_file in uploaded_files:
             with st.expander(f"📄 {uploaded_file.name} ({uploaded_file.size/1024:.2f} KB)"):
                 try:
-                    df = pd.read_excel(uploaded_file)
+                    df = input_loader.read_table(uploaded_file, uploaded_file.name)
                     st.write(f"**Rows:** {len(df)} | **Columns:** {len(df.columns)}")
                     st.write("**Column Names:**", ", ".join(df.columns.tolist()))
                     st.dataframe(df.head(5))
@@ -187,7 +249,7 @@ with tab1:
     st.subheader("📂 Uploaded Files on Server")
 
     try:
-        excel_files = [f for f in os.listdir(EXCEL_PATH) if f.endswith('.xlsx')]
+        excel_files = input_loader.list_input_files(EXCEL_PATH)
 
         if excel_files:
             for file in excel_files:
@@ -205,7 +267,7 @@ with tab1:
                         os.remove(file_path)
                         st.rerun()
         else:
-            st.info("No files uploaded yet. Upload Excel files above to get started.")
+            st.info("No files uploaded yet. Upload input files above to get started.")
     except Exception as e:
         st.error(f"Error listing files: {e}")
 
@@ -213,90 +275,229 @@ with tab1:
 # TAB 2: RUN SCRAPER
 # ============================================================================
 
-def run_scraper_thread(selected_file, base_query, zipcode_column, max_workers, max_scrolls):
-    """Background thread that executes the scraper"""
+def run_scraper_thread(selected_file, base_query, zipcode_column, max_workers, max_scrolls, mode="details",
+                       max_results=None, rate_per_minute=scraper.RATE_LIMIT_PER_MINUTE, cache_ttl_hours=None,
+                       resume_job_id=None, output_format="csv", dedupe_places=True, execution="threads",
+                       tabs_per_browser=cdp_engine.DEFAULT_CONCURRENCY, page_profile=scraper.DEFAULT_PROFILE, autoscale=False,
+                       perf_capture=False, measure_transfer=False, cost_model=None, cache=None):
+    """Background thread that executes the scraper.
+
+    ``cost_model`` and ``cache`` are st.cache_resource instances resolved on the
+    script thread; this thread has no ScriptRunContext to call those functions from.
+    """
+    pool = None
+    autoscaler = None
+    writer = None
+    index = None
+    job_id = resume_job_id
     try:
-        # Read Excel file
-        file_path = os.path.join(EXCEL_PATH, selected_file)
-        df = pd.read_excel(file_path, dtype={zipcode_column: str})
-
-        # Clean and prepare zipcodes
-        df[zipcode_column] = df[zipcode_column].astype(str).str.zfill(5)
-        zipcodes = df[zipcode_column].unique().tolist()
-
-        # Initialize stats
-        st.session_state.scraping_stats = {
-            'total': len(zipcodes),
-            'completed': 0,
-            'successful': 0,
-            'failed': 0,
-            'start_time': time.time()
-        }
-        st.session_state.scraping_results = []
-
-        # Run scraper using ThreadPoolExecutor (from scrape_zip_optimized.py)
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = {
-                executor.submit(
-                    scraper.scrape_zipcode,
-                    zipcode,
-                    base_query,
-                    OUTPUT_PATH,
-                    i % max_workers
-                ): zipcode
-                for i, zipcode in enumerate(zipcodes)
-            }
-
-            for future in as_completed(futures):
-                zipcode = futures[future]
-                try:
-                    result = future.result()
-
-                    # Update stats
-                    st.session_state.scraping_stats['completed'] += 1
-
-                    if result.get('status') == 'success':
-                        st.session_state.scraping_stats['successful'] += 1
-                    else:
-                        st.session_state.scraping_stats['failed'] += 1
-
-                    # Store result
-                    st.session_state.scraping_results.append({
-                        'zipcode': zipcode,
-                        'status': result.get('status', 'unknown'),
-                        'count': result.get('count', 0),
-                        'time': result.get('time', 0)
-                    })
-
-                except Exception as e:
-                    st.session_state.scraping_stats['failed'] += 1
-                    st.session_state.scraping_stats['completed'] += 1
-                    st.session_state.scraping_results.append({
-                        'zipcode': zipcode,
-                        'status': 'error',
-                        'error': str(e)
-                    })
+        if resume_job_id:
+            # Only the zipcodes that never finished (or failed) are rescheduled
+            zipcodes = journal.pending_zipcodes(resume_job_id)
+            journal.set_status(resume_job_id, 'running')
+        else:
+            # Usually already parsed for the Run tab's estimate
+            file_path = os.path.join(EXCEL_PATH, selected_file)
+            zipcodes = input_loader.load_zipcodes(file_path, zipcode_column)
+
+            job_id = journal.start_job(file_path, base_query, zipcodes, {
+                'zipcode_column': zipcode_column,
+                'max_workers': max_workers,
+                'max_scrolls': max_scrolls,
+                'mode': mode,
+                'max_results': max_results,
+                'rate_per_minute': rate_per_minute,
+                'cache_ttl_hours': cache_ttl_hours,
+                'output_format': output_format,
+                'dedupe_places': dedupe_places,
+                'execution': execution,
+                'tabs_per_browser': tabs_per_browser,
+                'page_profile': page_profile,
+                'autoscale': autoscale,
+                'perf_capture': perf_capture,
+                'measure_transfer': measure_transfer,
+                'folder': OUTPUT_PATH
+            })
+
+        # Longest-expected zipcodes first, so no slow zipcode is left for the end
+        if cost_model:
+            zipcodes = cost_model.order(base_query, zipcodes, mode)
+
+        run_state.set_job(job_id, len(zipcodes))
+        scraper.metrics.reset()
+
+        # One request budget for all workers, however many there are
+        limiter = scraper.configure_rate_limit(rate_per_minute)
+
+        # Browsers launched from here on use the selected page profile
+        scraper.configure_page_profile(page_profile)
+
+        # Per-zipcode heap, DOM, network and main-thread samples for this job
+        perf_trace = scraper.configure_perf_capture(
+            scraper.trace_path(OUTPUT_PATH, job_id) if perf_capture else None)
+
+        # Bytes per zipcode come from Chrome's performance log, which is only enabled when asked for
+        scraper.configure_transfer_accounting(measure_transfer)
+
+        # Records stream to one per-run file; Excel is exported once at the end
+        writer = scraper.create_output_writer(OUTPUT_PATH, base_query, output_format, results_store)
+
+        # Places already extracted for another zipcode are not clicked again
+        index = scraper.PlaceIndex(base_query) if dedupe_places else None
+
+        def record_result(zipcode, result):
+            journal.record(job_id, result)
+
+            stats = {'rate_limit': limiter.metrics()}
+            if pool:
+                stats['pool'] = pool.stats()
+            if autoscaler:
+                stats['autoscale'] = autoscaler.stats()
+            if index:
+                stats['places'] = index.stats()
+            run_state.update(**stats)
+            run_state.record({**result, 'zipcode': zipcode})
+
+        # Warm browsers are leased per zipcode instead of launched per zipcode
+        pool = scraper.create_driver_pool(max_workers) if execution == 'threads' else None
+
+        # Worker count follows CPU, memory and shm usage, with the slider as the ceiling
+        if autoscale and execution != 'tabs':
+            autoscaler = scraper.create_autoscaler(max_workers, on_change=pool.resize if pool else None).start()
+
+        if execution == 'processes':
+            # Worker processes own their browsers; the supervisor restarts crashed or hung ones
+            def on_process_result(result, records):
+                if records:
+                    # Every place stays in the results store under this zipcode; the output file gets new ones only
+                    new = index.filter_new(records, result['zipcode']) if index else records
+                    writer.submit(new, base_query, result['zipcode'], records)
+                record_result(result['zipcode'], result)
+
+            supervisor = scraper.ProcessSupervisor(
+                max_workers, base_query, OUTPUT_PATH, mode, max_scrolls, max_results,
+                rate_per_minute, CACHE_DB, cache_ttl_hours, page_profile=page_profile, autoscaler=autoscaler,
+                perf_trace=perf_trace.path if perf_trace else None, measure_transfer=measure_transfer
+            )
+            # FORCE STOP drops zipcodes not yet handed to a worker; they stay pending in the journal
+            supervisor.run(zipcodes, on_process_result, should_stop=lambda: run_state.stop_requested)
+            run_state.update(workers=supervisor.stats())
+        elif execution == 'tabs':
+            # Each browser hosts several isolated tabs; a zipcode leases a tab, not a browser
+            def on_tab_result(result, records):
+                places = index.records_for(result['zipcode']) if index else None
+                if records or places:
+                    writer.submit(records, base_query, result['zipcode'], places)
+                record_result(result['zipcode'], result)
+
+            _, tab_stats = cdp_engine.run_tab_mode(
+                zipcodes, base_query, max(1, min(max_workers * tabs_per_browser, len(zipcodes))), max_workers,
+                mode, max_scrolls, max_results, on_tab_result, index, cache, page_profile,
+                should_stop=lambda: run_state.stop_requested
+            )
+            run_state.update(tabs=tab_stats)
+        else:
+            # Run scraper using ThreadPoolExecutor (from scrape_zip_optimized.py)
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = {
+                    executor.submit(
+                        scraper.scrape_zipcode,
+                        zipcode,
+                        base_query,
+                        OUTPUT_PATH,
+                        i % max_workers,
+                        pool,
+                        mode,
+                        max_scrolls,
+                        max_results,
+                        cache,
+                        writer,
+                        index
+                    ): zipcode
+                    for i, zipcode in enumerate(zipcodes)
+                }
+
+                for future in as_completed(futures):
+                    # Zipcodes not yet started are dropped and stay pending in the journal
+                    if run_state.stop_requested:
+                        for pending in futures:
+                            pending.cancel()
+                    if future.cancelled():
+                        continue
+                    zipcode = futures[future]
+                    try:
+                        record_result(zipcode, future.result())
+                    except Exception as e:
+                        record_result(zipcode, {'zipcode': zipcode, 'status': 'error', 'error': str(e)})
 
     except Exception as e:
-        st.error(f"Scraper error: {e}")
+        # st.error does nothing off the script thread; dashboards read the error from the run state
+        run_state.fail(f"Scraper error: {e}")
     finally:
-        st.session_state.scraping_active = False
+        if autoscaler:
+            autoscaler.stop()
+            run_state.update(autoscale=autoscaler.stats())
+        if pool:
+            pool.close()
+            run_state.update(pool=pool.stats())
+        if writer:
+            writer.close()
+            losses = scraper.format_writer_losses(writer.stats())
+            if losses:
+                run_state.fail(losses)
+            if index:
+                index.export_associations(f"{os.path.splitext(writer.path)[0]}_zipcode_places.csv")
+        if job_id:
+            journal.finish_job(job_id)
+            try:
+                # Stage timings, card outcomes and errors for the Download tab's summary reports
+                scraper.write_run_summary(OUTPUT_PATH, base_query, scraper.run_overview(
+                    job_id, base_query, journal.get_job(job_id)['settings'], run_state.results(),
+                    run_state.snapshot(recent=0)['elapsed']
+                ))
+            except Exception as e:
+                run_state.fail(f"Could not write run summary: {e}")
+        run_state.finish()
+
+def resume_scraper_thread(job_id, cost_model=None, cache=None):
+    """Background thread that resumes an interrupted job with its original settings"""
+    job = journal.get_job(job_id)
+    settings = job['settings']
+    run_scraper_thread(
+        os.path.basename(job['input_file']),
+        job['base_query'],
+        settings.get('zipcode_column', 'DELIVERY ZIPCODE'),
+        settings.get('max_workers', 3),
+        settings.get('max_scrolls', 10),
+        settings.get('mode', 'details'),
+        settings.get('max_results'),
+        settings.get('rate_per_minute', scraper.RATE_LIMIT_PER_MINUTE),
+        settings.get('cache_ttl_hours'),
+        resume_job_id=job_id,
+        output_format=settings.get('output_format', 'csv'),
+        dedupe_places=settings.get('dedupe_places', True),
+        execution=settings.get('execution', 'threads'),
+        tabs_per_browser=settings.get('tabs_per_browser', cdp_engine.DEFAULT_CONCURRENCY),
+        page_profile=settings.get('page_profile', scraper.DEFAULT_PROFILE),
+        autoscale=settings.get('autoscale', False),
+        perf_capture=settings.get('perf_capture', False),
+        measure_transfer=settings.get('measure_transfer', False),
+        cost_model=cost_model,
+        cache=cache
+    )
 
 with tab2:
     st.header("🚀 Run Web Scraper")
 
-    try:
-        excel_files = [f for f in os.listdir(EXCEL_PATH) if f.endswith('.xlsx')]
-    except:
-        excel_files = []
+    excel_files = input_loader.list_input_files(EXCEL_PATH)
 
     if not excel_files:
-        st.warning("⚠️ No Excel files found. Please upload files in the 'Upload' tab first.")
+        st.warning("⚠️ No input files found. Please upload files in the 'Upload' tab first.")
     else:
         col1, col2 = st.columns([2, 1])
 
         with col1:
-            selected_file = st.selectbox("📄 Select Excel File", excel_files)
+            selected_file = st.selectbox("📄 Select Input File", excel_files)
 
             base_query = st.text_input(
                 "🔍 Search Keywords",
@@ -307,15 +508,22 @@ with tab2:
             zipcode_column = st.text_input(
                 "📍 Zipcode Column Name",
                 value="DELIVERY ZIPCODE",
-                help="Enter the exact column name containing zipcodes in your Excel file"
+                help="Enter the exact column name containing zipcodes in your input file"
+            )
+
+            autoscale = st.checkbox(
+                "📈 Autoscale workers",
+                value=False,
+                help="Add workers while CPU, memory and /dev/shm stay under their limits and remove them when "
+                     "exceeded; the slider becomes the ceiling"
             )
 
             col_a, col_b = st.columns(2)
             with col_a:
                 max_workers = st.slider(
-                    "⚡ Concurrent Workers",
+                    "⚡ Max Workers" if autoscale else "⚡ Concurrent Workers",
                     min_value=1,
-                    max_value=4,
+                    max_value=scraper.AUTOSCALE_MAX_WORKERS if autoscale else 4,
                     value=3,
                     help="Recommended: 3 workers for 4 vCPU system"
                 )
@@ -329,11 +537,101 @@ with tab2:
                     help="More scrolls = more results but slower"
                 )
 
-            if st.checkbox("👀 Preview Excel File"):
+            max_results = st.number_input(
+                "🎯 Max Results per Zipcode",
+                min_value=0,
+                value=0,
+                step=10,
+                help="Stop scrolling once this many results are found (0 = no limit)"
+            )
+
+            rate_per_minute = st.slider(
+                "🚦 Total Requests per Minute",
+                min_value=5,
+                max_value=120,
+                value=scraper.RATE_LIMIT_PER_MINUTE,
+                help="Shared budget for page loads and card clicks across all workers"
+            )
+
+            use_cache = st.checkbox(
+                "♻️ Reuse cached results",
+                value=True,
+                help="Zipcodes scraped recently for the same query are served from the cache without a browser"
+            )
+            cache_ttl_hours = st.number_input(
+                "⌛ Cache Freshness (hours)",
+                min_value=1,
+                value=scraper.CACHE_TTL_HOURS
+            ) if use_cache else None
+
+            output_format = st.selectbox(
+                "💾 Output Format",
+                scraper.OUTPUT_FORMATS,
+                help="Records are appended to one file per run; an Excel copy is exported when the run finishes"
+            )
+
+            page_profile = st.selectbox(
+                "🪶 Page Profile",
+                list(scraper.PAGE_PROFILES),
+                index=list(scraper.PAGE_PROFILES).index(scraper.DEFAULT_PROFILE),
+                help="Lean blocks map tiles, images, fonts and telemetry and uses a smaller window"
+            )
+
+            execution = st.radio(
+                "🧱 Execution Mode",
+                [m for m in scraper.EXECUTION_MODES if m != "tabs" or cdp_engine.ENGINE_AVAILABLE],
+                format_func=lambda m: {
+                    "threads": "Threads (single process)",
+                    "processes": "Processes (crash-isolated)",
+                    "tabs": "Tabs (many pages per browser)",
+                }[m],
+                horizontal=True,
+                help="Process mode gives every worker its own process and browser; hung or crashed workers are restarted. "
+                     "Tab mode runs several isolated tabs in each browser, so workers become browsers"
+            )
+
+            if not cdp_engine.ENGINE_AVAILABLE:
+                st.caption("Tab mode is unavailable: install the websockets package to enable it.")
+
+            tabs_per_browser = st.slider(
+                "🗂️ Tabs per Browser",
+                min_value=1,
+                max_value=16,
+                value=cdp_engine.DEFAULT_CONCURRENCY,
+                help="Each tab has its own cookies and storage; one Chrome costs far less memory than one per zipcode"
+            ) if execution == "tabs" else 1
+
+            dedupe_places = st.checkbox(
+                "🧩 Skip places already found in other zipcodes",
+                value=True,
+                help="Adjacent zipcodes overlap heavily; known places are linked to the zipcode instead of re-scraped"
+            )
+
+            perf_capture = st.checkbox(
+                "🔬 Capture Chrome performance trace",
+                value=False,
+                help="Records JS heap, DOM nodes, requests, bytes and main-thread time per zipcode; "
+                     "the run summary report lists the slowest zipcodes and renderer memory growth"
+            )
+
+            measure_transfer = perf_capture or st.checkbox(
+                "📶 Measure bytes transferred per zipcode",
+                value=False,
+                help="Enables Chrome's network event log (always on with a performance trace); "
+                     "useful for comparing page profiles"
+            )
+
+            mode = st.radio(
+                "🧾 Extraction Mode",
+                scraper.EXTRACTION_MODES,
+                format_func=lambda m: "Details (click every card)" if m == "details" else "List (fast, no clicks)",
+                horizontal=True,
+                help="List mode reads name, rating, reviews, category, address and links from the results feed without opening each place"
+            )
+
+            if st.checkbox("👀 Preview Input File"):
                 try:
-                    file_path = os.path.join(EXCEL_PATH, selected_file)
-                    df = pd.read_excel(file_path)
-                    st.dataframe(df.head(10))
+                    st.dataframe(input_loader.LOADER.preview(os.path.join(EXCEL_PATH, selected_file)))
                 except Exception as e:
                     st.error(f"Error reading file: {e}")
 
@@ -348,17 +646,39 @@ with tab2:
             ⚡ Workers: {max_workers}
 
             📜 Scrolls: {max_scrolls}
+
+            🧾 Mode: {mode}
+
+            🎯 Max Results: {max_results or "no limit"}
+
+            🚦 Rate: {rate_per_minute}/min
             """)
 
             # Estimate
             try:
-                file_path = os.path.join(EXCEL_PATH, selected_file)
-                df = pd.read_excel(file_path, dtype={zipcode_column: str})
-                num_zipcodes = df[zipcode_column].nunique()
-                estimated_time = (num_zipcodes * 25) / max_workers / 60
+                zipcodes = input_loader.load_zipcodes(os.path.join(EXCEL_PATH, selected_file), zipcode_column)
+                num_zipcodes = len(zipcodes)
+
+                cached_zipcodes = set()
+                if use_cache:
+                    cached_zipcodes = get_result_cache(cache_ttl_hours).fresh_zipcodes(
+                        base_query, zipcodes, mode, max_results or None)
+
+                # Longest-first schedule of the uncached zipcodes, from earlier runs' timings
+                forecast = load_cost_model().forecast(
+                    base_query, [z for z in zipcodes if z not in cached_zipcodes],
+                    max_workers * tabs_per_browser, mode
+                )
 
                 st.metric("📊 Unique Zipcodes", num_zipcodes)
-                st.metric("⏱️ Estimated Time", f"{estimated_time:.0f} min")
+                if use_cache:
+                    hit_rate = len(cached_zipcodes) / num_zipcodes * 100 if num_zipcodes else 0
+                    st.metric("♻️ Cache Hit Rate", f"{hit_rate:.0f}%", help=f"{len(cached_zipcodes)} zipcodes already cached")
+                st.metric(
+                    "⏱️ Estimated Time", f"{forecast['makespan'] / 60:.0f} min",
+                    help=f"{forecast['coverage'] * 100:.0f}% of zipcodes predicted from past runs; "
+                         f"{scraper.format_forecast(forecast)}"
+                )
             except Exception as e:
                 st.warning(f"Could not estimate: {e}")
 
@@ -368,31 +688,33 @@ with tab2:
         col1, col2, col3 = st.columns([1, 2, 1])
 
         with col2:
-            if st.session_state.scraping_active:
+            if run_state.active:
                 st.error("⚠️ **Scraper is currently running!**")
                 st.info("Check the 'Progress' tab for live updates.")
 
                 if st.button("🛑 FORCE STOP", type="secondary"):
-                    st.session_state.scraping_active = False
+                    run_state.request_stop()
                     st.warning("Scraper will stop after completing current batch...")
             else:
                 if st.button("▶️ START SCRAPING", type="primary", use_container_width=True):
                     # Validate inputs
                     try:
-                        file_path = os.path.join(EXCEL_PATH, selected_file)
-                        test_df = pd.read_excel(file_path)
+                        columns = input_loader.LOADER.columns(os.path.join(EXCEL_PATH, selected_file))
 
-                        if zipcode_column not in test_df.columns:
-                            st.error(f"❌ Column '{zipcode_column}' not found in Excel file!")
-                            st.write("Available columns:", ", ".join(test_df.columns.tolist()))
+                        if zipcode_column not in columns:
+                            st.error(f"❌ Column '{zipcode_column}' not found in input file!")
+                            st.write("Available columns:", ", ".join(map(str, columns)))
+                        elif not run_state.try_begin():
+                            st.error("❌ Another session started a run a moment ago.")
                         else:
-                            # Start scraping
-                            st.session_state.scraping_active = True
-
-                            # Launch background thread
+                            # Launch background thread; cached resources are resolved here, on the script thread
                             scraper_thread = threading.Thread(
                                 target=run_scraper_thread,
-                                args=(selected_file, base_query, zipcode_column, max_workers, max_scrolls),
+                                args=(selected_file, base_query, zipcode_column, max_workers, max_scrolls, mode,
+                                      max_results or None, rate_per_minute, cache_ttl_hours, None,
+                                      output_format, dedupe_places, execution, tabs_per_browser, page_profile,
+                                      autoscale, perf_capture, measure_transfer, load_cost_model(),
+                                      get_result_cache(cache_ttl_hours) if cache_ttl_hours else None),
                                 daemon=True
                             )
                             scraper_thread.start()
@@ -405,31 +727,74 @@ with tab2:
                     except Exception as e:
                         st.error(f"❌ Error starting scraper: {e}")
 
+    # Jobs interrupted by a restart, OOM kill or failures can be picked up where they stopped
+    if not run_state.active:
+        try:
+            resumable = [job for job in journal.list_jobs() if job['finished'] < job['total']]
+        except Exception as e:
+            resumable = []
+            st.warning(f"Could not read run journal: {e}")
+
+        if resumable:
+            st.markdown("---")
+            st.subheader("🔁 Resume Interrupted Jobs")
+
+            for job in resumable:
+                col1, col2, col3 = st.columns([4, 2, 1])
+                with col1:
+                    started = datetime.fromtimestamp(job['created_at']).strftime("%Y-%m-%d %H:%M")
+                    st.write(f"**{job['base_query']}** · `{os.path.basename(job['input_file'])}` · {started}")
+                with col2:
+                    st.write(f"{job['finished']}/{job['total']} done · {job['total'] - job['finished']} left")
+                with col3:
+                    if st.button("▶️ Resume", key=f"resume_{job['job_id']}") and run_state.try_begin():
+                        ttl_hours = journal.get_job(job['job_id'])['settings'].get('cache_ttl_hours')
+                        threading.Thread(
+                            target=resume_scraper_thread,
+                            args=(job['job_id'], load_cost_model(),
+                                  get_result_cache(ttl_hours) if ttl_hours else None),
+                            daemon=True
+                        ).start()
+                        st.success(f"✅ Resuming job {job['job_id']}")
+                        time.sleep(2)
+                        st.rerun()
+
 # ============================================================================
 # TAB 3: LIVE PROGRESS
 # ============================================================================
 with tab3:
     st.header("📊 Live Scraping Progress")
 
-    if not st.session_state.scraping_active and st.session_state.scraping_stats['total'] == 0:
-        st.info("ℹ️ No scraping session active. Start a scraper in the 'Run' tab.")
-    else:
+    # Only this view refreshes; the rest of the page is left alone
+    @st.fragment(run_every=PROGRESS_REFRESH_SECONDS)
+    def progress_view():
+        snap = run_state.snapshot(recent=15)
+        stats = snap['stats']
+
+        # Failures raised in the scraper thread, possibly before any zipcode was scheduled
+        if snap['error']:
+            st.error(f"❌ {snap['error']}")
+
+        if not snap['active'] and snap['total'] == 0:
+            st.info("ℹ️ No scraping session active. Start a scraper in the 'Run' tab.")
+            return
+
         # Status indicator
-        if st.session_state.scraping_active:
+        if snap['active'] and snap['stop_requested']:
+            st.warning("🟠 **STOPPING** - finishing zipcodes already in progress")
+        elif snap['active']:
             st.success("🟢 **SCRAPING IN PROGRESS**")
         else:
             st.info("✅ **SCRAPING COMPLETED**")
 
-        stats = st.session_state.scraping_stats
-
         # Progress bar
-        if stats['total'] > 0:
-            progress = stats['completed'] / stats['total']
+        if snap['total'] > 0:
+            progress = snap['completed'] / snap['total']
             st.progress(progress)
 
             col1, col2 = st.columns([1, 3])
             with col1:
-                st.metric("Progress", f"{stats['completed']}/{stats['total']}")
+                st.metric("Progress", f"{snap['completed']}/{snap['total']}")
             with col2:
                 st.write(f"**{progress*100:.1f}%** complete")
 
@@ -439,35 +804,54 @@ with tab3:
         col1, col2, col3, col4 = st.columns(4)
 
         with col1:
-            st.metric("✅ Successful", stats['successful'], delta=None)
+            st.metric("✅ Successful", snap['successful'], delta=None)
 
         with col2:
-            st.metric("❌ Failed", stats['failed'], delta=None)
+            st.metric("❌ Failed", snap['failed'], delta=None)
 
         with col3:
-            if stats['start_time']:
-                elapsed = time.time() - stats['start_time']
-                st.metric("⏱️ Elapsed", f"{elapsed/60:.1f} min")
+            st.metric("⏱️ Elapsed", f"{snap['elapsed']/60:.1f} min")
 
         with col4:
-            if stats['total'] > 0 and stats['completed'] > 0 and st.session_state.scraping_active:
-                avg_time = (time.time() - stats['start_time']) / stats['completed']
-                remaining = (stats['total'] - stats['completed']) * avg_time / 60
+            if snap['total'] > 0 and snap['completed'] > 0 and snap['active']:
+                remaining = (snap['total'] - snap['completed']) * snap['elapsed'] / snap['completed'] / 60
                 st.metric("⏳ Est. Remaining", f"~{remaining:.0f} min")
 
+        if snap['cached']:
+            st.caption(f"♻️ Served from cache: {snap['cached']}/{snap['completed']} zipcodes")
+        if stats.get('places'):
+            st.caption(f"🧩 {scraper.format_index_stats(stats['places'])}")
+        if stats.get('workers'):
+            workers = stats['workers']
+            st.caption(f"🧱 Worker processes started: {workers['started']} | Crashes: {workers['crashes']} | "
+                       f"Timeouts: {workers['timeouts']} | Retries: {workers['retries']}")
+        if stats.get('tabs'):
+            st.caption(f"🗂️ {cdp_engine.format_tab_stats(stats['tabs'])}")
+        if stats.get('autoscale'):
+            st.caption(f"📈 {scraper.format_autoscale_stats(stats['autoscale'])}")
+            timeline = pd.DataFrame(stats['autoscale']['timeline'])
+            if len(timeline) > 1:
+                st.line_chart(timeline.set_index('time')[['workers']], height=150)
+        if stats.get('pool'):
+            st.caption(f"🧭 {scraper.format_pool_stats(stats['pool'])}")
+        if stats.get('rate_limit'):
+            st.caption(f"🚦 {scraper.format_rate_limit_stats(stats['rate_limit'])}")
+        if snap['measured']:
+            st.caption(f"📶 Transferred: {scraper.format_bytes(snap['bytes'])} | "
+                       f"{scraper.format_bytes(snap['bytes'] / snap['measured'])} per zipcode "
+                       f"(profile: {scraper.page_profile})")
+
         st.markdown("---")
 
         # Recent results
         st.subheader("📋 Recent Activity")
 
-        if st.session_state.scraping_results:
-            # Show last 15 results
-            recent = st.session_state.scraping_results[-15:]
-            recent.reverse()
-
-            for result in recent:
+        if snap['recent']:
+            for result in snap['recent']:
                 if result['status'] == 'success':
-                    st.success(f"✅ **{result['zipcode']}**: {result['count']} records extracted ({result.get('time', 0):.1f}s)")
+                    transferred = f", {scraper.format_bytes(result['bytes'])}" if result.get('bytes') else ""
+                    st.success(f"✅ **{result['zipcode']}**: {result['count']} records extracted "
+                               f"({result.get('time', 0):.1f}s{transferred})")
                 elif result['status'] == 'no_data':
                     st.warning(f"⚠️ **{result['zipcode']}**: No data found")
                 else:
@@ -475,13 +859,10 @@ with tab3:
         else:
             st.info("No results yet. Scraping will appear here as it progresses.")
 
-        # Auto-refresh button
-        col1, col2, col3 = st.columns([1, 1, 1])
-        with col2:
-            if st.button("🔄 Refresh Progress", use_container_width=True):
-                st.rerun()
+        if snap['active']:
+            st.caption(f"💡 Updates every {PROGRESS_REFRESH_SECONDS} seconds while scraping.")
 
-        st.info("💡 **Tip:** This page auto-refreshes every 5 seconds during active scraping.")
+    progress_view()
 
 # ============================================================================
 # TAB 4: DOWNLOAD RESULTS
@@ -490,31 +871,22 @@ with tab4:
     st.header("📥 Download Results")
 
     try:
-        output_files = sorted(
-            [f for f in os.listdir(OUTPUT_PATH) if f.endswith('.xlsx')],
-            key=lambda x: os.path.getmtime(os.path.join(OUTPUT_PATH, x)),
-            reverse=True
-        )
+        total_files = catalog.count(RESULT_MIME_TYPES)
 
-        if output_files:
-            st.success(f"✅ **{len(output_files)} result file(s) available for download**")
+        if total_files:
+            st.success(f"✅ **{total_files} result file(s) available for download**")
 
-            # Download all as ZIP
+            # Download all as ZIP (built on disk once per output set)
             col1, col2, col3 = st.columns([1, 2, 1])
             with col2:
                 if st.button("📦 Download All Files as ZIP", use_container_width=True):
                     with st.spinner("Creating ZIP archive..."):
-                        zip_buffer = io.BytesIO()
-                        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-                            for file in output_files:
-                                file_path = os.path.join(OUTPUT_PATH, file)
-                                zip_file.write(file_path, file)
-
-                        zip_buffer.seek(0)
+                        archive_path = catalog.archive(RESULT_MIME_TYPES)
 
+                    with open(archive_path, 'rb') as f:
                         st.download_button(
                             label="⬇️ Click Here to Download ZIP",
-                            data=zip_buffer,
+                            data=f,
                             file_name=f"scraper_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip",
                             mime="application/zip",
                             use_container_width=True
@@ -525,35 +897,45 @@ with tab4:
             # Individual files
             st.subheader("📄 Individual Files")
 
-            for file in output_files:
-                col1, col2, col3, col4, col5 = st.columns([4, 1, 1, 1, 1])
+            pages = -(-total_files // RESULTS_PER_PAGE)
+            if st.session_state.get('results_page', 1) > pages:
+                st.session_state.results_page = pages
+            page_number = st.number_input(
+                f"Page (of {pages}, newest first)", min_value=1, max_value=pages, value=1, key="results_page"
+            ) if pages > 1 else 1
+            page_files, _, _ = catalog.page(page_number - 1, RESULTS_PER_PAGE, RESULT_MIME_TYPES)
 
-                file_path = os.path.join(OUTPUT_PATH, file)
-                file_size = os.path.getsize(file_path) / 1024
-                file_time = datetime.fromtimestamp(os.path.getmtime(file_path))
+            for entry in page_files:
+                file = entry['name']
+                col1, col2, col3, col4, col5 = st.columns([4, 1, 1, 1, 1])
 
                 with col1:
                     st.write(f"📄 {file}")
 
                 with col2:
-                    st.write(f"{file_size:.1f} KB")
+                    st.write(f"{entry['size'] / 1024:.1f} KB")
 
                 with col3:
-                    st.write(file_time.strftime("%H:%M"))
+                    st.write(datetime.fromtimestamp(entry['mtime']).strftime("%H:%M"))
 
                 with col4:
-                    with open(file_path, 'rb') as f:
-                        st.download_button(
-                            label="⬇️",
-                            data=f,
-                            file_name=file,
-                            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                            key=f"dl_{file}"
-                        )
+                    # The file is only read once someone asks for it
+                    if st.session_state.get('download_file') == file:
+                        with open(catalog.path(file), 'rb') as f:
+                            st.download_button(
+                                label="💾",
+                                data=f,
+                                file_name=file,
+                                mime=RESULT_MIME_TYPES.get(os.path.splitext(file)[1].lower(), "application/octet-stream"),
+                                key=f"dl_{file}"
+                            )
+                    elif st.button("⬇️", key=f"prep_{file}"):
+                        st.session_state.download_file = file
+                        st.rerun()
 
                 with col5:
                     if st.button("🗑️", key=f"del_result_{file}"):
-                        os.remove(file_path)
+                        catalog.remove(file)
                         st.success(f"Deleted: {file}")
                         time.sleep(0.5)
                         st.rerun()
@@ -562,34 +944,117 @@ with tab4:
             st.markdown("---")
             st.subheader("📊 Summary Reports")
 
-            summary_files = [f for f in os.listdir(OUTPUT_PATH) if f.startswith('summary_report_')]
+            summary_files = [f['name'] for f in catalog.files(prefix='summary_report_')]
             if summary_files:
                 selected_summary = st.selectbox("Select Summary Report", summary_files)
 
                 if selected_summary:
-                    summary_path = os.path.join(OUTPUT_PATH, selected_summary)
+                    summary_path = catalog.path(selected_summary)
                     with open(summary_path, 'r') as f:
                         summary_content = f.read()
 
                     st.text_area("Report Content", summary_content, height=300)
 
-                    with open(summary_path, 'rb') as f:
-                        st.download_button(
-                            label="📥 Download Summary Report",
-                            data=f,
-                            file_name=selected_summary,
-                            mime="text/plain"
-                        )
+                    st.download_button(
+                        label="📥 Download Summary Report",
+                        data=summary_content,
+                        file_name=selected_summary,
+                        mime="application/json" if selected_summary.endswith('.json') else "text/plain"
+                    )
         else:
             st.info("📭 No output files yet. Run the scraper to generate results!")
 
     except Exception as e:
         st.error(f"Error accessing output files: {e}")
 
-# Auto-refresh during active scraping
-if st.session_state.scraping_active:
-    time.sleep(5)
-    st.rerun()
+# ============================================================================
+# TAB 5: RESULTS STORE
+# ============================================================================
+with tab5:
+    st.header("🔎 Browse Results")
+
+    try:
+        queries = results_store.queries()
+    except Exception as e:
+        queries = []
+        st.error(f"Error opening results store: {e}")
+
+    if not queries:
+        st.info("📭 No results stored yet. Records from every run are added here as they are written.")
+    else:
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            selected_query = st.selectbox(
+                "🔍 Query",
+                [q['query'] for q in queries],
+                format_func=lambda q: f"{q} ({next(x['places'] for x in queries if x['query'] == q)} places)"
+            )
+            min_rating = st.slider("⭐ Minimum Rating", 0.0, 5.0, 0.0, 0.1)
+        with col2:
+            website = st.radio("🌐 Website", ["Any", "With website", "Without website"], horizontal=True)
+            category = st.text_input("🏷️ Category contains")
+        with col3:
+            zipcode_text = st.text_area("📍 Zipcodes (blank for all)", height=100,
+                                        help="Separated by commas, spaces or new lines")
+            text = st.text_input("🔤 Name or address contains")
+
+        order = st.selectbox("↕️ Sort by", list(RESULT_ORDERINGS))
+        filters = {
+            'query': selected_query,
+            'zipcodes': parse_zipcodes(zipcode_text) or None,
+            'min_rating': min_rating or None,
+            'has_website': {"Any": None, "With website": True, "Without website": False}[website],
+            'category': category.strip() or None,
+            'text': text.strip() or None,
+        }
+
+        start = time.time()
+        total = results_store.count(**filters)
+        pages = max(1, -(-total // PLACES_PER_PAGE))
+        # Narrower filters can leave the remembered page past the end
+        if st.session_state.get('places_page', 1) > pages:
+            st.session_state.places_page = pages
+        page_number = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1,
+                                      key="places_page") if pages > 1 else 1
+        places = results_store.search(PLACES_PER_PAGE, (page_number - 1) * PLACES_PER_PAGE, order, **filters)
+        st.caption(f"**{total}** matching places · {(time.time() - start) * 1000:.0f} ms")
+
+        if places:
+            st.dataframe(
+                pd.DataFrame(places)[['zipcode', 'name', 'rating', 'reviews', 'category', 'phone', 'website',
+                                      'location', 'place_url']],
+                use_container_width=True,
+                hide_index=True
+            )
+
+            if st.button("📤 Export matching places to CSV"):
+                export_name = f"export_{re.sub(r'[^a-zA-Z0-9]', '_', selected_query)[:30]}_" \
+                              f"{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+                export_path = os.path.join(OUTPUT_PATH, export_name)
+                with st.spinner("Exporting..."):
+                    exported = results_store.export(export_path, order, **filters)
+                with open(export_path, 'rb') as f:
+                    st.download_button(f"⬇️ Download {exported} places", data=f, file_name=export_name,
+                                       mime="text/csv")
+
+        stats = results_store.stats()
+        st.caption(f"🗄️ Store: {stats['places']} places · {stats['queries']} queries · {stats['zipcodes']} zipcodes")
+
+    # Files written before the store existed can be loaded once
+    with st.expander("📥 Import existing output files"):
+        importable = [f for f in catalog.files(('.csv', '.xlsx', '.parquet', '.sqlite'))
+                      if not f['name'].startswith('export_')]
+        st.write(f"{len(importable)} output file(s) in {OUTPUT_PATH}")
+        if importable and st.button("Import all output files"):
+            added = 0
+            progress_bar = st.progress(0)
+            for i, entry in enumerate(importable):
+                try:
+                    added += results_store.import_file(catalog.path(entry['name']))
+                except Exception as e:
+                    st.warning(f"Skipped {entry['name']}: {e}")
+                progress_bar.progress((i + 1) / len(importable))
+            st.success(f"✅ Imported {added} records")
 
 # Footer
 st.markdown("---")
@@ -0,0 +1,474 @@
+#!/usr/bin/env python3
+
+"""
+Distributed Work Queue for the Google Maps Scraper
+A coordinator publishes (query, zipcode) tasks; any number of worker nodes lease
+them with heartbeats and visibility timeouts and push results to a common sink.
+
+Backends:
+    sqlite:///path/to/queue.db   - single host or shared filesystem (local stand-in)
+    redis://host:6379/0          - multi-node (requires the redis package)
+
+Usage:
+    python work_queue.py publish  --queue URL --file zips.xlsx --query "attorneys in"
+    python work_queue.py worker   --queue URL --threads 3
+    python work_queue.py status   --queue URL --job JOB_ID
+    python work_queue.py collect  --queue URL --job JOB_ID --out google_maps_data
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import sqlite3
+import argparse
+import threading
+import logging
+from contextlib import contextmanager
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+# Seconds a leased task stays invisible to other workers without a heartbeat
+VISIBILITY_TIMEOUT = 300
+
+# Leases per task before it is marked failed for good
+MAX_ATTEMPTS = 3
+
+
+def make_job_id():
+    return f"{time.strftime('%Y%m%d_%H%M%S')}_{os.urandom(3).hex()}"
+
+
+class SQLiteQueue:
+    """Task queue in a SQLite file; leases are claimed inside an immediate transaction"""
+
+    def __init__(self, path, max_attempts=MAX_ATTEMPTS):
+        self.path = path
+        self.max_attempts = max_attempts
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS queue_jobs (
+                    job_id TEXT PRIMARY KEY,
+                    base_query TEXT NOT NULL,
+                    settings TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS queue_tasks (
+                    task_id TEXT PRIMARY KEY,
+                    job_id TEXT NOT NULL,
+                    zipcode TEXT NOT NULL,
+                    priority REAL NOT NULL DEFAULT 0,
+                    status TEXT NOT NULL,
+                    worker TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    lease_expires REAL,
+                    error TEXT,
+                    result TEXT,
+                    records TEXT,
+                    updated_at REAL
+                );
+                CREATE INDEX IF NOT EXISTS idx_queue_tasks_status
+                    ON queue_tasks (status, priority DESC, lease_expires);
+            """)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _transaction(self):
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def publish(self, base_query, zipcodes, settings=None, priorities=None, job_id=None):
+        job_id = job_id or make_job_id()
+        priorities = priorities or {}
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO queue_jobs (job_id, base_query, settings, created_at) VALUES (?, ?, ?, ?)",
+                (job_id, base_query, json.dumps(settings or {}), now)
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO queue_tasks (task_id, job_id, zipcode, priority, status, updated_at) "
+                "VALUES (?, ?, ?, ?, 'queued', ?)",
+                [(f"{job_id}:{z}", job_id, str(z), priorities.get(z, 0), now) for z in zipcodes]
+            )
+        return job_id
+
+    def lease(self, worker, visibility_timeout=VISIBILITY_TIMEOUT):
+        now = time.time()
+        with self._transaction() as conn:
+            # Expired leases that ran out of attempts are given up on
+            conn.execute(
+                "UPDATE queue_tasks SET status = 'failed', error = 'lease expired too often', updated_at = ? "
+                "WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?",
+                (now, now, self.max_attempts)
+            )
+            row = conn.execute(
+                "SELECT t.task_id, t.job_id, t.zipcode, t.attempts, j.base_query, j.settings "
+                "FROM queue_tasks t JOIN queue_jobs j ON j.job_id = t.job_id "
+                "WHERE t.status = 'queued' OR (t.status = 'leased' AND t.lease_expires < ?) "
+                "ORDER BY t.priority DESC, t.rowid LIMIT 1",
+                (now,)
+            ).fetchone()
+            if not row:
+                return None
+            conn.execute(
+                "UPDATE queue_tasks SET status = 'leased', worker = ?, attempts = attempts + 1, "
+                "lease_expires = ?, updated_at = ? WHERE task_id = ?",
+                (worker, now + visibility_timeout, now, row["task_id"])
+            )
+
+        return {
+            'task_id': row["task_id"],
+            'job_id': row["job_id"],
+            'zipcode': row["zipcode"],
+            'attempt': row["attempts"] + 1,
+            'base_query': row["base_query"],
+            'settings': json.loads(row["settings"]),
+        }
+
+    def heartbeat(self, task_id, worker, visibility_timeout=VISIBILITY_TIMEOUT):
+        """Extend a lease; False means the lease was lost to another worker"""
+        with self._transaction() as conn:
+            updated = conn.execute(
+                "UPDATE queue_tasks SET lease_expires = ?, updated_at = ? "
+                "WHERE task_id = ? AND worker = ? AND status = 'leased'",
+                (time.time() + visibility_timeout, time.time(), task_id, worker)
+            ).rowcount
+        return updated == 1
+
+    def complete(self, task_id, worker, result, records):
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE queue_tasks SET status = 'done', result = ?, records = ?, lease_expires = NULL, "
+                "updated_at = ? WHERE task_id = ? AND worker = ?",
+                (json.dumps(result), json.dumps(records), time.time(), task_id, worker)
+            )
+
+    def fail(self, task_id, worker, error):
+        """Release a lease after a failed attempt; requeued until attempts run out"""
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE queue_tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END, "
+                "error = ?, lease_expires = NULL, updated_at = ? WHERE task_id = ? AND worker = ?",
+                (self.max_attempts, str(error)[:500], time.time(), task_id, worker)
+            )
+
+    def progress(self, job_id):
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT status, COUNT(*) AS n FROM queue_tasks WHERE job_id = ? GROUP BY status", (job_id,)
+            ).fetchall()
+            workers = conn.execute(
+                "SELECT COUNT(DISTINCT worker) FROM queue_tasks WHERE job_id = ? AND worker IS NOT NULL", (job_id,)
+            ).fetchone()[0]
+        counts = {row["status"]: row["n"] for row in rows}
+        counts['total'] = sum(counts.values())
+        counts['workers'] = workers
+        return counts
+
+    def results(self, job_id):
+        """(result, records) for every finished task of a job"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT result, records FROM queue_tasks WHERE job_id = ? AND status = 'done'", (job_id,)
+            ).fetchall()
+        return [(json.loads(row["result"]), json.loads(row["records"] or "[]")) for row in rows]
+
+    def get_job(self, job_id):
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM queue_jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if not row:
+            return None
+        job = dict(row)
+        job["settings"] = json.loads(job["settings"])
+        return job
+
+
+class RedisQueue:
+    """Task queue in Redis: a priority zset of ready tasks and a zset of lease expiries"""
+
+    def __init__(self, url, max_attempts=MAX_ATTEMPTS, prefix="wq"):
+        if redis is None:
+            raise RuntimeError("Redis queue requires the redis package (pip install redis)")
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+        self.max_attempts = max_attempts
+        self.prefix = prefix
+
+    def _key(self, *parts):
+        return ":".join((self.prefix,) + parts)
+
+    def publish(self, base_query, zipcodes, settings=None, priorities=None, job_id=None):
+        job_id = job_id or make_job_id()
+        priorities = priorities or {}
+        pipe = self.client.pipeline()
+        pipe.hset(self._key("job", job_id), mapping={
+            'job_id': job_id, 'base_query': base_query,
+            'settings': json.dumps(settings or {}), 'created_at': time.time()
+        })
+        for zipcode in zipcodes:
+            task_id = f"{job_id}:{zipcode}"
+            pipe.hset(self._key("task", task_id), mapping={
+                'task_id': task_id, 'job_id': job_id, 'zipcode': str(zipcode),
+                'status': 'queued', 'attempts': 0, 'priority': priorities.get(zipcode, 0)
+            })
+            pipe.zadd(self._key("ready"), {task_id: priorities.get(zipcode, 0)})
+            pipe.sadd(self._key("tasks", job_id), task_id)
+        pipe.execute()
+        return job_id
+
+    def _reclaim_expired(self):
+        now = time.time()
+        for task_id in self.client.zrangebyscore(self._key("leased"), "-inf", now):
+            # zrem succeeds for exactly one reclaimer
+            if not self.client.zrem(self._key("leased"), task_id):
+                continue
+            task_key = self._key("task", task_id)
+            if int(self.client.hget(task_key, "attempts") or 0) >= self.max_attempts:
+                self.client.hset(task_key, mapping={'status': 'failed', 'error': 'lease expired too often'})
+            else:
+                self.client.hset(task_key, "status", "queued")
+                self.client.zadd(self._key("ready"), {task_id: float(self.client.hget(task_key, "priority") or 0)})
+
+    def lease(self, worker, visibility_timeout=VISIBILITY_TIMEOUT):
+        self._reclaim_expired()
+        popped = self.client.zpopmax(self._key("ready"))
+        if not popped:
+            return None
+        task_id = popped[0][0]
+        task_key = self._key("task", task_id)
+
+        self.client.zadd(self._key("leased"), {task_id: time.time() + visibility_timeout})
+        attempts = self.client.hincrby(task_key, "attempts", 1)
+        self.client.hset(task_key, mapping={'status': 'leased', 'worker': worker})
+
+        task = self.client.hgetall(task_key)
+        job = self.client.hgetall(self._key("job", task["job_id"]))
+        return {
+            'task_id': task_id,
+            'job_id': task["job_id"],
+            'zipcode': task["zipcode"],
+            'attempt': attempts,
+            'base_query': job["base_query"],
+            'settings': json.loads(job["settings"]),
+        }
+
+    def heartbeat(self, task_id, worker, visibility_timeout=VISIBILITY_TIMEOUT):
+        if self.client.hget(self._key("task", task_id), "worker") != worker:
+            return False
+        return bool(self.client.zadd(self._key("leased"), {task_id: time.time() + visibility_timeout}, xx=True, ch=True))
+
+    def complete(self, task_id, worker, result, records):
+        task_key = self._key("task", task_id)
+        if self.client.hget(task_key, "worker") != worker:
+            return
+        self.client.zrem(self._key("leased"), task_id)
+        self.client.hset(task_key, mapping={
+            'status': 'done', 'result': json.dumps(result), 'records': json.dumps(records)
+        })
+
+    def fail(self, task_id, worker, error):
+        task_key = self._key("task", task_id)
+        if self.client.hget(task_key, "worker") != worker:
+            return
+        self.client.zrem(self._key("leased"), task_id)
+        if int(self.client.hget(task_key, "attempts") or 0) >= self.max_attempts:
+            self.client.hset(task_key, mapping={'status': 'failed', 'error': str(error)[:500]})
+        else:
+            self.client.hset(task_key, mapping={'status': 'queued', 'error': str(error)[:500]})
+            self.client.zadd(self._key("ready"), {task_id: float(self.client.hget(task_key, "priority") or 0)})
+
+    def _tasks(self, job_id):
+        pipe = self.client.pipeline()
+        for task_id in self.client.smembers(self._key("tasks", job_id)):
+            pipe.hgetall(self._key("task", task_id))
+        return pipe.execute()
+
+    def progress(self, job_id):
+        counts = {}
+        workers = set()
+        for task in self._tasks(job_id):
+            counts[task["status"]] = counts.get(task["status"], 0) + 1
+            if task.get("worker"):
+                workers.add(task["worker"])
+        counts['total'] = sum(counts.values())
+        counts['workers'] = len(workers)
+        return counts
+
+    def results(self, job_id):
+        return [(json.loads(task["result"]), json.loads(task.get("records") or "[]"))
+                for task in self._tasks(job_id) if task["status"] == "done"]
+
+    def get_job(self, job_id):
+        job = self.client.hgetall(self._key("job", job_id))
+        if not job:
+            return None
+        job["settings"] = json.loads(job["settings"])
+        return job
+
+
+def open_queue(url):
+    """Queue backend for a ``sqlite:///path`` or ``redis://`` URL"""
+    if url.startswith("redis://") or url.startswith("rediss://"):
+        return RedisQueue(url)
+    if url.startswith("sqlite:///"):
+        return SQLiteQueue(url[len("sqlite:///"):])
+    return SQLiteQueue(url)
+
+
+def run_worker(queue, threads=1, visibility_timeout=VISIBILITY_TIMEOUT, poll_interval=5, exit_when_idle=False,
+               page_profile=None, perf_trace=None, measure_transfer=False):
+    """Lease and scrape tasks until stopped (or until the queue is empty with exit_when_idle)"""
+    import scrape_zip_optimized as scraper
+    from process_pool import RecordCollector
+
+    if page_profile:
+        scraper.configure_page_profile(page_profile)
+    if perf_trace:
+        scraper.configure_perf_capture(perf_trace)
+    if measure_transfer:
+        scraper.configure_transfer_accounting(True)
+
+    node = f"{socket.gethostname()}-{os.getpid()}"
+    pool = scraper.create_driver_pool(threads)
+    cache = scraper.create_result_cache()
+    folder_name = scraper.create_output_folder("google_maps_data")
+
+    def heartbeat_loop(task_id, worker, done):
+        while not done.wait(visibility_timeout / 3):
+            if not queue.heartbeat(task_id, worker, visibility_timeout):
+                logger.warning(f"[{worker}] Lost lease on {task_id}")
+                return
+
+    def worker_loop(thread_id):
+        worker = f"{node}-t{thread_id}"
+        while True:
+            task = queue.lease(worker, visibility_timeout)
+            if not task:
+                if exit_when_idle:
+                    return
+                time.sleep(poll_interval)
+                continue
+
+            done = threading.Event()
+            threading.Thread(target=heartbeat_loop, args=(task['task_id'], worker, done), daemon=True).start()
+            settings = task['settings']
+            collector = RecordCollector()
+            try:
+                result = scraper.scrape_zipcode(
+                    task['zipcode'], task['base_query'], folder_name, thread_id, pool,
+                    settings.get('mode', 'details'), settings.get('max_scrolls', 15),
+                    settings.get('max_results'), cache, collector
+                )
+            except Exception as e:
+                result = {"zipcode": task['zipcode'], "count": 0, "status": "error", "error": str(e)}
+            finally:
+                done.set()
+
+            if result['status'] in ("success", "no_data"):
+                queue.complete(task['task_id'], worker, result, collector.records)
+            else:
+                queue.fail(task['task_id'], worker, result.get('error') or result['status'])
+            scraper.safe_print(f"[{worker}] {task['zipcode']}: {result['status']} ({result.get('count', 0)} records)")
+
+    workers = [threading.Thread(target=worker_loop, args=(i,), daemon=True) for i in range(threads)]
+    try:
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+    finally:
+        pool.close()
+
+
+def collect_results(queue, job_id, folder_name, fmt="csv"):
+    """Write every finished record of a job to one sink (plus the Excel export)"""
+    import scrape_zip_optimized as scraper
+
+    job = queue.get_job(job_id)
+    writer = scraper.create_output_writer(folder_name, job["base_query"], fmt, scraper.create_results_store())
+    index = scraper.PlaceIndex(job["base_query"])
+    for result, records in queue.results(job_id):
+        if records:
+            # Every place stays in the results store under this zipcode; the output file gets new ones only
+            writer.submit(index.filter_new(records, result["zipcode"]), job["base_query"], result["zipcode"], records)
+    writer.close()
+    losses = scraper.format_writer_losses(writer.stats())
+    if losses:
+        logger.warning(losses)
+    return writer.path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Distributed zipcode work queue")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    publish = sub.add_parser("publish", help="Publish a zipcode sheet as tasks")
+    publish.add_argument("--file", required=True, help="xlsx, CSV or Parquet sheet of zipcodes")
+    publish.add_argument("--query", required=True)
+    publish.add_argument("--column", default="DELIVERY ZIPCODE")
+    publish.add_argument("--mode", default="details", choices=["details", "list"])
+    publish.add_argument("--max-scrolls", type=int, default=15)
+    publish.add_argument("--max-results", type=int)
+
+    worker = sub.add_parser("worker", help="Run a worker node")
+    worker.add_argument("--threads", type=int, default=1)
+    worker.add_argument("--visibility-timeout", type=int, default=VISIBILITY_TIMEOUT)
+    worker.add_argument("--exit-when-idle", action="store_true")
+    worker.add_argument("--profile", help="Page profile for this node's browsers (full or lean)")
+    worker.add_argument("--perf-trace", help="Append per-zipcode Chrome performance samples to this file")
+    worker.add_argument("--measure-transfer", action="store_true", help="Count bytes transferred per zipcode")
+
+    status = sub.add_parser("status", help="Show job progress")
+    status.add_argument("--job", required=True)
+
+    collect = sub.add_parser("collect", help="Write a job's results to one output file")
+    collect.add_argument("--job", required=True)
+    collect.add_argument("--out", default="google_maps_data")
+    collect.add_argument("--format", default="csv")
+
+    for subparser in (publish, worker, status, collect):
+        subparser.add_argument("--queue", default=os.environ.get("SCRAPER_QUEUE_URL", "sqlite:///work_queue.sqlite"))
+
+    args = parser.parse_args(argv)
+    queue = open_queue(args.queue)
+
+    if args.command == "publish":
+        from input_loader import load_zipcodes
+        zipcodes = load_zipcodes(args.file, args.column)
+        job_id = queue.publish(args.query, zipcodes, {
+            'mode': args.mode, 'max_scrolls': args.max_scrolls, 'max_results': args.max_results
+        })
+        print(f"✓ Published {len(zipcodes)} tasks as job {job_id}")
+    elif args.command == "worker":
+        run_worker(queue, args.threads, args.visibility_timeout, exit_when_idle=args.exit_when_idle,
+                   page_profile=args.profile, perf_trace=args.perf_trace, measure_transfer=args.measure_transfer)
+    elif args.command == "status":
+        print(json.dumps(queue.progress(args.job), indent=2))
+    elif args.command == "collect":
+        print(f"✓ Results written to {collect_results(queue, args.job, args.out, args.format)}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())